@@ -0,0 +1,148 @@
+# alert_store.py
+"""
+Penyimpanan append-only untuk deteksi ransomware (pengganti CSV yang
+di-parse ulang setiap poll). Satu tabel SQLite (mode WAL) dengan id
+bertambah monoton sebagai cursor `since`; pembaca menyimpan ring buffer
+alert terbaru di memori dan hanya mengambil baris baru.
+"""
+import os
+import csv
+import sqlite3
+import threading
+import datetime as dt
+from collections import deque
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+)
+"""
+
+
+class AlertStore:
+    def __init__(self, db_path, recent_max=200, legacy_csv=None):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.RLock()   # refresh() memegang lock sambil memanggil since()
+        self._conn = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.recent = deque(maxlen=recent_max)
+        self._last_id = 0
+        self._count = 0
+        if legacy_csv:
+            self._import_legacy_csv(legacy_csv)
+
+    # ---------- Tulis ----------
+    def add(self, file_path, status="DETECTED", timestamp=None):
+        """Catat satu deteksi; return id alert."""
+        ts = timestamp or dt.datetime.now().isoformat()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO alerts (file_path, status, timestamp) VALUES (?, ?, ?)",
+                (file_path, status, ts))
+            self._conn.commit()
+            return cur.lastrowid
+
+    def add_many(self, rows):
+        """rows: iterable (file_path, status, timestamp) — satu transaksi."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO alerts (file_path, status, timestamp) VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def _import_legacy_csv(self, csv_path):
+        """
+        Migrasi sekali: isi store dari ransomware_detected_files.csv lama bila
+        store masih kosong. Cek kosong + insert dalam satu transaksi BEGIN
+        IMMEDIATE, jadi dashboard & pipeline yang start bersamaan tidak
+        mengimpor CSV dua kali.
+        """
+        if not os.path.exists(csv_path):
+            return
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            rows = [(r.get("file_path") or "", r.get("status") or "", r.get("timestamp") or "")
+                    for r in csv.DictReader(f)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not self._conn.execute("SELECT 1 FROM alerts LIMIT 1").fetchone():
+                    self._conn.executemany(
+                        "INSERT INTO alerts (file_path, status, timestamp) VALUES (?, ?, ?)", rows)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    # ---------- Baca ----------
+    def since(self, cursor=0, limit=100):
+        """Alert dengan id > cursor (urut naik), maksimal limit."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, file_path, status, timestamp FROM alerts WHERE id > ? ORDER BY id LIMIT ?",
+                (int(cursor), int(limit))).fetchall()
+        return [{"id": r[0], "file_path": r[1], "status": r[2], "timestamp": r[3]} for r in rows]
+
+    def refresh(self):
+        """
+        Tarik baris baru ke ring buffer. Biaya sebanding dengan jumlah alert baru.
+        Seluruhnya di bawah lock: request dashboard yang paralel tidak
+        menambahkan / menghitung baris yang sama dua kali.
+        """
+        with self._lock:
+            if self._last_id == 0:
+                self._count = self._conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+                row = self._conn.execute("SELECT MAX(id) FROM alerts").fetchone()
+                start = max(0, (row[0] or 0) - self.recent.maxlen)
+                self._last_id = start
+                new = self.since(start, self.recent.maxlen)
+                self.recent.extend(new)
+                if new:
+                    self._last_id = new[-1]["id"]
+                return len(new)
+            total = 0
+            while True:
+                new = self.since(self._last_id, 1000)
+                if not new:
+                    return total
+                self.recent.extend(new)
+                self._last_id = new[-1]["id"]
+                self._count += len(new)
+                total += len(new)
+
+    @property
+    def count(self):
+        return self._count
+
+    def recent_items(self, limit):
+        """Salinan `limit` alert terbaru dari ring buffer."""
+        with self._lock:
+            return list(self.recent)[-limit:]
+
+    def latest(self):
+        with self._lock:
+            return self.recent[-1] if self.recent else None
+
+    def export_csv(self, csv_path):
+        """Ekspor seluruh alert ke CSV (format lama: file_path,status,timestamp)."""
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file_path", "status", "timestamp"])
+            cursor = 0
+            while True:
+                batch = self.since(cursor, 5000)
+                if not batch:
+                    break
+                writer.writerows((a["file_path"], a["status"], a["timestamp"]) for a in batch)
+                cursor = batch[-1]["id"]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,16 +1,19 @@
 import os
 import pathlib
-from flask import Flask
 
 LOG_PATH = pathlib.Path(os.getenv("PROGRESS_LOG_PATH", "progress_events.jsonl"))
 
 def create_app():
+    from flask import Flask  # lazy: import paket app (mis. event_index) tidak menarik Flask
+
     app = Flask(__name__)
 
     from .routes_dashboard import bp as dashboard_bp
     from .routes_api import bp as api_bp
+    from .routes_metrics import bp as metrics_bp
 
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(api_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp)   # /metrics (Prometheus)
 
     return app
@@ -0,0 +1,715 @@
+import os, re, json, time, pathlib, threading
+from collections import deque
+
+import event_segments
+from stream_stats import Metric, LogHistogram
+
+LOG_PATH = pathlib.Path(os.getenv("PROGRESS_LOG_PATH", "progress_events.jsonl"))
+LOG_FORMAT = os.getenv("PROGRESS_LOG_FORMAT", "jsonl").lower()
+SEGMENT_DIR = event_segments.segment_dir(LOG_PATH)
+
+READ_BLOCK = 1024 * 1024
+RECENT_MAX = 2000
+
+
+def _parse_line(raw):
+    line = raw.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except Exception:
+        return None
+
+
+# ---------- PEMBACA LOG INKREMENTAL ----------
+class LogFollower:
+    """
+    Membaca progress log secara inkremental: hanya byte baru sejak pembacaan
+    terakhir yang di-parse. Baris yang belum lengkap (masih ditulis) ditunda.
+    Posisi yang dikembalikan bersifat global & monoton (tetap naik walau log
+    dirotasi), sehingga bisa dipakai sebagai id event SSE.
+    """
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.offset = 0
+        self.base = 0          # akumulasi ukuran file sebelum rotasi
+        self._ino = None
+        self.gap_to = None     # JSONL tidak pernah melewati data
+
+    @property
+    def position(self):
+        return self.base + self.offset
+
+    def poll(self, max_bytes=8 * READ_BLOCK, want=None):
+        """
+        Kembalikan (rotated, [(pos, event_dict), ...]) untuk baris baru,
+        maksimal sekitar max_bytes per panggilan (panggil ulang sampai kosong).
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False, []
+
+        rotated = False
+        if self._ino is not None and (st.st_ino != self._ino or st.st_size < self.offset):
+            self.base += self.offset
+            self.offset = 0
+            rotated = True
+        self._ino = st.st_ino
+
+        if st.st_size == self.offset:
+            return rotated, []
+
+        out = []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            buf = b""
+            while len(buf) < max_bytes or b"\n" not in buf:
+                block = f.read(READ_BLOCK)
+                if not block:
+                    break
+                buf += block
+        cut = buf.rfind(b"\n")
+        if cut < 0:
+            return rotated, out
+        start = self.offset
+        for raw in buf[:cut + 1].splitlines(keepends=True):
+            start += len(raw)
+            ev = _parse_line(raw)
+            if ev is not None:
+                out.append((self.base + start, ev))
+        self.offset = start
+        return rotated, out
+
+
+class SegmentFollower:
+    """
+    Padanan LogFollower untuk format segmen (PROGRESS_LOG_FORMAT=segments).
+    Segmen sealed yang menurut indeksnya tidak berisi tipe event yang
+    dibutuhkan (want) dilewati utuh tanpa di-decode; posisi akhir lompatan
+    dicatat di gap_to agar klien SSE di rentang itu di-reset.
+    """
+    def __init__(self, directory):
+        self.dir = pathlib.Path(directory)
+        self.seg_pos = 0       # posisi di dalam run saat ini (base segmen + offset)
+        self.base = 0          # akumulasi posisi run-run sebelumnya
+        self._run = None
+        self.gap_to = None
+
+    @property
+    def position(self):
+        return self.base + self.seg_pos
+
+    def poll(self, max_bytes=8 * READ_BLOCK, want=None):
+        segs = event_segments.list_segments(self.dir)
+        if not segs:
+            return False, []
+
+        rotated = False
+        run = event_segments.run_id(segs[0])
+        if run is None:
+            return False, []
+        if self._run is not None and run != self._run:
+            self.base += self.seg_pos
+            self.seg_pos = 0
+            rotated = True
+        self._run = run
+
+        out = []
+        for seg in segs:
+            meta = seg.meta
+            end = meta["end"] if meta else None
+            if end is not None and end <= self.seg_pos:
+                continue
+            if seg.base > self.seg_pos:
+                # segmen yang belum terbaca sudah terhapus retensi
+                self.seg_pos = seg.base
+                self.gap_to = self.position
+            if want is not None and end is not None and not event_segments.segment_matches(seg, types=want):
+                self.seg_pos = end
+                self.gap_to = self.position
+                continue
+            for pos, ev in event_segments.read_records(seg, start=self.seg_pos - seg.base, max_bytes=max_bytes):
+                out.append((self.base + pos, ev))
+                self.seg_pos = pos
+            if out or end is None or self.seg_pos < end:
+                break
+        return rotated, out
+
+
+def make_follower():
+    if LOG_FORMAT == "segments":
+        return SegmentFollower(SEGMENT_DIR)
+    return LogFollower(LOG_PATH)
+
+
+# ---------- PEMBACA EKOR LOG (tanpa scan penuh) ----------
+TAIL_BLOCK = 64 * 1024
+
+
+def tail_events(path, n):
+    """
+    Ambil n event terakhir dengan membaca mundur dari EOF per blok.
+    Biaya sebanding dengan n, bukan dengan panjang log.
+    Baris terakhir yang belum lengkap (masih ditulis) diabaikan.
+    Return (events, cursor) — cursor menunjuk akhir baris lengkap terakhir,
+    untuk dilanjutkan dengan events_since.
+    """
+    path = pathlib.Path(path)
+    if not path.exists():
+        return [], None
+    with open(path, "rb") as f:
+        ident = f"{os.fstat(f.fileno()).st_ino:x}"
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = buf.split(b"\n")
+    partial = lines.pop()          # sisa setelah newline terakhir = baris belum lengkap
+    cursor = (ident, end - len(partial))
+    if pos > 0:
+        lines = lines[1:]          # baris pertama bisa terpotong di tengah
+    out = []
+    for raw in reversed(lines):
+        if len(out) >= n:
+            break
+        ev = _parse_line(raw)
+        if ev is not None:
+            out.append(ev)
+    out.reverse()
+    return out, cursor
+
+
+def parse_cursor(text):
+    """"<id>:<posisi>" -> (id, posisi); ValueError bila formatnya salah."""
+    ident, _, pos = str(text).rpartition(":")
+    pos = int(pos)
+    if not ident or pos < 0:
+        raise ValueError(f"cursor tidak valid: {text!r}")
+    return ident, pos
+
+
+def events_since(path, cursor, limit):
+    """
+    Event setelah cursor (urut lama → baru), maksimal limit.
+    Return (events, cursor_berikut). Cursor = (inode hex, offset byte akhir
+    baris terakhir yang sudah dikirim), jadi event dengan ts sama atau ts
+    yang tidak monoton (emit dari banyak thread) tidak terlewat; O(limit) baca.
+    Bila inode berbeda / offset melewati ukuran file (log dirotasi), mulai
+    dari awal file.
+    """
+    path = pathlib.Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return [], cursor
+    ident = f"{st.st_ino:x}"
+    pos = cursor[1] if cursor[0] == ident and cursor[1] <= st.st_size else 0
+    out = []
+    if limit > 0:
+        with open(path, "rb") as f:
+            f.seek(pos)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break              # baris terakhir masih ditulis
+                pos += len(raw)
+                ev = _parse_line(raw)
+                if ev is None:
+                    continue
+                out.append(ev)
+                if len(out) == limit:
+                    break
+    return out, (ident, pos)
+
+
+def log_tail(n):
+    """(n event terakhir, cursor) — cursor dipakai untuk log_since berikutnya."""
+    if LOG_FORMAT == "segments":
+        return event_segments.tail_events(SEGMENT_DIR, n)
+    return tail_events(LOG_PATH, n)
+
+
+def log_since(cursor, limit):
+    """(events, cursor_berikut) setelah cursor (id, posisi) dari parse_cursor."""
+    if LOG_FORMAT == "segments":
+        return event_segments.events_since(SEGMENT_DIR, cursor, limit)
+    return events_since(LOG_PATH, cursor, limit)
+
+
+def log_signature():
+    """Penanda murah (hanya stat) bahwa isi log berubah; dipakai untuk ETag."""
+    try:
+        if LOG_FORMAT == "segments":
+            segs = event_segments.list_segments(SEGMENT_DIR)
+            if not segs:
+                return "empty"
+            st = segs[-1].path.stat()
+            return f"{segs[-1].base:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+        st = LOG_PATH.stat()
+        return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+    except OSError:
+        return "empty"
+
+
+# ---------- REDUCER STATUS ----------
+class RansomStatus:
+    def __init__(self):
+        self.total = 0
+        self.encrypted = 0
+        self.decrypted = 0
+        self.running = False
+        self.last_event = None
+
+    def feed(self, typ, data):
+        if typ == "ransom_scan_start":
+            self.total = data.get("total", 0)
+            self.running = True
+        elif typ in ("simulate_ransomware_file", "ransom_encrypt_done", "encrypt_end"):
+            self.encrypted += 1
+            self.running = True
+        elif typ in ("ransom_simulation_end", "simulate_ransomware_done"):
+            self.encrypted = data.get("count", self.encrypted)
+            self.running = False
+        elif typ in ("ransom_decrypt_done", "decrypt_end"):
+            self.decrypted += 1
+        self.last_event = typ
+
+    def snapshot(self):
+        return {
+            "total": self.total,
+            "encrypted": self.encrypted,
+            "decrypted": self.decrypted,
+            "running": self.running,
+            "last_event": self.last_event,
+        }
+
+
+class HeaderStatus:
+    def __init__(self):
+        self.status = "No report found"
+        self.total_success = 0
+        self.total_fail = 0
+        self.mode = "unknown"
+
+    def feed(self, typ, data):
+        if typ in ("header_reset", "system_start", "start_normal_mode"):
+            self.total_success = 0
+            self.total_fail = 0
+            return
+        if typ == "hdr_corrupt_start":
+            self.status = "Running"
+        elif typ == "hdr_done":
+            self.total_success = data.get("success", 0)
+            self.total_fail = data.get("fail", 0)
+            self.mode = data.get("mode", "unknown")
+            self.status = "Done"
+        elif typ == "hdr_corrupt_error":
+            self.status = "Error"
+
+    def snapshot(self):
+        return {
+            "status": self.status,
+            "total_success": self.total_success,
+            "total_fail": self.total_fail,
+            "mode": self.mode,
+        }
+
+
+class CorruptStatus:
+    def __init__(self):
+        self.status = "No report found"
+        self.total_success = 0
+        self.total_fail = 0
+        self.folder = "unknown"
+
+    def feed(self, typ, data):
+        # reset status bila ada event sistem normal
+        if typ in ("simulate_corrupt_error", "system_start", "start_normal_mode"):
+            self.total_success = 0
+            self.total_fail = 0
+            return
+        if typ == "simulate_corrupt_start":
+            self.status = "Running"
+            self.folder = data.get("folder", "unknown")
+        elif typ == "simulate_corrupt_done":
+            self.total_success = data.get("total_success", 0)
+            self.total_fail = data.get("total_fail", 0)
+            self.folder = data.get("folder", self.folder)
+            self.status = "Done"
+        elif typ == "simulate_corrupt_error":
+            self.status = "Error"
+
+    def snapshot(self):
+        return {
+            "status": self.status,
+            "total_success": self.total_success,
+            "total_fail": self.total_fail,
+            "folder": self.folder,
+            "mode": "corrupt_simulation",
+        }
+
+
+class SummaryIndex:
+    """
+    Agregat /api/summary yang diperbarui per event. Data backup & restore
+    disimpan bersarang per file (file → algo → info), total global dihitung
+    berjalan, dan entri JSON tiap file di-cache; event baru hanya membuat
+    entri file yang bersangkutan di-serialisasi ulang.
+    """
+    ALGO_NAMES = {"lz4", "zstd", "gzip", "brotli", "snappy"}
+    CHUNK = 1024
+
+    def __init__(self):
+        self.files = {}        # file -> {"size", "sha"} (urutan sisip = urutan tampil)
+        self.backup = {}       # file -> {algo: {"ratio", "dur"}}
+        self.restore = {}      # file -> {algo: {...}}
+        self.backup_pairs = 0
+        self.restore_total = 0
+        self.restore_ok = 0
+        self.errors = 0
+        self._order = []       # file sesuai urutan sisip
+        self._slot = {}        # file -> indeks di _order
+        self._frag = {}        # file -> potongan JSON entri file
+        self._chunks = []      # gabungan potongan per CHUNK file (None = perlu dibangun ulang)
+        self._dirty = set()
+
+    def feed(self, typ, data):
+        """Return True bila event mengubah isi summary."""
+        typ = (typ or "").strip()
+        f = data.get("file") or data.get("filepath") or data.get("name") or data.get("rel_path")
+
+        if typ == "hash_original":
+            if not f: return
+            if f not in self._slot:
+                self._slot[f] = len(self._order)
+                self._order.append(f)
+            self.files[f] = {"size": int(data.get("size", 0) or 0), "sha": str(data.get("sha256", "") or "")}
+            self._dirty.add(f)
+            return True
+
+        elif typ == "backup_result":
+            algo = data.get("algo")
+            if not f or not algo: return
+            per_file = self.backup.setdefault(f, {})
+            if str(algo) not in per_file:
+                self.backup_pairs += 1
+            per_file[str(algo)] = {
+                "ratio": float(data.get("ratio")) if data.get("ratio") is not None else None,
+                "dur": float(data.get("duration_ms")) if data.get("duration_ms") is not None else None,
+            }
+            self._dirty.add(f)
+            return True
+
+        elif typ == "restore_validated":
+            if not f: return
+            parts = re.split(r"[\\/]+", f)
+            if len(parts) >= 2 and parts[0].lower() in self.ALGO_NAMES:
+                f = "/".join(parts[1:])
+            algo = str(data.get("algo") or (parts[0] if parts else ""))
+            if not algo: return
+            bucket = self.restore.setdefault(f, {})
+            prev = bucket.get(algo)
+            if prev is None:
+                self.restore_total += 1
+            elif prev["ok"]:
+                self.restore_ok -= 1
+            bucket[algo] = {
+                "algo": algo,
+                "ok": bool(data.get("ok")),
+                "sha_in": data.get("sha_in"),
+                "sha_out": data.get("sha_out"),
+            }
+            if bucket[algo]["ok"]:
+                self.restore_ok += 1
+            self._dirty.add(f)
+            return True
+
+        elif typ.endswith("_error"):
+            self.errors += 1
+            return True
+
+    def _file_entry(self, f, meta):
+        b = self.backup.get(f, {})
+        algos = sorted(b)
+        r_list = list(self.restore.get(f, {}).values())
+        ok_count = sum(1 for x in r_list if x["ok"])
+        return {
+            "file": f,
+            "size": meta["size"],
+            "sha": meta["sha"],
+            "algos": algos,
+            "ratios": {a: b[a]["ratio"] for a in algos},
+            "durations": {a: b[a]["dur"] for a in algos},
+            "restore": r_list,
+            "restore_ok": ok_count,
+            "restore_total": len(r_list),
+            "restore_ok_pct": (ok_count / len(r_list) * 100.0) if r_list else None
+        }
+
+    def totals(self):
+        return {
+            "total_files": len(self.files),
+            "total_backup_pairs": self.backup_pairs,
+            "total_restore": self.restore_total,
+            "total_restore_ok": self.restore_ok,
+            "errors": self.errors,
+        }
+
+    def build_parts(self):
+        n_chunks = (len(self._order) + self.CHUNK - 1) // self.CHUNK
+        self._chunks.extend([None] * (n_chunks - len(self._chunks)))
+        for f in self._dirty:
+            meta = self.files.get(f)
+            if meta is not None:
+                self._frag[f] = json.dumps(self._file_entry(f, meta), ensure_ascii=False)
+                self._chunks[self._slot[f] // self.CHUNK] = None
+        self._dirty.clear()
+
+        for i, chunk in enumerate(self._chunks):
+            if chunk is None:
+                names = self._order[i * self.CHUNK:(i + 1) * self.CHUNK]
+                self._chunks[i] = ", ".join(self._frag[f] for f in names)
+
+        glob = self.totals()
+        # dikembalikan sebagai potongan (tanpa menyalin jadi satu string besar);
+        # Response Flask bisa langsung menulis list ini ke klien
+        parts = ['{"global": ' + json.dumps(glob) + ', "files": [']
+        for i, chunk in enumerate(self._chunks):
+            if i:
+                parts.append(", ")
+            parts.append(chunk)
+        parts.append("]}")
+        return parts
+
+
+class StageStats:
+    """
+    Statistik per stage dari event <nama>_end (progress.stage): histogram
+    log durasi, CPU & throughput (stream_stats.Metric, memori tetap per
+    stage) plus total byte, I/O disk dan kenaikan puncak RSS terbesar.
+    """
+    METRICS = ("duration_ms", "cpu_ms", "mb_s")
+    TOTALS = ("bytes_in", "bytes_out", "disk_read", "disk_write")
+
+    def __init__(self):
+        self.stages = {}
+
+    def feed(self, typ, data):
+        if not typ or not typ.endswith("_end") or data.get("duration_ms") is None:
+            return False
+        name = typ[:-len("_end")]
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = {"count": 0, "failed": 0, "rss_growth_mb": None,
+                                      "metrics": {m: Metric() for m in self.METRICS},
+                                      "totals": dict.fromkeys(self.TOTALS, 0)}
+        st["count"] += 1
+        if data.get("ok") is False:
+            st["failed"] += 1
+        for m in self.METRICS:
+            v = data.get(m)
+            if v is not None:
+                st["metrics"][m].add(float(v))
+        for k in self.TOTALS:
+            st["totals"][k] += data.get(k) or 0
+        rss = data.get("rss_growth_mb")
+        if rss is not None and (st["rss_growth_mb"] is None or rss > st["rss_growth_mb"]):
+            st["rss_growth_mb"] = rss
+        return True
+
+    @staticmethod
+    def _histogram(metric, coarsen):
+        """Bucket tak-kosong sebagai [bawah, atas, jumlah]; coarsen = gabung N bucket 1%."""
+        groups = {}
+        for i, c in enumerate(metric.hist.counts):
+            if c:
+                groups[i // coarsen] = groups.get(i // coarsen, 0) + c
+        out = []
+        for g, c in sorted(groups.items()):
+            lo = LogHistogram.bounds(g * coarsen)[0]
+            hi = LogHistogram.bounds(g * coarsen + coarsen - 1)[1]
+            out.append([lo, hi, c])
+        return out
+
+    def snapshot(self, name=None, histogram="duration_ms", coarsen=10):
+        out = {}
+        for st_name, st in self.stages.items():
+            if name is not None and st_name != name:
+                continue
+            m = st["metrics"]
+            dur, cpu = m["duration_ms"], m["cpu_ms"]
+            entry = {"count": st["count"], "failed": st["failed"], "rss_growth_mb": st["rss_growth_mb"]}
+            entry.update({k: m[k].summary() for k in self.METRICS})
+            entry.update(st["totals"])
+            total_ms = dur.mean * dur.n
+            # porsi CPU dari waktu stage: tinggi = codec/CPU, rendah = menunggu (jaringan/disk)
+            entry["cpu_share"] = round(cpu.mean * cpu.n / total_ms, 3) if cpu.n and total_ms > 0 else None
+            if histogram in m:
+                entry["histogram"] = {"metric": histogram,
+                                      "buckets": self._histogram(m[histogram], coarsen)}
+            out[st_name] = entry
+        return out
+
+
+# ---------- INDEKS BERSAMA ----------
+# tipe event yang dipakai reducer; segmen tanpa tipe ini boleh dilewati
+_REDUCER_TYPES = {
+    "ransom_scan_start", "simulate_ransomware_file", "ransom_encrypt_done", "encrypt_end",
+    "ransom_simulation_end", "simulate_ransomware_done", "ransom_decrypt_done", "decrypt_end",
+    "header_reset", "system_start", "start_normal_mode", "hdr_corrupt_start", "hdr_done",
+    "simulate_corrupt_start", "simulate_corrupt_done",
+    "hash_original", "backup_result", "restore_validated",
+}
+
+def _relevant(typ):
+    return typ in _REDUCER_TYPES or typ.endswith("_error") or typ.endswith("_end")
+
+
+class EventIndex:
+    """
+    Satu indeks per proses server: log dibaca sekali secara inkremental,
+    hasil agregat dibagi ke semua endpoint & klien SSE.
+    """
+    def __init__(self, follower=None):
+        self.follower = follower if follower is not None else make_follower()
+        self.recent = deque(maxlen=RECENT_MAX)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._watcher = None
+        self.epoch = os.urandom(4).hex()   # pembeda antar proses server untuk ETag
+        self._reset_reducers()
+
+    def _reset_reducers(self):
+        self.ransom = RansomStatus()
+        self.header = HeaderStatus()
+        self.corrupt = CorruptStatus()
+        self.summary = SummaryIndex()
+        self.stages = StageStats()
+        self._stages_pos = self.follower.position   # posisi event stage terakhir
+        self._summary_cache = None
+        self._summary_pos = self.follower.position   # posisi event terakhir yang mengubah summary
+        self.recent.clear()
+        self._floor = self.follower.position   # id terakhir yang sudah dibuang dari buffer
+
+    @property
+    def position(self):
+        return self.follower.position
+
+    def refresh(self):
+        """Baca byte baru dari log & perbarui agregat. Return jumlah event baru."""
+        with self._cond:
+            total = 0
+            while True:
+                rotated, batch = self.follower.poll(want=_relevant)
+                if rotated:
+                    self._reset_reducers()
+                if self.follower.gap_to is not None:
+                    self._floor = max(self._floor, self.follower.gap_to)
+                    self.follower.gap_to = None
+                for pos, ev in batch:
+                    typ = ev.get("event") or ev.get("type")
+                    data = ev.get("data") or {}
+                    self.ransom.feed(typ, data)
+                    self.header.feed(typ, data)
+                    self.corrupt.feed(typ, data)
+                    if self.summary.feed(typ, data):
+                        self._summary_pos = pos
+                    if self.stages.feed(typ, data):
+                        self._stages_pos = pos
+                    if len(self.recent) == self.recent.maxlen:
+                        self._floor = self.recent[0][0]
+                    self.recent.append((pos, ev))
+                total += len(batch)
+                if rotated:
+                    self._cond.notify_all()
+                if not batch:
+                    break
+            if total:
+                self._cond.notify_all()
+            return total
+
+    def summary_body(self):
+        """
+        Hasil /api/summary sebagai (versi, potongan JSON siap kirim), di-cache
+        per versi summary (posisi event terakhir yang mengubahnya): selama
+        tidak ada event relevan baru, request berikutnya tidak membangun
+        ulang apa pun.
+        """
+        with self._lock:
+            pos = self._summary_pos
+            if self._summary_cache is None or self._summary_cache[0] != pos:
+                body = self.summary.build_parts()
+                self._summary_cache = (pos, body)
+            return self._summary_cache
+
+    def stage_stats(self, name=None, histogram="duration_ms", coarsen=10):
+        """Return (versi, statistik per stage); versi = posisi event stage terakhir."""
+        with self._lock:
+            return self._stages_pos, self.stages.snapshot(name, histogram, coarsen)
+
+    def status(self):
+        return self.snapshot()[1]
+
+    def snapshot(self):
+        """
+        Return (versi, status gabungan) secara atomik. Versi = posisi log,
+        jadi naik setiap ada event baru dan bisa dipakai untuk conditional GET.
+        """
+        with self._lock:
+            return self.position, {
+                "version": self.position,
+                "ransom": self.ransom.snapshot(),
+                "header": self.header.snapshot(),
+                "corrupt": self.corrupt.snapshot(),
+                "summary": dict(self.summary.totals(), version=self._summary_pos),
+            }
+
+    def events_after(self, pos):
+        """
+        Return (events, head): event dengan id > pos dari buffer recent dan
+        posisi log saat ini. Return None bila pos sudah keluar dari buffer
+        (klien harus reload penuh).
+        """
+        with self._lock:
+            if pos < self._floor or pos > self.position:
+                return None
+            return [(p, ev) for p, ev in self.recent if p > pos], self.position
+
+    def wait(self, pos, timeout):
+        """Blok sampai ada event dengan id > pos (atau timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.position != pos, timeout=timeout)
+            return self.position
+
+    def start_watcher(self, interval=0.25):
+        """Satu thread per proses yang memantau log; klien SSE cukup menunggu."""
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                             name="event-index-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self, interval):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            time.sleep(interval)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EventIndex()
+        return _index
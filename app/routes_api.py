@@ -1,190 +1,115 @@
-import os, json, re, pathlib, datetime as dt
-from flask import Blueprint, jsonify
-from simulate_header import simulate_header_corruption_safe
+import os, json, pathlib, threading, datetime as dt
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+
+from .event_index import get_index, log_tail, log_since, log_signature, parse_cursor
+from alert_store import AlertStore
+from config import SOURCE_FOLDER, ALERT_DB_FILE, ALERT_CSV_FILE
 
 bp = Blueprint("api", __name__)
 LOG_PATH = pathlib.Path(os.getenv("PROGRESS_LOG_PATH", "progress_events.jsonl"))
-
-
-# ---------- FUNGSI MEMBACA LOG ----------
-def _iter_events():
-    if not LOG_PATH.exists():
-        return
-    with LOG_PATH.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except Exception:
-                continue
+STREAM_KEEPALIVE_S = 15.0
+EVENTS_DEFAULT_LIMIT = 200
+EVENTS_MAX_LIMIT = 1000
 
 
 # ---------- /api/summary ----------
 @bp.route("/summary")
 def api_summary():
-    files_seen = {}
-    backup = {}
-    restore = {}
-    counts = {"errors": 0}
-    algo_names = {"lz4", "zstd", "gzip", "brotli", "snappy"}
-
-    for ev in _iter_events() or []:
-        typ = (ev.get("event") or ev.get("type") or "").strip()
-        data = ev.get("data") or {}
-        f = data.get("file") or data.get("filepath") or data.get("name") or data.get("rel_path")
-
-        if typ == "hash_original":
-            if not f: continue
-            files_seen[f] = {"size": int(data.get("size", 0) or 0), "sha": str(data.get("sha256", "") or "")}
-
-        elif typ == "backup_result":
-            algo = data.get("algo")
-            if not f or not algo: continue
-            backup[(f, str(algo))] = {
-                "ratio": float(data.get("ratio")) if data.get("ratio") is not None else None,
-                "dur": float(data.get("duration_ms")) if data.get("duration_ms") is not None else None,
-            }
-
-        elif typ == "restore_validated":
-            if not f: continue
-            parts = re.split(r"[\\/]+", f)
-            if len(parts) >= 2 and parts[0].lower() in algo_names:
-                f = parts[1]
-            algo = str(data.get("algo") or (parts[0] if parts else ""))
-            if not algo: continue
-
-            bucket = restore.setdefault(f, {})
-            bucket[algo] = {
-                "algo": algo,
-                "ok": bool(data.get("ok")),
-                "sha_in": data.get("sha_in"),
-                "sha_out": data.get("sha_out"),
-            }
-
-        elif typ.endswith("_error"):
-            counts["errors"] += 1
-
-    total_files = len(files_seen)
-    total_backup_pairs = len(backup)
-    total_restore = sum(len(v) for v in restore.values())
-    total_restore_ok = sum(1 for v in restore.values() for x in v.values() if x["ok"])
-
-    per_file = []
-    for f, meta in files_seen.items():
-        algos = sorted({a for (ff, a) in backup.keys() if ff == f})
-        ratios = {a: backup.get((f, a), {}).get("ratio") for a in algos}
-        durs = {a: backup.get((f, a), {}).get("dur") for a in algos}
-        r_dict = restore.get(f, {})
-        r_list = list(r_dict.values())
-        ok_count = sum(1 for x in r_list if x["ok"])
-        per_file.append({
-            "file": f,
-            "size": meta["size"],
-            "sha": meta["sha"],
-            "algos": algos,
-            "ratios": ratios,
-            "durations": durs,
-            "restore": r_list,
-            "restore_ok": ok_count,
-            "restore_total": len(r_list),
-            "restore_ok_pct": (ok_count / len(r_list) * 100.0) if r_list else None
-        })
-
-    return jsonify({
-        "global": {
-            "total_files": total_files,
-            "total_backup_pairs": total_backup_pairs,
-            "total_restore": total_restore,
-            "total_restore_ok": total_restore_ok,
-            "errors": counts["errors"],
-        },
-        "files": per_file
-    })
+    """
+    Ringkasan per file dari indeks bersama. Hasil di-cache per posisi log,
+    jadi refresh dashboard tanpa event baru hanya mengirim ulang cache
+    (atau 304 bila klien mengirim If-None-Match).
+    """
+    idx = get_index()
+    idx.refresh()
+    pos, body = idx.summary_body()
+    etag = f"summary-{idx.epoch}-{pos}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    return resp
 
 
 # ---------- /api/events ----------
 @bp.route("/events")
 def api_events():
-    return jsonify(list(_iter_events() or [])[-200:])
+    """
+    Ekor log event. Query:
+      ?limit=N     jumlah event (default 200, maks EVENTS_MAX_LIMIT)
+      ?since=<cursor>  event setelah cursor (nilai header X-Next-Since dari respons
+                       sebelumnya; posisi byte di log, bukan ts, jadi event dengan
+                       ts sama tidak terlewat antar halaman)
+    Mendukung ETag/If-None-Match agar polling yang tidak berubah cukup dibalas 304.
+    """
+    try:
+        limit = int(request.args.get("limit", EVENTS_DEFAULT_LIMIT))
+        since = request.args.get("since")
+        since = parse_cursor(since) if since not in (None, "") else None
+    except ValueError:
+        return jsonify({"error": "limit/since tidak valid"}), 400
+    limit = max(1, min(limit, EVENTS_MAX_LIMIT))
+
+    etag = f"{log_signature()}-{limit}-{since}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+
+    if since is None:
+        events, cursor = log_tail(limit)
+    else:
+        events, cursor = log_since(since, limit)
+
+    resp = jsonify(events)
+    resp.set_etag(etag)
+    if cursor is not None:
+        resp.headers["X-Next-Since"] = f"{cursor[0]}:{cursor[1]}"
+    return resp
+
+
+# ---------- /api/stages ----------
+@bp.route("/stages")
+def api_stages():
+    """
+    Statistik per stage (progress.stage): jumlah, gagal, ringkasan durasi /
+    CPU / throughput (mean, p50..p99), total byte & I/O disk, kenaikan RSS,
+    porsi CPU, dan histogram log. Query:
+      ?stage=<nama>                            hanya satu stage
+      ?histogram=duration_ms|cpu_ms|mb_s|none  metrik histogram (default duration_ms)
+      ?coarsen=N                               gabung N bucket 1% (default 10, ~10%/bucket)
+    """
+    name = request.args.get("stage") or None
+    histogram = request.args.get("histogram", "duration_ms")
+    try:
+        coarsen = max(1, min(int(request.args.get("coarsen", 10)), 1000))
+    except ValueError:
+        return jsonify({"error": "coarsen tidak valid"}), 400
+
+    idx = get_index()
+    idx.refresh()
+    pos, stages = idx.stage_stats(name, histogram, coarsen)
+    etag = f"stages-{idx.epoch}-{pos}-{name}-{histogram}-{coarsen}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    resp = jsonify(stages)
+    resp.set_etag(etag)
+    return resp
 
 
 # ---------- /api/ransom_status ----------
 @bp.route("/ransom_status")
 def api_ransom_status():
-    total_files = 0
-    encrypted = 0
-    decrypted = 0
-    running = False
-    last_event = None
-
-    for ev in _iter_events() or []:
-        typ = ev.get("event")
-        data = ev.get("data") or {}
-
-        if typ == "ransom_scan_start":
-            total_files = data.get("total", 0)
-            running = True
-
-        elif typ in ("simulate_ransomware_file", "ransom_encrypt_done", "encrypt_end"):
-            encrypted += 1
-            running = True
-
-        elif typ in ("ransom_simulation_end", "simulate_ransomware_done"):
-            encrypted = data.get("count", encrypted)
-            running = False
-
-
-        elif typ in ("ransom_decrypt_done", "decrypt_end"):
-            decrypted += 1
-        
-        last_event = typ
-
-    return jsonify({
-    "total": total_files,
-    "encrypted": encrypted,
-    "decrypted": decrypted,
-    "running": running,
-    "last_event": last_event
-
-})
-
+    idx = get_index()
+    idx.refresh()
+    return jsonify(idx.status()["ransom"])
 
 
 # ---------- /api/header_status ----------
 @bp.route("/header_status")
 def api_header_status():
-    status = "No report found"
-    total_success = 0
-    total_fail = 0
-    mode = "unknown"
-
-    for ev in _iter_events() or []:
-        typ = ev.get("event") or ev.get("type")
-        data = ev.get("data") or {}
-
-        if typ in ("header_reset","system_start", "start_normal_mode"):
-            total_success = 0
-            total_fail = 0
-            continue
-
-        if typ == "hdr_corrupt_start":
-            status = "Running"
-        elif typ == "hdr_done":
-            total_success = data.get("success", 0)
-            total_fail = data.get("fail", 0)
-            mode = data.get("mode", "unknown")
-            status = "Done"
-        elif typ == "hdr_corrupt_error":
-            status = "Error"
+    idx = get_index()
+    idx.refresh()
+    return jsonify(idx.status()["header"])
 
-    return jsonify({
-        "status": status,
-        "total_success": total_success,
-        "total_fail": total_fail,
-        "mode": mode
-    })
 
 # ---------- /api/corrupt_status ----------
 @bp.route("/corrupt_status")
@@ -194,73 +119,154 @@ def api_corrupt_status():
     Akan menampilkan status saat ini (Running, Done, Error, dll)
     beserta jumlah file berhasil/gagal dirusak.
     """
-    status = "No report found"
-    total_success = 0
-    total_fail = 0
-    folder = "unknown"
-    mode = "corrupt_simulation"
-
-    # membaca event dari log
-    for ev in _iter_events() or []:
-        typ = ev.get("event") or ev.get("type")
-        data = ev.get("data") or {}
-
-        # reset status bila ada event sistem normal
-        if typ in ("simulate_corrupt_error", "system_start", "start_normal_mode"):
-            total_success = 0
-            total_fail = 0
-            continue
-
-        if typ == "simulate_corrupt_start":
-            status = "Running"
-            folder = data.get("folder", "unknown")
-
-        elif typ == "simulate_corrupt_file":
-            # optional: bisa dipakai untuk hitung progress per file
-            pass
-
-        elif typ == "simulate_corrupt_done":
-            total_success = data.get("total_success", 0)
-            total_fail = data.get("total_fail", 0)
-            folder = data.get("folder", folder)  # pastikan folder tetap terisi
-            status = "Done"
-
-        elif typ == "simulate_corrupt_error":
-            status = "Error"
+    idx = get_index()
+    idx.refresh()
+    return jsonify(idx.status()["corrupt"])
 
-    return jsonify({
-        "status": status,
-        "total_success": total_success,
-        "total_fail": total_fail,
-        "folder": folder,
-        "mode": mode
-    })
+
+# ---------- /api/stream (Server-Sent Events) ----------
+def _sse(event, data, id=None):
+    out = []
+    if id is not None:
+        out.append(f"id: {id}")
+    out.append(f"event: {event}")
+    out.append("data: " + json.dumps(data, ensure_ascii=False))
+    return "\n".join(out) + "\n\n"
+
+
+def _without_version(status):
+    return {k: v for k, v in status.items() if k != "version"}
+
+
+@bp.route("/stream")
+def api_stream():
+    """
+    Push event baru & status agregat ke dashboard tanpa polling.
+    Semua klien berbagi satu indeks/watcher, jadi beban server tidak
+    bertambah dengan jumlah tab dashboard yang terbuka.
+    Resume: header Last-Event-ID (atau ?last_id=) = posisi event terakhir.
+    """
+    idx = get_index()
+    idx.start_watcher()
+    idx.refresh()
+
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    try:
+        last_id = int(last_id) if last_id not in (None, "") else None
+    except ValueError:
+        last_id = None
+
+    def gen():
+        yield "retry: 2000\n\n"
+        pos = last_id
+        last_status = None
+        while True:
+            found = idx.events_after(pos) if pos is not None else None
+            if found is None:
+                # klien baru / posisi sudah tidak ada di buffer → kirim snapshot penuh
+                pos, status = _combined_status(idx)
+                last_status = _without_version(status)
+                yield _sse("reset", {"status": status}, id=pos)
+                continue
+            batch, pos = found
+            if batch:
+                yield _sse("events", [ev for _, ev in batch], id=pos)
+                _, status = _combined_status(idx)
+                if _without_version(status) != last_status:
+                    last_status = _without_version(status)
+                    yield _sse("status", status, id=pos)
+            if idx.wait(pos, timeout=STREAM_KEEPALIVE_S) == pos:
+                yield ": keepalive\n\n"
+
+    return Response(stream_with_context(gen()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ---------- /api/ransom_alert ----------
+_DATA_DIR = os.path.dirname(SOURCE_FOLDER)
+ALERT_DB_PATH = pathlib.Path(os.getenv("ALERT_DB_PATH", os.path.join(_DATA_DIR, ALERT_DB_FILE)))
+RANSOM_CSV_PATH = pathlib.Path(os.getenv("ALERT_CSV_PATH", os.path.join(_DATA_DIR, ALERT_CSV_FILE)))
+ALERTS_DEFAULT_LIMIT = 50
+ALERTS_MAX_LIMIT = 1000
+_alert_store = None
+_alert_store_lock = threading.Lock()
+
+
+def _get_alert_store():
+    """Store alert bersama (dibuka sekali); None bila pipeline belum pernah mencatat deteksi."""
+    global _alert_store
+    if _alert_store is None:
+        with _alert_store_lock:
+            if _alert_store is None:
+                if not ALERT_DB_PATH.exists() and not RANSOM_CSV_PATH.exists():
+                    return None
+                _alert_store = AlertStore(ALERT_DB_PATH, legacy_csv=RANSOM_CSV_PATH)
+    _alert_store.refresh()
+    return _alert_store
+
+
 @bp.route("/ransom_alert")
 def api_ransom_alert():
     """
-    Endpoint untuk membaca log deteksi ransomware terbaru dari file CSV.
-    Digunakan untuk menampilkan notifikasi pop-up di dashboard.
+    Alert deteksi ransomware untuk notifikasi pop-up di dashboard.
+    Tanpa ?since: `limit` alert terbaru dari ring buffer di memori.
+    Dengan ?since=<id>: halaman alert setelah id tsb (pakai "next_since"
+    untuk halaman berikutnya).
     """
-    import csv
+    try:
+        limit = int(request.args.get("limit", ALERTS_DEFAULT_LIMIT))
+    except ValueError:
+        limit = ALERTS_DEFAULT_LIMIT
+    limit = max(1, min(limit, ALERTS_MAX_LIMIT))
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since harus berupa id alert (integer)"}), 400
+
+    store = _get_alert_store()
+    if store is None:
+        return jsonify({"count": 0, "latest": None, "items": [], "all": [], "next_since": since or 0})
+    if since is not None:
+        items = store.since(since, limit)
+    else:
+        items = store.recent_items(limit)
+    return jsonify({
+        "count": store.count,
+        "latest": store.latest(),
+        "items": items,
+        "all": items,            # alias lama, untuk konsumen yang masih membaca "all"
+        "next_since": items[-1]["id"] if items else (since or 0),
+    })
 
-    csv_log_path = pathlib.Path(r"D:\PENS 2025\Semester 6\Kegiatan Nafisah\PROJECT TA\Data\BackupSystemRestore\Data\ransomware_detected_files.csv")
-    alerts = []
 
-    if csv_log_path.exists():
-        with csv_log_path.open("r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                alerts.append({
-                    "file_path": row.get("file_path"),
-                    "status": row.get("status"),
-                    "timestamp": row.get("timestamp")
-                })
+# ---------- /api/status (gabungan) ----------
+def _combined_status(idx):
+    """Status ransom/header/corrupt + total summary + alert terbaru dari indeks bersama."""
+    version, status = idx.snapshot()
+    store = _get_alert_store()
+    status["alert"] = {"count": store.count if store else 0,
+                       "latest": store.latest() if store else None}
+    return version, status
 
-    return jsonify({
-        "count": len(alerts),
-        "latest": alerts[-1] if alerts else None,
-        "all": alerts
-    })
+
+@bp.route("/status")
+def api_status():
+    """
+    Satu endpoint untuk semua kartu status dashboard (pengganti
+    ransom_status + header_status + corrupt_status + ransom_alert, plus
+    total summary). Field "version" naik setiap ada event baru; klien
+    mengirim If-None-Match (ETag) atau ?since_version= dan mendapat 304
+    bila tidak ada perubahan.
+    """
+    idx = get_index()
+    idx.refresh()
+    version, status = _combined_status(idx)
+    etag = f"status-{idx.epoch}-{version}-{status['alert']['count']}"
+    since = request.args.get("since_version")
+    if etag in request.if_none_match or (since and since == str(version)):
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    resp = jsonify(status)
+    resp.set_etag(etag)
+    return resp
@@ -0,0 +1,61 @@
+import os, time, threading
+from flask import Blueprint, Response, request, g
+
+from metrics import Registry, SNAPSHOT_PATH, CONTENT_TYPE
+
+bp = Blueprint("metrics", __name__)
+
+# metrik proses dashboard sendiri
+registry = Registry()
+http_requests = registry.counter("backup_dashboard_http_requests_total", "Request HTTP dashboard",
+                                 ("endpoint", "status"))
+http_seconds = registry.histogram("backup_dashboard_http_request_duration_seconds",
+                                  "Latensi request HTTP dashboard", ("endpoint",))
+snapshot_age = registry.gauge("backup_dashboard_pipeline_snapshot_age_seconds",
+                              "Umur snapshot metrik pipeline (-1 = belum ada)")
+
+_snapshot = {"sig": None, "body": ""}
+_snapshot_lock = threading.Lock()
+
+
+@bp.before_app_request
+def _start_timer():
+    g._metrics_t0 = time.perf_counter()
+
+
+@bp.after_app_request
+def _count_request(resp):
+    t0 = g.pop("_metrics_t0", None)
+    endpoint = request.endpoint or "unknown"
+    if t0 is not None and endpoint != "metrics.metrics":
+        http_requests.inc(endpoint=endpoint, status=resp.status_code)
+        http_seconds.observe(time.perf_counter() - t0, endpoint=endpoint)
+    return resp
+
+
+def _pipeline_snapshot():
+    """Isi file snapshot pipeline; dibaca ulang hanya bila mtime/ukuran berubah."""
+    try:
+        st = os.stat(SNAPSHOT_PATH)
+    except OSError:
+        snapshot_age.set(-1)
+        return ""
+    snapshot_age.set(round(time.time() - st.st_mtime, 3))
+    sig = (st.st_mtime_ns, st.st_size)
+    with _snapshot_lock:
+        if sig != _snapshot["sig"]:
+            try:
+                with open(SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+                    _snapshot["body"] = f.read()
+                _snapshot["sig"] = sig
+            except OSError:
+                pass
+        return _snapshot["body"]
+
+
+# ---------- /metrics (format teks Prometheus) ----------
+@bp.route("/metrics")
+def metrics():
+    """Metrik pipeline (snapshot dari progress.emit) + metrik HTTP dashboard."""
+    body = _pipeline_snapshot() + registry.render()
+    return Response(body, mimetype=None, content_type=CONTENT_TYPE)
@@ -1,20 +1,57 @@
 import os
 import time
-import gzip
-import lz4.frame
-import zstandard as zstd
-import brotli
-import snappy
 import shutil
-from tqdm import tqdm
+import importlib
 
 from config import ALGO_DISPLAY, EXT_TO_ID
 from utils import normalize_algo
 
+_CODEC_MODULES = {
+    "lz4": "lz4.frame",
+    "zstd": "zstandard",
+    "gzip": "gzip",
+    "brotli": "brotli",
+    "snappy": "snappy",
+}
+
+
+def _codec(algo):
+    """Modul codec di-import saat pertama dipakai, bukan saat modul ini di-import."""
+    return importlib.import_module(_CODEC_MODULES[algo])
+
+class _NoBar:
+    """Pengganti tqdm saat progress=False."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, n):
+        pass
+
 # ---------- BACKUP ----------
 
-def backup_file(path, algo, output_folder, original_hash, source_folder, chunk_size=4*1024*1024):
+def _level_kwargs(algo, level):
+    """Argumen level kompresi per codec (None = default library, snappy tanpa level)."""
+    if level is None or algo == "snappy":
+        return {}
+    return {
+        "lz4": {"compression_level": level},
+        "zstd": {"level": level},
+        "gzip": {"compresslevel": level},
+        "brotli": {"quality": level},
+    }[algo]
+
+
+def backup_file(path, algo, output_folder, original_hash, source_folder, chunk_size=4*1024*1024,
+                level=None, copy_original=True, progress=True):
+    """
+    level: level kompresi codec (None = default). copy_original/progress
+    bisa dimatikan (mis. bench_codecs.py) agar yang terukur hanya kompresi.
+    """
     algo = normalize_algo(algo)
+    codec = _codec(algo)
     relative_path = os.path.relpath(path, source_folder)
     
     # Folder untuk masing-masing algoritma
@@ -32,38 +69,43 @@ def backup_file(path, algo, output_folder, original_hash, source_folder, chunk_s
     os.makedirs(os.path.dirname(comp_path), exist_ok=True)
 
     # Salin file asli juga ke folder original
-    original_folder = os.path.join(output_folder, "original")
-    os.makedirs(os.path.dirname(os.path.join(original_folder, relative_path)), exist_ok=True)
-    shutil.copy2(path, os.path.join(original_folder, relative_path))
+    if copy_original:
+        original_folder = os.path.join(output_folder, "original")
+        os.makedirs(os.path.dirname(os.path.join(original_folder, relative_path)), exist_ok=True)
+        shutil.copy2(path, os.path.join(original_folder, relative_path))
 
     file_size = os.path.getsize(path)
-    print(f"[INFO] {time.strftime('%H:%M:%S')} - Mulai kompresi: {relative_path} ({file_size/1024/1024:.2f} MB) | Algo: {algo.upper()}")
+    if progress:
+        from tqdm import tqdm
+        print(f"[INFO] {time.strftime('%H:%M:%S')} - Mulai kompresi: {relative_path} ({file_size/1024/1024:.2f} MB) | Algo: {algo.upper()}")
+    kw = _level_kwargs(algo, level)
 
     start_time = time.time()
     total_bytes = 0
 
-    with open(path, 'rb') as fin, tqdm(total=file_size, unit='B', unit_scale=True, desc=f"[{algo.upper()}]") as pbar:
+    pbar_cm = tqdm(total=file_size, unit='B', unit_scale=True, desc=f"[{algo.upper()}]") if progress else _NoBar()
+    with open(path, 'rb') as fin, pbar_cm as pbar:
         if algo == 'lz4':
-            with lz4.frame.open(comp_path, mode='wb') as fout:
+            with codec.open(comp_path, mode='wb', **kw) as fout:
                 for chunk in iter(lambda: fin.read(chunk_size), b''):
                     fout.write(chunk)
                     total_bytes += len(chunk)
                     pbar.update(len(chunk))
         elif algo == 'zstd':
-            cctx = zstd.ZstdCompressor()
+            cctx = codec.ZstdCompressor(**kw)
             with open(comp_path, 'wb') as fout, cctx.stream_writer(fout) as compressor:
                 for chunk in iter(lambda: fin.read(chunk_size), b''):
                     compressor.write(chunk)
                     total_bytes += len(chunk)
                     pbar.update(len(chunk))
         elif algo == 'gzip':
-            with gzip.open(comp_path, 'wb') as fout:
+            with codec.open(comp_path, 'wb', **kw) as fout:
                 for chunk in iter(lambda: fin.read(chunk_size), b''):
                     fout.write(chunk)
                     total_bytes += len(chunk)
                     pbar.update(len(chunk))
         elif algo == 'brotli':
-            compressor = brotli.Compressor()
+            compressor = codec.Compressor(**kw)
             with open(comp_path, 'wb') as fout:
                 for chunk in iter(lambda: fin.read(chunk_size), b''):
                     fout.write(compressor.process(chunk))
@@ -73,12 +115,13 @@ def backup_file(path, algo, output_folder, original_hash, source_folder, chunk_s
         elif algo == 'snappy':
             with open(comp_path, 'wb') as fout:
                 for chunk in iter(lambda: fin.read(chunk_size), b''):
-                    fout.write(snappy.compress(chunk))
+                    fout.write(codec.compress(chunk))
                     total_bytes += len(chunk)
                     pbar.update(len(chunk))
 
     duration = time.time() - start_time
-    print(f"[DONE] {algo.upper()} selesai! {total_bytes/1024/1024:.2f} MB dibaca. Waktu: {duration:.2f} detik.\n")
+    if progress:
+        print(f"[DONE] {algo.upper()} selesai! {total_bytes/1024/1024:.2f} MB dibaca. Waktu: {duration:.2f} detik.\n")
 
     # Simpan hash untuk file kompresi
     with open(comp_path + ".hash", "w", encoding="utf-8") as hf:
@@ -111,30 +154,88 @@ def restore_file(comp_path, restore_folder, base_folder):
 
     algo_id = EXT_TO_ID[algo_ext]
 
-    # Ambil hanya nama file tanpa folder algoritma
-    file_name_only = os.path.splitext(os.path.basename(comp_path))[0]
+    # <base_folder>/AlgoName/<path>.<ext> -> restore_folder/AlgoName/<path>;
+    # artefak flat lama (tanpa folder algoritma) -> restore_folder/AlgoName/<nama>
+    rel = os.path.relpath(comp_path, base_folder).replace(os.sep, "/")
+    top, _, rest = rel.partition("/")
+    if top != ALGO_DISPLAY[algo_id] or not rest:
+        rest = os.path.basename(comp_path)
+    target_path = os.path.join(restore_folder, ALGO_DISPLAY[algo_id], *os.path.splitext(rest)[0].split("/"))
+    decompress_file(algo_id, comp_path, target_path)
+    return algo_id, target_path
+
 
-    # Simpan ke restore_folder/AlgoName/file_name_only
-    target_path = os.path.join(restore_folder, ALGO_DISPLAY[algo_id], file_name_only)
-    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+def decompress_file(algo_id, comp_path, target_path):
+    """Dekompres satu artefak backup ke target_path (dipakai restore penuh & selektif)."""
+    os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+    if algo_id not in _CODEC_MODULES:
+        raise ValueError(f"Algoritma {algo_id} tidak dikenali.")
+    codec = _codec(algo_id)
 
     if algo_id == "lz4":
-        with lz4.frame.open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
+        with codec.open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
             shutil.copyfileobj(fin, fout)
     elif algo_id == "zstd":
-        dctx = zstd.ZstdDecompressor()
+        dctx = codec.ZstdDecompressor()
         with open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
             dctx.copy_stream(fin, fout)
     elif algo_id == "gzip":
-        with gzip.open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
+        with codec.open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
             shutil.copyfileobj(fin, fout)
     elif algo_id == "brotli":
         with open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
-            import brotli as _brotli
-            fout.write(_brotli.decompress(fin.read()))
+            fout.write(codec.decompress(fin.read()))
     elif algo_id == "snappy":
         with open(comp_path, "rb") as fin, open(target_path, "wb") as fout:
-            import snappy as _snappy
-            fout.write(_snappy.decompress(fin.read()))
-
-    return algo_id, target_path
+            data = fin.read()
+            try:
+                fout.write(codec.decompress(data))      # artefak satu chunk
+            except Exception:
+                fout.seek(0)
+                fout.truncate()
+                for block in _snappy_blocks(data):      # beberapa raw block berurutan
+                    fout.write(codec.decompress(block))
+    return target_path
+
+
+def _snappy_blocks(data):
+    """
+    Pisahkan raw block snappy yang ditulis berurutan oleh backup_file (satu
+    codec.compress() per chunk, tanpa framing): panjang tiap block dicari dengan
+    membaca tag-nya sampai jumlah byte hasil = panjang yang ada di header block.
+    """
+    view = memoryview(data)
+    pos, n = 0, len(data)
+    while pos < n:
+        start = pos
+        length = shift = 0
+        while True:                      # varint panjang hasil dekompresi
+            b = data[pos]
+            pos += 1
+            length |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                break
+        out = 0
+        while out < length:
+            tag = data[pos]
+            kind = tag & 3
+            if kind == 0:                # literal
+                lit = tag >> 2
+                if lit < 60:
+                    pos += 1
+                else:
+                    extra = lit - 59
+                    lit = int.from_bytes(data[pos + 1:pos + 1 + extra], "little")
+                    pos += 1 + extra
+                pos += lit + 1
+                out += lit + 1
+            elif kind == 1:              # copy, offset 1 byte
+                out += ((tag >> 2) & 7) + 4
+                pos += 2
+            else:                        # copy, offset 2 / 4 byte
+                out += (tag >> 2) + 1
+                pos += 3 if kind == 2 else 5
+        if out != length or pos > n:
+            raise ValueError("Artefak snappy rusak (batas block tidak valid)")
+        yield view[start:pos]
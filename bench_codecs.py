@@ -0,0 +1,325 @@
+# bench_codecs.py
+"""
+Benchmark codec backup (backup_restore.backup_file / restore_file) dengan
+korpus sintetis deterministik.
+
+Korpus (ukuran dikali --scale, isi ditentukan --seed):
+  text        teks mirip bahasa alami           8 MB
+  csv         baris CSV sensor                  8 MB
+  compressed  blok gzip (sudah terkompresi)     8 MB
+  random      byte acak                         8 MB
+  small       1000 file kecil (teks/CSV)       ~4 MB
+  huge        2 file besar (CSV + blok acak)    2 x 32 MB
+Korpus disimpan di --workdir dan hanya dibuat ulang bila seed/scale berubah.
+
+Tiap kombinasi (korpus, codec, level) dijalankan di proses baru agar peak
+RSS & waktu CPU tidak tercampur: kompresi semua file lalu dekompresi +
+cek SHA-256. Hasil ditulis sebagai JSON; dengan --baseline hasil
+dibandingkan per kombinasi dan exit code 1 bila ada regresi.
+
+Contoh:
+    python bench_codecs.py --out codecs.json
+    python bench_codecs.py --scale 0.25 --codec zstd --level zstd=1,3,9
+    python bench_codecs.py --baseline codecs.json --tolerance 0.15
+"""
+import os, sys, json, gzip, time, random, shutil, hashlib, argparse, platform, tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+MB = 1024 * 1024
+CODECS = ["lz4", "zstd", "gzip", "brotli", "snappy"]
+LEVELS = {
+    "lz4": [0, 9],
+    "zstd": [1, 3, 9],
+    "gzip": [1, 6, 9],
+    "brotli": [1, 5, 9],
+    "snappy": [None],
+}
+CORPORA = ("text", "csv", "compressed", "random", "small", "huge")
+CORPUS_VERSION = 1
+WORDS = ("backup restore data file sistem enkripsi kompresi drive cloud hash sensor nilai waktu "
+         "jaringan server laporan status proses hasil uji algoritma blok rasio cepat aman").split()
+
+
+# ---------- korpus ----------
+def _text(rnd, size):
+    out, n = [], 0
+    while n < size:
+        line = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 16))).capitalize() + ".\n"
+        out.append(line)
+        n += len(line)
+    return "".join(out).encode("utf-8")[:size]
+
+
+def _csv(rnd, size):
+    out, n = ["id,timestamp,sensor,value,status\n"], 0
+    i = 0
+    while n < size:
+        row = f"{i},{1700000000 + i * 7},sensor_{rnd.randint(0, 63)},{rnd.gauss(50, 12):.4f},{rnd.choice(('OK', 'OK', 'OK', 'WARN', 'FAIL'))}\n"
+        out.append(row)
+        n += len(row)
+        i += 1
+    return "".join(out).encode("ascii")[:size]
+
+
+def _compressed(rnd, size):
+    out, n = [], 0
+    while n < size:
+        block = gzip.compress(_csv(rnd, 256 * 1024), compresslevel=6, mtime=0)
+        out.append(block)
+        n += len(block)
+    return b"".join(out)[:size]
+
+
+def _huge(rnd, size):
+    """Campuran blok CSV dan blok acak 1 MB (mirip dump/arsip campuran)."""
+    out, n = [], 0
+    while n < size:
+        out.append(_csv(rnd, MB) if rnd.random() < 0.7 else rnd.randbytes(MB))
+        n += MB
+    return b"".join(out)[:size]
+
+
+def corpus_files(name, seed, scale):
+    """Yield (nama_file, bytes) korpus secara deterministik."""
+    rnd = random.Random(f"{seed}:{name}")
+    size = max(4096, int(8 * MB * scale))
+    if name == "text":
+        yield "text.txt", _text(rnd, size)
+    elif name == "csv":
+        yield "data.csv", _csv(rnd, size)
+    elif name == "compressed":
+        yield "archive.bin.gz", _compressed(rnd, size)
+    elif name == "random":
+        yield "random.bin", rnd.randbytes(size)
+    elif name == "small":
+        for i in range(max(10, int(1000 * scale))):
+            n = rnd.randint(512, 8 * 1024)
+            if i % 2:
+                yield f"note_{i:05d}.txt", _text(rnd, n)
+            else:
+                yield f"rows_{i:05d}.csv", _csv(rnd, n)
+    elif name == "huge":
+        for i in range(2):
+            yield f"huge_{i}.bin", _huge(rnd, max(MB, int(32 * MB * scale)))
+    else:
+        raise ValueError(f"Korpus tidak dikenal: {name}")
+
+
+def prepare_corpora(workdir, names, seed, scale):
+    """Tulis korpus ke workdir/<nama>; dipakai ulang bila manifest cocok."""
+    info = {}
+    for name in names:
+        folder = os.path.join(workdir, "corpus", name)
+        manifest = os.path.join(folder, "_manifest.json")
+        key = {"version": CORPUS_VERSION, "seed": seed, "scale": scale}
+        if os.path.exists(manifest):
+            with open(manifest, "r", encoding="utf-8") as f:
+                m = json.load(f)
+            if m.get("key") == key:
+                info[name] = m["info"]
+                continue
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder)
+        h, files, total = hashlib.sha256(), 0, 0
+        for fname, data in corpus_files(name, seed, scale):
+            with open(os.path.join(folder, fname), "wb") as f:
+                f.write(data)
+            h.update(fname.encode() + b"\0" + data)
+            files += 1
+            total += len(data)
+        info[name] = {"files": files, "bytes": total, "sha256": h.hexdigest()}
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "info": info[name]}, f)
+        print(f"[BENCH] Korpus {name}: {files} file, {total / MB:.1f} MB")
+    return info
+
+
+# ---------- pengukuran (di proses anak) ----------
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (MB if sys.platform == "darwin" else 1024)   # macOS: byte, Linux: KB
+    except ImportError:
+        pass
+    try:
+        import psutil
+        mem = psutil.Process().memory_info()
+        return getattr(mem, "peak_wset", mem.rss) / MB
+    except ImportError:
+        return None
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(4 * MB), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def run_case(corpus_dir, codec, level, scratch):
+    """Satu kombinasi korpus/codec/level; dijalankan di proses baru."""
+    from backup_restore import backup_file, restore_file, _codec
+
+    files = sorted(f for f in os.listdir(corpus_dir) if not f.startswith("_"))
+    out_dir = os.path.join(scratch, "out")
+    restore_dir = os.path.join(scratch, "restore")
+    _codec(codec)                                 # import codec di luar pengukuran
+    rss_start = _peak_rss_mb()
+    res = {"files": len(files), "bytes_in": 0, "bytes_out": 0, "ok": True, "error": None}
+    try:
+        comp, t_comp = [], 0.0
+        cpu0 = time.process_time()
+        for fname in files:
+            src = os.path.join(corpus_dir, fname)
+            comp_path, dur = backup_file(src, codec, out_dir, "", source_folder=corpus_dir,
+                                         level=level, copy_original=False, progress=False)
+            comp.append((fname, comp_path))
+            t_comp += dur
+            res["bytes_in"] += os.path.getsize(src)
+            res["bytes_out"] += os.path.getsize(comp_path)
+        cpu_comp = time.process_time() - cpu0
+
+        t_dec, restored = 0.0, []
+        cpu0 = time.process_time()
+        for fname, comp_path in comp:
+            t0 = time.perf_counter()
+            restored.append((fname, restore_file(comp_path, restore_dir, out_dir)[1]))
+            t_dec += time.perf_counter() - t0
+        cpu_dec = time.process_time() - cpu0
+
+        for fname, path in restored:
+            if _sha256(path) != _sha256(os.path.join(corpus_dir, fname)):
+                res.update(ok=False, error=f"hash tidak cocok: {fname}")
+                break
+    except Exception as e:
+        res.update(ok=False, error=repr(e))
+        return res
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    mb_in = res["bytes_in"] / MB
+    res.update(
+        ratio=res["bytes_out"] / res["bytes_in"] if res["bytes_in"] else None,
+        compress_s=t_comp, decompress_s=t_dec,
+        compress_mb_s=mb_in / t_comp if t_comp > 0 else None,
+        decompress_mb_s=mb_in / t_dec if t_dec > 0 else None,
+        compress_cpu_s=cpu_comp, decompress_cpu_s=cpu_dec,
+        peak_rss_mb=_peak_rss_mb(),
+        rss_growth_mb=(_peak_rss_mb() - rss_start) if rss_start is not None else None,
+    )
+    return res
+
+
+# ---------- baseline ----------
+def compare(results, baseline, tolerance):
+    """Daftar regresi (teks) terhadap baseline, per (korpus, codec, level)."""
+    base = {(r["corpus"], r["codec"], r["level"]): r for r in baseline["results"]}
+    out = []
+    for r in results:
+        b = base.get((r["corpus"], r["codec"], r["level"]))
+        if not b or not b.get("ok"):
+            continue
+        label = f"{r['corpus']}/{r['codec']}@{r['level']}"
+        if not r["ok"]:
+            out.append(f"{label}: gagal ({r['error']})")
+            continue
+        for key in ("compress_mb_s", "decompress_mb_s"):
+            if b.get(key) and r.get(key) and r[key] < b[key] * (1 - tolerance):
+                out.append(f"{label}: {key} {r[key]:.1f} < baseline {b[key]:.1f}")
+        if b.get("ratio") and r["ratio"] > b["ratio"] * 1.01:
+            out.append(f"{label}: ratio {r['ratio']:.4f} > baseline {b['ratio']:.4f}")
+        if b.get("peak_rss_mb") and r.get("peak_rss_mb") and r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance):
+            out.append(f"{label}: peak RSS {r['peak_rss_mb']:.0f} MB > baseline {b['peak_rss_mb']:.0f} MB")
+    return out
+
+
+def _versions():
+    out = {}
+    for codec, mod in (("lz4", "lz4"), ("zstd", "zstandard"), ("brotli", "brotli"), ("snappy", "snappy")):
+        try:
+            out[codec] = getattr(__import__(mod), "__version__", None)
+        except ImportError:
+            out[codec] = None
+    import zlib
+    out["gzip"] = zlib.ZLIB_RUNTIME_VERSION
+    return out
+
+
+def _parse_levels(specs):
+    levels = dict(LEVELS)
+    for spec in specs or []:
+        codec, _, vals = spec.partition("=")
+        levels[codec] = [None if v in ("", "default") else int(v) for v in vals.split(",")]
+    return levels
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="bench_codecs.json", help="file JSON hasil")
+    ap.add_argument("--baseline", help="JSON hasil sebelumnya untuk dibandingkan")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="toleransi regresi throughput/RSS relatif")
+    ap.add_argument("--codec", action="append", choices=CODECS, help="codec (boleh diulang, default semua)")
+    ap.add_argument("--level", action="append", metavar="CODEC=L1,L2", help="override level, mis. zstd=1,3,19")
+    ap.add_argument("--corpus", action="append", choices=CORPORA, help="korpus (boleh diulang, default semua)")
+    ap.add_argument("--scale", type=float, default=1.0, help="pengali ukuran korpus")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "bench_codecs"))
+    args = ap.parse_args()
+
+    codecs = args.codec or CODECS
+    levels = _parse_levels(args.level)
+    names = args.corpus or list(CORPORA)
+    corpora = prepare_corpora(args.workdir, names, args.seed, args.scale)
+
+    results = []
+    ctx = mp.get_context("spawn")
+    for name in names:
+        corpus_dir = os.path.join(args.workdir, "corpus", name)
+        for codec in codecs:
+            for level in levels[codec]:
+                scratch = tempfile.mkdtemp(prefix=f"{name}_{codec}_", dir=args.workdir)
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                    r = ex.submit(run_case, corpus_dir, codec, level, scratch).result()
+                r = {"corpus": name, "codec": codec, "level": level, **r}
+                results.append(r)
+                if r["ok"]:
+                    print(f"{name:10s} {codec:6s} L{str(level):7s} ratio {r['ratio']:.4f} | "
+                          f"comp {r['compress_mb_s']:8.1f} MB/s ({r['compress_cpu_s']:.2f} s CPU) | "
+                          f"decomp {r['decompress_mb_s']:8.1f} MB/s ({r['decompress_cpu_s']:.2f} s CPU) | "
+                          f"peak RSS {r['peak_rss_mb']:.0f} MB")
+                else:
+                    print(f"{name:10s} {codec:6s} L{str(level):7s} GAGAL: {r['error']}")
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "seed": args.seed, "scale": args.scale,
+            "codec_versions": _versions(),
+        },
+        "corpora": corpora,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Hasil disimpan di {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        base_corpora = baseline.get("corpora", {})
+        if any(base_corpora.get(k) not in (None, v) for k, v in corpora.items()):
+            print("[BENCH] Peringatan: korpus berbeda dari baseline (seed/scale/versi), perbandingan tidak sebanding.")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESI] {line}")
+        if regressions:
+            sys.exit(1)
+        print("[BENCH] Tidak ada regresi terhadap baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# bench_importtime.py
+"""
+Benchmark & cek regresi waktu startup (python -X importtime).
+
+Tiap target dijalankan di interpreter baru beberapa kali; dicatat median
+waktu import kumulatif, wall-clock proses, dan modul terberat. Target gagal
+(exit code 1) bila:
+  - modul berat yang seharusnya lazy ikut ter-import (mis. numpy, matplotlib,
+    googleapiclient, codec) -- kecuali target yang memang butuh,
+  - waktu import melewati --budget-ms, atau
+  - lebih lambat dari --baseline (JSON hasil --json sebelumnya) melebihi --tolerance.
+
+Contoh:
+    python bench_importtime.py
+    python bench_importtime.py --json importtime.json
+    python bench_importtime.py --baseline importtime.json --tolerance 0.25
+"""
+import os, sys, json, time, argparse, tempfile, statistics, subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+LAZY = ("numpy", "matplotlib", "googleapiclient", "google_auth_oauthlib", "lz4", "zstandard",
+        "brotli", "snappy", "cryptography", "tqdm", "flask", "simulate", "simulate_header",
+        "simulate_corrupt")
+
+# nama -> (kode, modul yang boleh ter-import)
+TARGETS = {
+    "import main": ("import main", ()),
+    "main.py --help": (None, ()),
+    "import app": ("import app, app.event_index", ()),
+    "dashboard create_app": ("import app; app.create_app()", ("flask",)),
+    "import backup_restore": ("import backup_restore", ()),
+    "import selective_restore": ("import selective_restore", ()),
+}
+
+
+def parse_importtime(stderr):
+    """Baris 'import time: self | cumulative | name' -> (total_us top-level, {modul: cumulative_us})."""
+    mods, total = {}, 0
+    for line in stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        raw = parts[2].rstrip()
+        depth = (len(raw) - len(raw.lstrip()) - 1) // 2
+        cum = int(parts[1])
+        mods[raw.strip()] = cum
+        if depth == 0:   # modul top-level (diimpor langsung oleh kode target)
+            total += cum
+    return total, mods
+
+
+def run_target(code, env):
+    if code is None:
+        cmd = [sys.executable, "-X", "importtime", os.path.join(HERE, "main.py"), "--help"]
+    else:
+        cmd = [sys.executable, "-X", "importtime", "-c", code]
+    t0 = time.perf_counter()
+    res = subprocess.run(cmd, cwd=HERE, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - t0) * 1000.0
+    if res.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd[3:])} gagal:\n{res.stderr[-2000:]}")
+    total, mods = parse_importtime(res.stderr)
+    return total / 1000.0, wall, mods
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=500.0, help="batas waktu import kumulatif per target")
+    ap.add_argument("--top", type=int, default=5, help="jumlah modul terberat yang ditampilkan")
+    ap.add_argument("--json", help="simpan hasil ke file JSON")
+    ap.add_argument("--baseline", help="bandingkan dengan hasil JSON sebelumnya")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="toleransi regresi relatif terhadap baseline")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [HERE, env.get("PYTHONPATH")]))
+    # progress.py mengarsip log saat di-import: arahkan ke folder sementara
+    env["PROGRESS_LOG_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_importtime_"), "events.jsonl")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["targets"]
+
+    results, failures = {}, []
+    for name, (code, allowed) in TARGETS.items():
+        runs = [run_target(code, env) for _ in range(args.repeat)]
+        imp = statistics.median(r[0] for r in runs)
+        wall = statistics.median(r[1] for r in runs)
+        mods = runs[-1][2]
+        leaked = sorted({m.split(".")[0] for m in mods} & set(LAZY) - set(allowed))
+        heaviest = sorted(((c, m) for m, c in mods.items() if "." not in m), reverse=True)[:args.top]
+        results[name] = {"import_ms": round(imp, 1), "wall_ms": round(wall, 1), "leaked": leaked}
+
+        flag = []
+        if leaked:
+            flag.append(f"modul berat ter-import: {', '.join(leaked)}")
+        if imp > args.budget_ms:
+            flag.append(f"import {imp:.0f} ms > budget {args.budget_ms:.0f} ms")
+        base = baseline.get(name)
+        if base and imp > base["import_ms"] * (1 + args.tolerance):
+            flag.append(f"regresi vs baseline {base['import_ms']:.0f} ms")
+        if flag:
+            failures.append(name)
+
+        print(f"{name:26s} import {imp:7.1f} ms | wall {wall:7.1f} ms | "
+              f"{'GAGAL: ' + '; '.join(flag) if flag else 'OK'}")
+        print("    terberat: " + ", ".join(f"{m} {c / 1000:.0f}ms" for c, m in heaviest))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "targets": results}, f, indent=2)
+        print(f"[BENCH] Hasil disimpan di {args.json}")
+    if failures:
+        print(f"[BENCH] {len(failures)} target gagal: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# bench_pipeline.py
+"""
+Benchmark end-to-end pipeline main.py memakai Drive pengganti lokal (fake_drive).
+
+Korpus deterministik (dari bench_codecs) diunggah ke FakeDrive di workdir
+dengan latensi API & bandwidth yang bisa diatur, lalu main.main() dijalankan
+di proses baru per run (tanpa OAuth/jaringan, airgap jatuh ke fallback lokal).
+Waktu per stage diambil dari event stage() (<nama>_end.duration_ms) di log
+progress run tersebut, ditambah wall-clock proses dan statistik Drive
+(jumlah panggilan API, byte unduh/unggah). Run ke-2 dst. memakai Drive yang
+sama, jadi mengukur jalur "sudah ada di Drive" (upload dilewati bila identik).
+
+Contoh:
+    python bench_pipeline.py
+    python bench_pipeline.py --latency-ms 40 --bandwidth-mb-s 20 --scale 0.1 --runs 2
+    python bench_pipeline.py --json e2e.json
+    python bench_pipeline.py --baseline e2e.json --tolerance 0.25
+"""
+import os, sys, json, time, argparse, tempfile, subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FOLDER_ID = "fake-source-data"
+BACKUP_FOLDER_ID = "fake-backup-results"
+MIN_REGRESSION_MS = 50.0   # stage di bawah ini terlalu bising untuk dibandingkan
+
+
+def prepare_drive(workdir, corpora, seed, scale):
+    """Tulis korpus ke workdir/corpus/<korpus>/... lalu isi FakeDrive di workdir/drive."""
+    from bench_codecs import corpus_files
+    from fake_drive import FakeDrive
+
+    corpus_dir = os.path.join(workdir, "corpus")
+    for name in corpora:
+        d = os.path.join(corpus_dir, name)
+        os.makedirs(d, exist_ok=True)
+        for i, (fname, data) in enumerate(corpus_files(name, seed, scale)):
+            sub = os.path.join(d, f"part_{i // 100:02d}") if name == "small" else d
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, fname), "wb") as f:
+                f.write(data)
+
+    drive = FakeDrive(os.path.join(workdir, "drive"))
+    drive.create_folder("source data", folder_id=SOURCE_FOLDER_ID)
+    drive.create_folder("BackupResults", folder_id=BACKUP_FOLDER_ID)
+    count = drive.import_tree(corpus_dir, SOURCE_FOLDER_ID)
+    drive.save()
+    return count
+
+
+def child(cfg):
+    """Dijalankan di proses baru: main.main() dengan service Drive pengganti."""
+    import main
+    from fake_drive import FakeDrive
+
+    drive = FakeDrive(cfg["drive"], latency_ms=cfg["latency_ms"], bandwidth_mb_s=cfg["bandwidth_mb_s"])
+    main.SOURCE_FOLDER = cfg["source_folder"]
+    main.GDRIVE_RAW_FOLDER_ID = SOURCE_FOLDER_ID
+    main.GDRIVE_BACKUP_FOLDER_ID = BACKUP_FOLDER_ID
+    main.get_drive_service_oauth = lambda *a, **k: drive
+    try:
+        main.main(main.parse_args(cfg["argv"]))
+    finally:
+        drive.save()
+        with open(cfg["drive_stats"], "w", encoding="utf-8") as f:
+            json.dump(drive.stats, f)
+
+
+def stage_summary(log_path):
+    """{stage: {count, failed, total_ms, cpu_ms, mean_ms, p50_ms, p95_ms, max_ms}} + durasi pipeline (detik)."""
+    from stream_stats import Metric
+
+    metrics, failed, cpu, t_start, t_end = {}, {}, {}, None, None
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ev = json.loads(line)
+            name, data = ev.get("event", ""), ev.get("data") or {}
+            if name == "pipeline_start":
+                t_start = ev["ts"]
+            elif name == "pipeline_end":
+                t_end = ev["ts"]
+            elif name.endswith("_end") and "duration_ms" in data:
+                st = name[:-len("_end")]
+                metrics.setdefault(st, Metric()).add(float(data["duration_ms"]))
+                cpu[st] = cpu.get(st, 0.0) + (data.get("cpu_ms") or 0.0)
+                if data.get("ok") is False:
+                    failed[st] = failed.get(st, 0) + 1
+    out = {}
+    for st, m in metrics.items():
+        s = m.summary()
+        out[st] = {"count": m.n, "failed": failed.get(st, 0), "total_ms": round(m.mean * m.n, 1),
+                   "cpu_ms": round(cpu.get(st, 0.0), 1),
+                   "mean_ms": round(s["mean"], 2), "p50_ms": round(s["p50"], 2),
+                   "p95_ms": round(s["p95"], 2), "max_ms": round(s["max"], 2)}
+    pipeline_s = round(t_end - t_start, 3) if t_start and t_end else None
+    return out, pipeline_s
+
+
+def run_once(workdir, idx, args):
+    run_dir = os.path.join(workdir, f"run_{idx}")
+    os.makedirs(run_dir, exist_ok=True)
+    log_path = os.path.join(run_dir, "events.jsonl")
+    if os.path.exists(log_path):
+        os.remove(log_path)
+    cfg = {
+        "drive": os.path.join(workdir, "drive"),
+        "source_folder": os.path.join(workdir, "Data", "source_data"),
+        "latency_ms": args.latency_ms, "bandwidth_mb_s": args.bandwidth_mb_s or None,
+        "argv": ["--mode", args.mode] + [x for g in (args.restore_glob or []) for x in ("--restore-glob", g)],
+        "drive_stats": os.path.join(run_dir, "drive_stats.json"),
+    }
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [HERE, env.get("PYTHONPATH")]))
+    env.update({"PROGRESS_LOG_PATH": log_path, "PROGRESS_LOG_FORMAT": "jsonl", "MPLBACKEND": "Agg"})
+
+    t0 = time.perf_counter()
+    with open(os.path.join(run_dir, "stdout.log"), "w", encoding="utf-8") as out:
+        res = subprocess.run([sys.executable, os.path.abspath(__file__), "--_child", json.dumps(cfg)],
+                             cwd=run_dir, env=env, stdout=out, stderr=subprocess.STDOUT)
+    wall = time.perf_counter() - t0
+    if res.returncode != 0:
+        raise RuntimeError(f"Pipeline run {idx} gagal (exit {res.returncode}), lihat {run_dir}/stdout.log")
+
+    stages, pipeline_s = stage_summary(log_path)
+    with open(cfg["drive_stats"], "r", encoding="utf-8") as f:
+        drive = json.load(f)
+    return {"wall_s": round(wall, 3), "pipeline_s": pipeline_s, "drive": drive, "stages": stages}
+
+
+def print_run(idx, r):
+    d = r["drive"]
+    print(f"[BENCH] run {idx}: wall {r['wall_s']:.2f}s | pipeline {r['pipeline_s'] or 0:.2f}s | "
+          f"Drive {d['calls']} panggilan ({d.get('batches', 0)} batch), unduh {d['bytes_down'] / 1048576:.1f} MB, "
+          f"unggah {d['bytes_up'] / 1048576:.1f} MB")
+    print(f"    {'stage':30s} {'n':>5s} {'total ms':>10s} {'cpu ms':>10s} {'%':>6s} {'p50':>8s} {'p95':>8s} {'max':>8s}")
+    base = (r["pipeline_s"] or r["wall_s"]) * 1000.0
+    for name, s in sorted(r["stages"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        fail = f"  ({s['failed']} gagal)" if s["failed"] else ""
+        print(f"    {name:30s} {s['count']:5d} {s['total_ms']:10.1f} {s['cpu_ms']:10.1f} {100 * s['total_ms'] / base:5.1f}% "
+              f"{s['p50_ms']:8.1f} {s['p95_ms']:8.1f} {s['max_ms']:8.1f}{fail}")
+
+
+def compare(runs, baseline, tolerance):
+    """Daftar regresi total_ms per stage (run pertama) terhadap baseline."""
+    if not baseline.get("runs"):
+        return []
+    cur, old = runs[0]["stages"], baseline["runs"][0]["stages"]
+    out = []
+    for name, s in cur.items():
+        b = old.get(name)
+        if b and s["total_ms"] > MIN_REGRESSION_MS and s["total_ms"] > b["total_ms"] * (1 + tolerance):
+            out.append(f"{name}: {b['total_ms']:.0f} -> {s['total_ms']:.0f} ms")
+    return out
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--_child":
+        child(json.loads(sys.argv[2]))
+        return
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default="text,csv,small", help="korpus bench_codecs, dipisah koma")
+    ap.add_argument("--scale", type=float, default=0.05, help="skala ukuran korpus (1.0 = ukuran penuh)")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="latensi per panggilan API Drive")
+    ap.add_argument("--bandwidth-mb-s", type=float, default=0.0, help="bandwidth transfer media (0 = tanpa batas)")
+    ap.add_argument("--mode", default="normal", choices=("normal", "wannacry", "headercorrupt", "corrupt"))
+    ap.add_argument("--restore-glob", action="append", default=None, metavar="POLA")
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--workdir", help="folder kerja (default: folder sementara baru)")
+    ap.add_argument("--json", help="simpan hasil ke file JSON")
+    ap.add_argument("--baseline", help="bandingkan dengan hasil JSON sebelumnya")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="bench_pipeline_"))
+    if os.path.exists(os.path.join(workdir, "drive")):
+        raise SystemExit(f"[BENCH] {workdir} sudah berisi Drive dari bench sebelumnya; pakai workdir baru.")
+    os.makedirs(workdir, exist_ok=True)
+    corpora = [c.strip() for c in args.corpus.split(",") if c.strip()]
+    n = prepare_drive(workdir, corpora, args.seed, args.scale)
+    print(f"[BENCH] {n} file di FakeDrive ({workdir}), latensi {args.latency_ms} ms, "
+          f"bandwidth {args.bandwidth_mb_s or 'tanpa batas'} MB/s")
+
+    runs = []
+    for i in range(1, args.runs + 1):
+        runs.append(run_once(workdir, i, args))
+        print_run(i, runs[-1])
+
+    if args.json:
+        result = {"python": sys.version.split()[0], "files": n,
+                  "config": {k: getattr(args, k) for k in ("corpus", "scale", "seed", "latency_ms",
+                                                          "bandwidth_mb_s", "mode", "restore_glob")},
+                  "runs": runs}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"[BENCH] Hasil disimpan di {args.json}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(runs, json.load(f), args.tolerance)
+        if regressions:
+            print("[BENCH] Regresi: " + "; ".join(regressions))
+            sys.exit(1)
+        print("[BENCH] Tidak ada regresi terhadap baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_summary.py
+"""
+Benchmark /api/summary dengan log event sintetis (default 100k file).
+
+Contoh:
+    python bench_summary.py --files 100000
+"""
+import os, json, time, random, argparse, tempfile
+
+ALGOS = ["lz4", "zstd", "gzip", "brotli", "snappy"]
+DISPLAY = {"lz4": "LZ4", "zstd": "ZSTD", "gzip": "GZIP", "brotli": "Brotli", "snappy": "Snappy"}
+
+
+def generate_log(path, n_files, seed=0):
+    """Tulis log mirip pipeline nyata: hash_original + backup_result + restore_validated per file."""
+    rnd = random.Random(seed)
+    ts = time.time() - n_files
+    with open(path, "w", encoding="utf-8") as f:
+        def w(event, **data):
+            nonlocal ts
+            ts += 0.0001
+            f.write(json.dumps({"ts": ts, "event": event, "data": data}) + "\n")
+
+        w("pipeline_start")
+        for i in range(n_files):
+            rel = f"dir{i % 100}/file_{i}.csv"
+            sha = "%064x" % rnd.getrandbits(256)
+            w("hash_original", file=rel, sha256=sha, size=rnd.randint(1, 1 << 20))
+            for a in ALGOS:
+                w("backup_result", file=rel, algo=a, size_in=1, size_out=1,
+                  ratio=rnd.random(), duration_ms=rnd.random())
+        for i in range(n_files):
+            rel = f"file_{i}.csv"
+            for a in ALGOS:
+                w("restore_validated", file=f"{DISPLAY[a]}/{rel}", algo=DISPLAY[a],
+                  ok=True, sha_in="x", sha_out="x")
+        w("pipeline_end")
+
+
+def _ms(t0):
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_summary_")
+    log_path = os.path.join(tmp, "progress_events.jsonl")
+    t0 = time.perf_counter()
+    generate_log(log_path, args.files)
+    print(f"[BENCH] Log sintetis {args.files} file: {os.path.getsize(log_path)/1024/1024:.1f} MB ({_ms(t0):.0f} ms)")
+
+    # indeks membaca PROGRESS_LOG_PATH saat import
+    os.environ["PROGRESS_LOG_PATH"] = log_path
+    from app.event_index import EventIndex, LogFollower
+    idx = EventIndex(LogFollower(log_path))
+
+    t0 = time.perf_counter()
+    idx.refresh()
+    print(f"[BENCH] Indeks awal (parse log sekali):      {_ms(t0):9.1f} ms")
+
+    t0 = time.perf_counter()
+    idx.summary_body()
+    print(f"[BENCH] Build summary pertama:               {_ms(t0):9.1f} ms")
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        idx.refresh()
+        idx.summary_body()
+    print(f"[BENCH] Summary tanpa event baru (cache):    {_ms(t0)/args.repeat:9.3f} ms/request")
+
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"ts": time.time(), "event": "backup_result",
+                            "data": {"file": "dir0/file_0.csv", "algo": "lz4", "ratio": 0.5, "duration_ms": 1}}) + "\n")
+    t0 = time.perf_counter()
+    idx.refresh()
+    idx.summary_body()
+    print(f"[BENCH] Summary setelah 1 event baru:        {_ms(t0):9.1f} ms")
+
+    import app.event_index as event_index
+    from app import create_app
+    event_index._index = idx
+    client = create_app().test_client()
+    client.get("/api/summary")
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        r = client.get("/api/summary")
+    print(f"[BENCH] GET /api/summary (200, cache):       {_ms(t0)/args.repeat:9.3f} ms/request ({len(r.data)/1024/1024:.1f} MB)")
+    etag = r.headers.get("ETag")
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        r = client.get("/api/summary", headers={"If-None-Match": etag})
+    print(f"[BENCH] GET /api/summary (304, If-None-Match): {_ms(t0)/args.repeat:7.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# change_stats.py
+"""
+Statistik perubahan antar run backup untuk mendeteksi enkripsi massal.
+
+State per file & per folder disimpan di array ringkas (modul `array`),
+bukan dict bertingkat: satu dict path -> nomor baris, sisanya kolom
+bertipe tetap. Untuk 1 juta file, kolom numerik hanya ~28 byte/file.
+
+Selama run berjalan, observe_hash()/observe_ratio() mengembalikan daftar
+anomali baru (masing-masing sekali per run/folder) bila:
+  - fraksi file berubah di run ini melonjak dibanding baseline run sebelumnya,
+  - fraksi file berubah dalam satu folder melonjak dibanding baseline folder,
+  - fraksi file yang rasio kompresinya naik tajam (isi jadi acak) melonjak.
+end_run() memperbarui baseline (EWMA) lalu menyimpan state ke disk.
+"""
+import os
+import json
+import math
+import struct
+from array import array
+
+MAGIC = b"CHST"
+VERSION = 1
+ALPHA = 0.3                 # bobot EWMA baseline
+MIN_RUN_FILES = 50          # minimal file berbaseline sebelum fraksi run dinilai
+MIN_FOLDER_FILES = 20       # minimal file berbaseline per folder
+RUN_FRACTION_MIN = 0.3      # fraksi berubah minimum agar dianggap lonjakan
+FOLDER_FRACTION_MIN = 0.5
+SIGMA = 4.0                 # batas = mean + SIGMA * std baseline
+RATIO_DRIFT_ABS = 0.25      # kenaikan rasio (size_out/size_in) per file yang dianggap drift
+_HDR_LEN = struct.Struct("<I")
+
+
+def _sha_key(sha256_hex: str) -> int:
+    """64 bit pertama hash; 0 dicadangkan untuk 'belum ada'."""
+    return int(sha256_hex[:16], 16) or 1
+
+
+class _Baseline:
+    """Rata-rata & varians EWMA untuk satu metrik tingkat run."""
+    def __init__(self, mean=0.0, var=0.0, n=0):
+        self.mean, self.var, self.n = mean, var, n
+
+    def limit(self, floor):
+        if self.n == 0:
+            return max(floor, 0.5)
+        return max(floor, self.mean + SIGMA * math.sqrt(self.var))
+
+    def update(self, x):
+        if self.n == 0:
+            self.mean, self.var = x, 0.0
+        else:
+            d = x - self.mean
+            self.mean += ALPHA * d
+            self.var = (1 - ALPHA) * (self.var + ALPHA * d * d)
+        self.n += 1
+
+    def to_json(self):
+        return {"mean": self.mean, "var": self.var, "n": self.n}
+
+
+class ChangeStats:
+    def __init__(self, path=None):
+        self.path = path
+        self.runs = 0
+        self.rate = _Baseline()          # fraksi file berubah per run
+        self.drift = _Baseline()         # fraksi file dengan drift rasio per run
+        # --- per file ---
+        self._row = {}
+        self.paths = []
+        self.sha = array("Q")            # hash run terakhir yang diterima (0 = belum ada)
+        self.ratio = array("f")          # EWMA rasio kompresi (0 = belum ada)
+        self.folder = array("I")
+        self.cur_sha = array("Q")        # hash run berjalan (0 = belum terlihat)
+        self.cur_ratio = array("f")      # rasio run berjalan (-1 = belum ada)
+        # --- per folder ---
+        self._frow = {}
+        self.folders = []
+        self.f_rate = array("f")         # EWMA fraksi berubah per folder
+        self.f_runs = array("I")
+        self.f_seen = array("I")
+        self.f_changed = array("I")
+        self.f_flagged = bytearray()
+        if path and os.path.exists(path):
+            self._load(path)
+        self.begin_run()
+
+    # ---------- baris ----------
+    def _folder_row(self, folder):
+        i = self._frow.get(folder)
+        if i is None:
+            i = self._frow[folder] = len(self.folders)
+            self.folders.append(folder)
+            self.f_rate.append(0.0)
+            self.f_runs.append(0)
+            self.f_seen.append(0)
+            self.f_changed.append(0)
+            self.f_flagged.append(0)
+        return i
+
+    def _file_row(self, rel):
+        i = self._row.get(rel)
+        if i is None:
+            i = self._row[rel] = len(self.paths)
+            self.paths.append(rel)
+            self.sha.append(0)
+            self.ratio.append(0.0)
+            self.folder.append(self._folder_row(os.path.dirname(rel.replace("\\", "/"))))
+            self.cur_sha.append(0)
+            self.cur_ratio.append(-1.0)
+        return i
+
+    # ---------- run ----------
+    def begin_run(self):
+        n = len(self.paths)
+        self.cur_sha = array("Q", bytes(8 * n))
+        self.cur_ratio = array("f", [-1.0]) * n
+        m = len(self.folders)
+        self.f_seen = array("I", bytes(4 * m))
+        self.f_changed = array("I", bytes(4 * m))
+        self.f_flagged = bytearray(m)
+        self.seen = self.changed = 0
+        self.drift_seen = self.drifted = 0
+        self.flagged = set()
+
+    def observe_hash(self, rel, sha256_hex):
+        """Catat hash file pada run ini; return daftar anomali baru."""
+        i = self._file_row(rel)
+        key = _sha_key(sha256_hex)
+        self.cur_sha[i] = key
+        prev = self.sha[i]
+        if prev == 0:
+            return []               # file baru: belum ada baseline
+        changed = prev != key
+        f = self.folder[i]
+        self.seen += 1
+        self.f_seen[f] += 1
+        if changed:
+            self.changed += 1
+            self.f_changed[f] += 1
+
+        out = []
+        if "change_rate" not in self.flagged and self.seen >= MIN_RUN_FILES:
+            frac = self.changed / self.seen
+            limit = self.rate.limit(RUN_FRACTION_MIN)
+            if frac > limit:
+                self.flagged.add("change_rate")
+                out.append({"scope": "run", "metric": "change_rate", "fraction": round(frac, 4),
+                            "limit": round(limit, 4), "changed": self.changed, "seen": self.seen})
+        if changed and not self.f_flagged[f] and self.f_seen[f] >= MIN_FOLDER_FILES:
+            frac = self.f_changed[f] / self.f_seen[f]
+            limit = max(FOLDER_FRACTION_MIN, self.f_rate[f] + 0.3) if self.f_runs[f] else max(FOLDER_FRACTION_MIN, 0.7)
+            if frac > limit:
+                self.f_flagged[f] = 1
+                out.append({"scope": "folder", "metric": "change_rate", "folder": self.folders[f],
+                            "fraction": round(frac, 4), "limit": round(limit, 4),
+                            "changed": self.f_changed[f], "seen": self.f_seen[f]})
+        return out
+
+    def observe_ratio(self, rel, ratio):
+        """Catat rasio kompresi (rata-rata antar algoritma) file pada run ini."""
+        i = self._file_row(rel)
+        self.cur_ratio[i] = ratio
+        base = self.ratio[i]
+        if base <= 0:
+            return []
+        self.drift_seen += 1
+        if ratio - base > RATIO_DRIFT_ABS:
+            self.drifted += 1
+        if "ratio_drift" in self.flagged or self.drift_seen < MIN_RUN_FILES:
+            return []
+        frac = self.drifted / self.drift_seen
+        limit = self.drift.limit(RUN_FRACTION_MIN)
+        if frac <= limit:
+            return []
+        self.flagged.add("ratio_drift")
+        return [{"scope": "run", "metric": "ratio_drift", "fraction": round(frac, 4),
+                 "limit": round(limit, 4), "drifted": self.drifted, "seen": self.drift_seen}]
+
+    def end_run(self):
+        """
+        Perbarui baseline dengan hasil run ini lalu simpan. Bila run ditandai
+        anomali, baseline & hash lama dipertahankan agar tidak 'belajar'
+        dari serangan (hanya file baru yang ditambahkan).
+        """
+        anomalous = bool(self.flagged) or any(self.f_flagged)
+        for i in range(len(self.paths)):
+            cur = self.cur_sha[i]
+            if cur and (self.sha[i] == 0 or not anomalous):
+                self.sha[i] = cur
+            r = self.cur_ratio[i]
+            if r >= 0 and (self.ratio[i] <= 0 or not anomalous):
+                self.ratio[i] = r if self.ratio[i] <= 0 else self.ratio[i] + ALPHA * (r - self.ratio[i])
+        if not anomalous:
+            if self.seen:
+                self.rate.update(self.changed / self.seen)
+            if self.drift_seen:
+                self.drift.update(self.drifted / self.drift_seen)
+            for f in range(len(self.folders)):
+                if self.f_seen[f]:
+                    x = self.f_changed[f] / self.f_seen[f]
+                    self.f_rate[f] = x if self.f_runs[f] == 0 else self.f_rate[f] + ALPHA * (x - self.f_rate[f])
+                    self.f_runs[f] += 1
+        self.runs += 1
+        if self.path:
+            self.save(self.path)
+        self.begin_run()
+
+    # ---------- persistensi ----------
+    def save(self, path):
+        """Header JSON + daftar path/folder + kolom array mentah (endianness mesin)."""
+        paths = "\n".join(self.paths).encode("utf-8")
+        folders = "\n".join(self.folders).encode("utf-8")
+        header = json.dumps({
+            "version": VERSION, "runs": self.runs,
+            "rate": self.rate.to_json(), "drift": self.drift.to_json(),
+            "n_files": len(self.paths), "n_folders": len(self.folders),
+            "paths_len": len(paths), "folders_len": len(folders),
+        }).encode("utf-8")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + _HDR_LEN.pack(len(header)) + header + paths + folders)
+            for col in (self.sha, self.ratio, self.folder, self.f_rate, self.f_runs):
+                col.tofile(f)
+        os.replace(tmp, path)
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Bukan file change stats: {path}")
+            (hlen,) = _HDR_LEN.unpack(f.read(_HDR_LEN.size))
+            h = json.loads(f.read(hlen))
+            if h.get("version") != VERSION:
+                raise ValueError(f"Versi change stats tidak didukung: {h.get('version')}")
+            n, m = h["n_files"], h["n_folders"]
+            paths = f.read(h["paths_len"]).decode("utf-8")
+            folders = f.read(h["folders_len"]).decode("utf-8")
+            self.paths = paths.split("\n") if n else []
+            self.folders = folders.split("\n") if m else []
+            for col, count in ((self.sha, n), (self.ratio, n), (self.folder, n), (self.f_rate, m), (self.f_runs, m)):
+                col.fromfile(f, count)
+        self.runs = h["runs"]
+        self.rate = _Baseline(**h["rate"])
+        self.drift = _Baseline(**h["drift"])
+        self._row = {p: i for i, p in enumerate(self.paths)}
+        self._frow = {p: i for i, p in enumerate(self.folders)}
@@ -17,9 +17,23 @@ EXT_TO_ID = {
 
 HASH_FILE = "hash_storage.json"
 EVAL_FILE = "evaluation_results.json"
+EVAL_STATS_FILE = "evaluation_stats.bin"      # statistik streaming per codec run ini (stream_stats.py)
+EVAL_HISTORY_FILE = "evaluation_history.bin"  # akumulator lintas run (di folder Data)
+EVAL_PER_FILE = "per_file_results.jsonl"   # data store hasil per file (sumber grafik report.py)
+ALERT_DB_FILE = "ransomware_alerts.sqlite3"          # store alert deteksi (di folder Data)
+ALERT_CSV_FILE = "ransomware_detected_files.csv"     # ekspor/legacy CSV
 AIRGAP_FOLDER_NAME = "airgapped_storage"
 SIMULATED_ATTACK_FOLDER = "backup_results"
 EVALUATION_FOLDER_NAME = "evaluation"
+GENERATIONS_FOLDER_NAME = "generations"   # generasi backup berversi (generations.py), tidak ikut dibersihkan
+
+# Retensi GFS generasi backup
+GEN_RETENTION = {
+    "keep_last": 3,
+    "keep_daily": 7,
+    "keep_weekly": 4,
+    "keep_monthly": 12,
+}
 
 AIRGAP_DRIVE_LETTER = "G"
 AIRGAP_VHDX_PATH = r"D:\PENS 2025\Semester 6\Kegiatan Nafisah\PROJECT TA\Data\BackupSystemRestore\Data\AirgaStorage.vhdx"
@@ -37,10 +51,30 @@ EXCLUDE_WHEN_SYNC = {
     AIRGAP_FOLDER_NAME,
     SIMULATED_ATTACK_FOLDER,
     EVALUATION_FOLDER_NAME,
+    GENERATIONS_FOLDER_NAME,
     "backup_results",
     "restore_results",
 }
 
+# Urutan codec saat restore selektif (selective_restore.py): dekompresi tercepat dulu
+RESTORE_CODEC_PREFERENCE = ["lz4", "zstd", "snappy", "gzip", "brotli"]
+RESTORE_CACHE_BUDGET_MB = 4096   # batas disk cache restore Drive (LRU); 0 = tanpa batas
+DRIVE_FOLDER_MAP_FILE = "drive_folder_map.json"   # peta path folder lokal -> id folder Drive (drive_tree.py)
+
+# ---- Grafik evaluasi (report.py) ----
+PLOT_MODE = "post"         # "post" (setelah run) | "background" (thread latar) | "off"
+PLOT_PER_FILE = True       # grafik PNG per file; False = hanya summary.png
+PLOT_SHOW = False          # True = buka jendela tabel hash (plt.show) di akhir restore
+
+# ---- Deteksi ransomware berbasis isi (ransom_detector.py) ----
+DETECTOR_ENABLED = True    # entropi + chi-square + magic byte saat hashing, sebelum backup
+CHANGE_STATS_FILE = "change_stats.bin"   # baseline laju perubahan antar run (change_stats.py)
+
+# ---- Simulasi serangan (sim_executor.py) ----
+SIM_WORKERS = 8            # jumlah thread per simulasi
+SIM_FILES_PER_S = None     # laju target file/detik (None = tanpa batas)
+SIM_MB_PER_S = None        # laju target MB/detik (None = tanpa batas)
+
 # ---- Google Drive ----
 CLOUD_UPLOAD_ENABLED = True
 
@@ -56,4 +90,14 @@ GDRIVE_RAW_FOLDER_ID    = "1Q603DmHehooE1JV6Xhe36qLU3oLdYZN3"
 
 # Scope: tambah readonly agar bisa list/download file yang bukan dibuat app
 GDRIVE_SCOPES = ["https://www.googleapis.com/auth/drive"]
+
+# Klien Drive (drive_client.py / drive_tree.py)
+DRIVE_HTTP_TIMEOUT_S = 60        # timeout socket transport httplib2 per thread
+DRIVE_BATCH_SIZE = 100           # request metadata per batch HTTP (batas Drive: 100)
+DRIVE_PAGE_SIZE = 1000           # item per halaman files().list (maks Drive; default API hanya 100)
+DRIVE_RESUMABLE_MIN_MB = 5       # file lebih kecil diunggah multipart (1 request), bukan resumable (2+)
+# Opt-in: satu update metadata (kena kuota) per artefak identik setiap run
+DRIVE_REFRESH_DESCRIPTIONS = False  # artefak identik (tidak diunggah ulang) diberi description "verified <waktu>"
+# Opt-in: file sumber yang terhapus/dikosongkan ikut kehilangan backup Drive-nya
+DRIVE_TRASH_ORPHANS = False      # artefak di Drive tanpa pasangan lokal dipindah ke trash (tidak saat run mencurigakan)
 # ============================================
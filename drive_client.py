@@ -0,0 +1,85 @@
+# drive_client.py
+"""
+Lapisan klien Google Drive: transport per thread + batch request metadata.
+
+DriveClient membungkus service Drive v3 dengan satu httplib2.Http (lewat
+google_auth_httplib2.AuthorizedHttp) per thread. httplib2 menyimpan koneksi
+keep-alive per host, jadi TLS handshake hanya terjadi sekali per thread;
+objek Http tidak thread-safe, karena itu tiap worker mendapat transport &
+service sendiri (dibuat saat pertama dipakai, discovery statis tanpa
+request jaringan). Credentials dipakai bersama.
+
+execute_batch() mengirim banyak request metadata (list, update description,
+trash orphan) sebagai batch HTTP Drive: maks DRIVE_BATCH_SIZE request per
+round-trip. Service tanpa new_batch_http_request() dijalankan satu per satu.
+"""
+import threading
+
+from config import DRIVE_BATCH_SIZE, DRIVE_HTTP_TIMEOUT_S
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+
+class DriveClient:
+    """Pengganti objek dari build("drive", "v3"): files()/new_batch_http_request() memakai service milik thread pemanggil."""
+    def __init__(self, credentials, timeout=DRIVE_HTTP_TIMEOUT_S):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.transports = 0
+
+    def _service(self):
+        svc = getattr(self._local, "service", None)
+        if svc is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            svc = self._local.service = build("drive", "v3", http=http, cache_discovery=False)
+            with self._lock:
+                self.transports += 1
+                n = self.transports
+            emit("drive_transport_created", thread=threading.current_thread().name, transports=n)
+        return svc
+
+    def files(self):
+        return self._service().files()
+
+    def new_batch_http_request(self, callback=None):
+        return self._service().new_batch_http_request(callback=callback)
+
+
+def execute_batch(service, requests, op="batch", batch_size=DRIVE_BATCH_SIZE):
+    """
+    Jalankan [(key, request)] sebagai batch HTTP. Return {key: (response, exception)};
+    kegagalan per request tidak menghentikan request lain dalam batch.
+    """
+    results = {}
+    batched = hasattr(service, "new_batch_http_request") and len(requests) > 1
+    if not batched:
+        # satu request (atau service tanpa batch): kirim langsung, tanpa overhead multipart
+        for key, req in requests:
+            try:
+                results[key] = (req.execute(), None)
+            except Exception as e:
+                results[key] = (None, e)
+        return results
+    for i in range(0, len(requests), batch_size):
+        chunk = requests[i:i + batch_size]
+        keys = {str(j): key for j, (key, _) in enumerate(chunk)}
+
+        def callback(request_id, response, exception, keys=keys):
+            results[keys[request_id]] = (response, exception)
+
+        batch = service.new_batch_http_request(callback=callback)
+        for j, (_, req) in enumerate(chunk):
+            batch.add(req, request_id=str(j))
+        batch.execute()
+    emit("gdrive_batch", op=op, count=len(requests), round_trips=-(-len(requests) // batch_size),
+         failed=sum(1 for _, exc in results.values() if exc is not None))
+    return results
@@ -0,0 +1,307 @@
+# drive_tree.py
+"""
+Struktur folder di Google Drive: upload hierarkis & listing rekursif.
+
+upload_tree() mengunggah folder lokal (mis. backup_results/<Algo>/<path>)
+dengan struktur yang sama di bawah folder Drive tujuan, jadi file bernama
+sama di folder berbeda tidak lagi saling menimpa. Id folder Drive disimpan
+di DriveFolderMap (JSON lokal, dipakai ulang antar run); folder yang belum
+ada dibuat per tingkat kedalaman, dengan satu query gabungan per tingkat
+untuk memakai folder yang sudah ada di Drive. Isi folder yang sudah ada
+juga dilist secara gabungan ('a' in parents or 'b' in parents ...), bukan
+satu lookup per file, dan dikirim sebagai batch HTTP (drive_client.py)
+bersama update description artefak identik & trash artefak orphan.
+walk() menelusuri folder Drive secara rekursif.
+"""
+import os
+import json
+import hashlib
+
+from config import DRIVE_PAGE_SIZE, DRIVE_RESUMABLE_MIN_MB
+from drive_client import execute_batch
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+PARENTS_PER_QUERY = 40      # batas klausa 'x' in parents per query gabungan
+ITEM_FIELDS = "id,name,mimeType,md5Checksum,size,parents"
+
+
+def media_upload(service, local_file_path):
+    """Media body untuk create/update; service pengganti (fake_drive) boleh menyediakan sendiri."""
+    if hasattr(service, "media_upload"):
+        return service.media_upload(local_file_path)
+    from googleapiclient.http import MediaFileUpload
+    resumable = os.path.getsize(local_file_path) >= DRIVE_RESUMABLE_MIN_MB * 1024 * 1024
+    return MediaFileUpload(local_file_path, resumable=resumable)
+
+
+def is_not_found(exc):
+    """HttpError 404 (googleapiclient) atau error setara dari service pengganti."""
+    status = getattr(getattr(exc, "resp", None), "status", None) or getattr(exc, "status", None)
+    return str(status) == "404"
+
+
+def query(service, q, fields=ITEM_FIELDS):
+    page_token = None
+    while True:
+        resp = service.files().list(q=q, fields=f"nextPageToken, files({fields})",
+                                    pageSize=DRIVE_PAGE_SIZE, pageToken=page_token).execute()
+        yield from resp.get("files", [])
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def list_children(service, folder_id):
+    yield from query(service, f"'{folder_id}' in parents and trashed=false")
+
+
+def list_children_bulk(service, parent_ids, folders_only=False, fields=ITEM_FIELDS):
+    """
+    {parent_id: [item, ...]} untuk banyak folder sekaligus: satu query per
+    PARENTS_PER_QUERY folder, semua query (dan halaman lanjutannya) dikirim batch.
+    """
+    parent_ids = list(dict.fromkeys(parent_ids))
+    out = {pid: [] for pid in parent_ids}
+    kind = f" and mimeType='{FOLDER_MIME}'" if folders_only else ""
+    pending = {}
+    for i in range(0, len(parent_ids), PARENTS_PER_QUERY):
+        parents = " or ".join(f"'{pid}' in parents" for pid in parent_ids[i:i + PARENTS_PER_QUERY])
+        pending[f"({parents}) and trashed=false{kind}"] = None
+    while pending:
+        requests = [(q, service.files().list(q=q, fields=f"nextPageToken, files({fields})",
+                                             pageSize=DRIVE_PAGE_SIZE, pageToken=token))
+                    for q, token in pending.items()]
+        pending = {}
+        for q, (resp, exc) in execute_batch(service, requests, op="list").items():
+            if exc is not None:
+                raise exc
+            for item in resp.get("files", []):
+                for pid in item.get("parents", []):
+                    if pid in out:
+                        out[pid].append(item)
+            if resp.get("nextPageToken"):
+                pending[q] = resp["nextPageToken"]
+    return out
+
+
+def walk(service, root_folder_id, prefix=""):
+    """Yield (rel_path dengan '/', item) untuk semua file di bawah root (rekursif)."""
+    yield from walk_many(service, {root_folder_id: prefix})
+
+
+def walk_many(service, roots):
+    """Seperti walk() untuk beberapa folder {id: prefix} sekaligus; listing per tingkat, digabung."""
+    level = dict(roots)
+    while level:
+        children = list_children_bulk(service, list(level))
+        nxt = {}
+        for fid, pfx in level.items():
+            for item in children[fid]:
+                rel = f"{pfx}/{item['name']}" if pfx else item["name"]
+                if item.get("mimeType") == FOLDER_MIME:
+                    nxt[item["id"]] = rel
+                else:
+                    yield rel, item
+        level = nxt
+
+
+def _parent(rel_dir):
+    return rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else ""
+
+
+def with_ancestors(rel_dirs):
+    """{'a/b'} -> {'', 'a', 'a/b'}."""
+    out = {""}
+    for d in rel_dirs:
+        parts = [p for p in d.split("/") if p]
+        for i in range(1, len(parts) + 1):
+            out.add("/".join(parts[:i]))
+    return out
+
+
+class DriveFolderMap:
+    """Peta path folder relatif ('' = root) -> id folder Drive, per root, disimpan di JSON."""
+    def __init__(self, path):
+        self.path = path
+        self.roots = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.roots = json.load(f)
+        except (OSError, ValueError):
+            self.roots = {}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.roots, f)
+        os.replace(tmp, self.path)
+
+    def folders(self, root_id):
+        m = self.roots.setdefault(root_id, {})
+        m[""] = root_id
+        return m
+
+    def forget(self, root_id):
+        self.roots.pop(root_id, None)
+
+    def ensure(self, service, root_id, rel_dirs):
+        """
+        Pastikan semua rel_dirs (path relatif dengan '/') ada di Drive; return
+        set id folder yang baru dibuat (pasti kosong). Folder di peta dipercaya
+        tanpa lookup; sisanya dicari per tingkat (satu query gabungan), lalu dibuat.
+        """
+        m = self.folders(root_id)
+        wanted = with_ancestors(rel_dirs) - {""}
+        created = set()
+        by_depth = {}
+        for d in wanted - set(m):
+            by_depth.setdefault(d.count("/"), []).append(d)
+        for depth in sorted(by_depth):
+            dirs = sorted(by_depth[depth])
+            parents = {d: m[_parent(d)] for d in dirs}
+            to_list = [pid for pid in set(parents.values()) if pid not in created]
+            existing = {}
+            for pid, items in list_children_bulk(service, to_list, folders_only=True).items():
+                for it in items:
+                    existing.setdefault((pid, it["name"]), it["id"])
+            for d in dirs:
+                name = d.rsplit("/", 1)[-1]
+                fid = existing.get((parents[d], name))
+                if fid is None:
+                    body = {"name": name, "mimeType": FOLDER_MIME, "parents": [parents[d]]}
+                    fid = service.files().create(body=body, fields="id").execute()["id"]
+                    created.add(fid)
+                m[d] = fid
+        if created:
+            emit("gdrive_folders_created", count=len(created))
+        return created
+
+
+def _md5_file(path):
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def upload_file(service, folder_id, local_file_path, existing=None, description=None, on_duplicate="update",
+                on_skip=None):
+    """
+    Upload satu file ke folder_id; existing = item Drive bernama sama di folder
+    itu (atau None). on_skip(existing) dipanggil bila isi identik (tidak diunggah).
+    """
+    file_name = os.path.basename(local_file_path)
+    if existing and on_duplicate in ("skip", "update"):
+        if existing.get("md5Checksum") == _md5_file(local_file_path):
+            print(f"[GDRIVE] SKIP (identik): {file_name} (id={existing['id']})")
+            emit("gdrive_upload_skip_identical", file=file_name, file_id=existing['id'])
+            if on_skip:
+                on_skip(existing)
+            return existing["id"]
+        if on_duplicate == "update":
+            body = {"name": file_name}
+            if description:
+                body["description"] = description
+            updated = service.files().update(
+                fileId=existing["id"], media_body=media_upload(service, local_file_path), body=body,
+                fields="id").execute()
+            print(f"[GDRIVE] UPDATED: {file_name} (id={existing['id']})")
+            emit("gdrive_upload_updated", file=file_name, file_id=existing['id'])
+            return updated["id"]
+
+    metadata = {"name": file_name, "parents": [folder_id]}
+    if description:
+        metadata["description"] = description
+    created = service.files().create(body=metadata, media_body=media_upload(service, local_file_path),
+                                     fields="id").execute()
+    print(f"[GDRIVE] CREATED: {file_name} (id={created['id']})")
+    emit("gdrive_upload_created", file=file_name, file_id=created['id'])
+    return created["id"]
+
+
+class _StaleFolderMap(Exception):
+    pass
+
+
+def _batch_update(service, items, body, op):
+    """files().update metadata (tanpa media) untuk banyak item dalam batch; return jumlah gagal."""
+    requests = [(it["id"], service.files().update(fileId=it["id"], body=body, fields="id")) for it in items]
+    failed = 0
+    for fid, (_, exc) in execute_batch(service, requests, op=op).items():
+        if exc is not None:
+            failed += 1
+            print(f"[GDRIVE] {op} gagal untuk id={fid}: {exc}")
+    return failed
+
+
+def upload_tree(service, root_id, local_root, folder_map, description=None, on_duplicate="update",
+                on_file=None, refresh_description=None, trash_orphans=False):
+    """
+    Upload semua file di local_root ke root_id dengan struktur folder yang sama.
+    Return [(path_lokal, id_drive)]. on_file(path) dipanggil setelah tiap file.
+
+    refresh_description: description baru untuk artefak identik yang tidak
+    diunggah ulang; trash_orphans: file di folder Drive yang diunggah tapi
+    tidak ada di lokal dipindah ke trash. Keduanya dikirim sebagai batch.
+    Bila folder di peta ternyata sudah dihapus dari Drive, peta root di-reset
+    dan upload diulang sekali.
+    """
+    files = {}
+    for root, _, names in os.walk(local_root):
+        rel_dir = os.path.relpath(root, local_root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        if names:
+            files[rel_dir] = sorted(names)
+    fields = ITEM_FIELDS + (",description" if refresh_description else "")
+
+    for attempt in (1, 2):
+        try:
+            created = folder_map.ensure(service, root_id, files)
+            m = folder_map.folders(root_id)
+            dirs = with_ancestors(files)
+            listed = list_children_bulk(service, [m[d] for d in dirs if m[d] not in created], fields=fields)
+            # id folder dari peta harus masih muncul di listing induknya (tidak dihapus/di-trash)
+            stale = [d for d in dirs if d and m[_parent(d)] in listed
+                     and all(it["id"] != m[d] for it in listed[m[_parent(d)]])]
+            if stale:
+                raise _StaleFolderMap(stale)
+            uploaded, unchanged, orphans = [], [], []
+            for rel_dir, names in files.items():
+                existing = {}
+                for it in listed.get(m[rel_dir], []):
+                    if it.get("mimeType") != FOLDER_MIME:
+                        existing.setdefault(it["name"], it)
+                for name in names:
+                    path = os.path.join(local_root, *rel_dir.split("/"), name)
+                    fid = upload_file(service, m[rel_dir], path, existing.get(name), description, on_duplicate,
+                                      on_skip=unchanged.append)
+                    uploaded.append((path, fid))
+                    if on_file:
+                        on_file(path)
+                local = set(names)
+                orphans.extend(it for it in listed.get(m[rel_dir], [])
+                               if it.get("mimeType") != FOLDER_MIME and it["name"] not in local)
+            folder_map.save()
+            break
+        except Exception as e:
+            if attempt == 2 or not (isinstance(e, _StaleFolderMap) or is_not_found(e)):
+                raise
+            print("[GDRIVE] Peta folder Drive usang (folder dihapus); membangun ulang...")
+            emit("gdrive_folder_map_reset", root=root_id)
+            folder_map.forget(root_id)
+
+    if refresh_description:
+        stale_desc = [it for it in unchanged if it.get("description") != refresh_description]
+        _batch_update(service, stale_desc, {"description": refresh_description}, op="refresh_description")
+    if trash_orphans and orphans:
+        failed = _batch_update(service, orphans, {"trashed": True}, op="trash_orphan")
+        print(f"[GDRIVE] {len(orphans) - failed} artefak orphan dipindah ke trash.")
+        emit("gdrive_orphans_trashed", count=len(orphans) - failed, failed=failed)
+    return uploaded
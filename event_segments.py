@@ -0,0 +1,360 @@
+# event_segments.py
+"""
+Format log event ringkas (opsional) berbasis segmen.
+
+Satu segmen = satu file `progress_<base>.seg`:
+    header : b"PEVS" | versi (1 byte) | codec (1 byte: b"m" msgpack / b"j" json) | run_id (8 byte)
+    record : panjang payload (uint32 LE) | payload = codec([ts, event, data]) | panjang payload lagi
+             (uint32 LE, sejak versi 2: record bisa dibaca mundur dari EOF)
+`base` (hex 16 digit di nama file) = posisi global byte awal segmen, yaitu
+jumlah ukuran semua segmen sebelumnya pada run yang sama. Posisi global
+event = base + offset akhir record, sehingga monoton lintas segmen.
+
+Segmen yang sudah ditutup (sealed) punya sidecar `progress_<base>.idx`
+(JSON) berisi jumlah event per tipe & rentang ts, jadi pembaca bisa
+melewati seluruh segmen tanpa men-decode isinya.
+"""
+import os, json, time, struct, shutil, pathlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # fallback: payload JSON ringkas
+
+MAGIC = b"PEVS"
+VERSION = 2
+VERSIONS = (1, 2)        # versi 1: tanpa panjang di akhir record (hanya bisa dibaca maju)
+HEADER = struct.Struct("<4sBc8s")
+FRAME = struct.Struct("<I")
+SEG_PREFIX = "progress_"
+SEG_SUFFIX = ".seg"
+IDX_SUFFIX = ".idx"
+
+
+# ---------- Codec ----------
+def default_codec() -> bytes:
+    return b"m" if msgpack is not None else b"j"
+
+def _dumps(codec: bytes, rec) -> bytes:
+    if codec == b"m":
+        return msgpack.packb(rec, use_bin_type=True)
+    return json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _loads(codec: bytes, payload: bytes):
+    if codec == b"m":
+        if msgpack is None:
+            raise RuntimeError("Segmen msgpack butuh paket 'msgpack'.")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def segment_dir(log_path):
+    """Lokasi direktori segmen (PROGRESS_SEGMENT_DIR atau <log>.segments)."""
+    return pathlib.Path(os.getenv("PROGRESS_SEGMENT_DIR", str(pathlib.Path(log_path).with_suffix(".segments"))))
+
+
+def _seg_name(base: int) -> str:
+    return f"{SEG_PREFIX}{base:016x}{SEG_SUFFIX}"
+
+
+# ---------- Writer ----------
+class SegmentSink:
+    """
+    Tujuan tulis untuk writer batch di progress.py. Segmen aktif dirotasi
+    saat ukurannya melewati max_bytes atau umurnya melewati max_age_s;
+    hanya `keep` segmen terbaru yang disimpan.
+    """
+    def __init__(self, directory, max_bytes=16 * 1024 * 1024, max_age_s=3600.0, keep=64, codec=None):
+        self.dir = pathlib.Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.keep = keep
+        self.codec = codec or default_codec()
+        self.run_id = os.urandom(8)
+        self._f = None
+        self._open(0)
+
+    def _open(self, base):
+        self.base = base
+        self.path = self.dir / _seg_name(base)
+        self._f = open(self.path, "wb")
+        self._f.write(HEADER.pack(MAGIC, VERSION, self.codec, self.run_id))
+        self.size = HEADER.size
+        self.opened_at = time.time()
+        self.count = 0
+        self.types = {}
+        self.first_ts = None
+        self.last_ts = None
+
+    def encode(self, ts, event, data):
+        """Dipanggil di hot path emit(): hasilnya item siap tulis."""
+        payload = _dumps(self.codec, [ts, event, data])
+        length = FRAME.pack(len(payload))
+        return ts, event, length + payload + length
+
+    def write(self, items):
+        if self._f.closed:
+            self._open(self.base + self.size)
+        elif self.size >= self.max_bytes or time.time() - self.opened_at >= self.max_age_s:
+            if self.count:
+                self._rotate()
+        self._f.write(b"".join(frame for _, _, frame in items))
+        for ts, event, frame in items:
+            self.size += len(frame)
+            self.count += 1
+            self.types[event] = self.types.get(event, 0) + 1
+            if self.first_ts is None:
+                self.first_ts = ts
+            self.last_ts = ts
+        self._f.flush()
+
+    def sync(self):
+        if not self._f.closed:
+            os.fsync(self._f.fileno())
+
+    def _seal(self):
+        self._f.flush()
+        try:
+            os.fsync(self._f.fileno())
+        except OSError:
+            pass
+        self._f.close()
+        meta = {
+            "base": self.base,
+            "end": self.base + self.size,
+            "count": self.count,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "types": self.types,
+        }
+        tmp = self.path.with_suffix(IDX_SUFFIX + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.path.with_suffix(IDX_SUFFIX))
+
+    def _rotate(self):
+        self._seal()
+        self._open(self.base + self.size)
+        segs = list_segments(self.dir)
+        for seg in segs[:max(0, len(segs) - self.keep)]:
+            for p in (seg.path, seg.path.with_suffix(IDX_SUFFIX)):
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        if self._f is not None and not self._f.closed:
+            self._seal()
+
+
+def archive_segments(directory, archive_dir, keep=5):
+    """Pindahkan segmen run sebelumnya ke archive_dir (sama seperti arsip JSONL)."""
+    directory = pathlib.Path(directory)
+    if not directory.exists() or not any(directory.glob(f"{SEG_PREFIX}*{SEG_SUFFIX}")):
+        return
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    shutil.move(str(directory), str(pathlib.Path(archive_dir) / f"progress_segments_{timestamp}"))
+    olds = sorted(pathlib.Path(archive_dir).glob("progress_segments_*"), key=os.path.getmtime)
+    while len(olds) > keep:
+        shutil.rmtree(olds.pop(0), ignore_errors=True)
+
+
+# ---------- Reader ----------
+class Segment:
+    __slots__ = ("base", "path", "_meta")
+
+    def __init__(self, base, path):
+        self.base = base
+        self.path = path
+        self._meta = False
+
+    @property
+    def meta(self):
+        """Isi sidecar .idx (None bila segmen masih aktif)."""
+        if self._meta is False:
+            try:
+                with open(self.path.with_suffix(IDX_SUFFIX), "r", encoding="utf-8") as f:
+                    self._meta = json.load(f)
+            except (OSError, ValueError):
+                self._meta = None
+        return self._meta
+
+
+def list_segments(directory):
+    directory = pathlib.Path(directory)
+    out = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return out
+    for name in names:
+        if name.startswith(SEG_PREFIX) and name.endswith(SEG_SUFFIX):
+            try:
+                base = int(name[len(SEG_PREFIX):-len(SEG_SUFFIX)], 16)
+            except ValueError:
+                continue
+            out.append(Segment(base, directory / name))
+    out.sort(key=lambda s: s.base)
+    return out
+
+
+def read_header(f):
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        return None
+    magic, version, codec, run_id = HEADER.unpack(raw)
+    if magic != MAGIC or version not in VERSIONS:
+        raise ValueError("Bukan file segmen event yang valid.")
+    return codec, run_id, version
+
+
+def run_id(seg):
+    """run_id dari header segmen (None bila header belum tertulis)."""
+    try:
+        with open(seg.path, "rb") as f:
+            hdr = read_header(f)
+    except (OSError, ValueError):
+        return None
+    return hdr[1] if hdr else None
+
+
+def read_records(seg, start=None, max_bytes=None):
+    """
+    Yield (posisi_global_akhir, event_dict) dari segmen mulai offset `start`
+    (offset file; default tepat setelah header). Record terakhir yang belum
+    lengkap (masih ditulis) tidak dikembalikan.
+    """
+    with open(seg.path, "rb") as f:
+        hdr = read_header(f)
+        if hdr is None:
+            return
+        codec, _, version = hdr
+        trailer = FRAME.size if version >= 2 else 0
+        off = HEADER.size if start is None or start < HEADER.size else start
+        f.seek(off)
+        data = f.read(max_bytes) if max_bytes else f.read()
+    i = 0
+    n = len(data)
+    while i + FRAME.size <= n:
+        (length,) = FRAME.unpack_from(data, i)
+        j = i + FRAME.size + length
+        if j + trailer > n:
+            break
+        ts, event, payload = _loads(codec, data[i + FRAME.size:j])
+        i = j + trailer
+        yield seg.base + off + i, {"ts": ts, "event": event, "data": payload}
+
+
+def segment_matches(seg, types=None):
+    """False bila segmen sealed pasti tidak berisi tipe event yang dicari."""
+    meta = seg.meta
+    if meta is None:
+        return True
+    if types is not None and not any(types(t) for t in meta.get("types", {})):
+        return False
+    return True
+
+
+TAIL_BLOCK = 64 * 1024
+
+
+def _read_back(f, buf, buf_start, lo):
+    """Perluas buf (isi file mulai buf_start) ke belakang sampai mencakup offset lo."""
+    if lo >= buf_start:
+        return buf, buf_start
+    new_start = max(HEADER.size, min(lo, buf_start - TAIL_BLOCK))
+    f.seek(new_start)
+    return f.read(buf_start - new_start) + buf, new_start
+
+
+def tail_records(seg, n):
+    """
+    n record terakhir segmen sebagai [(posisi_global_akhir, event_dict)],
+    dibaca mundur dari EOF per blok memakai panjang di akhir record, jadi
+    biayanya sebanding dengan n, bukan ukuran segmen. Segmen versi 1, atau
+    ekor yang belum lengkap (record masih ditulis), dibaca maju seperti biasa.
+    """
+    if n <= 0:
+        return []
+    with open(seg.path, "rb") as f:
+        hdr = read_header(f)
+        if hdr is None:
+            return []
+        codec, _, version = hdr
+        if version >= 2:
+            pos = f.seek(0, os.SEEK_END)
+            buf, buf_start = b"", pos
+            out = []
+            while len(out) < n and pos > HEADER.size:
+                if pos - 2 * FRAME.size < HEADER.size:
+                    break
+                buf, buf_start = _read_back(f, buf, buf_start, pos - FRAME.size)
+                (length,) = FRAME.unpack_from(buf, pos - FRAME.size - buf_start)
+                start = pos - 2 * FRAME.size - length
+                if start < HEADER.size:
+                    break
+                buf, buf_start = _read_back(f, buf, buf_start, start)
+                if FRAME.unpack_from(buf, start - buf_start)[0] != length:
+                    break
+                try:
+                    ts, event, payload = _loads(codec, buf[start + FRAME.size - buf_start:pos - FRAME.size - buf_start])
+                except Exception:
+                    break          # bukan batas record (ekor masih ditulis)
+                out.append((seg.base + pos, {"ts": ts, "event": event, "data": payload}))
+                pos = start
+            else:
+                out.reverse()
+                return out
+    return list(read_records(seg))[-n:]
+
+
+def tail_events(directory, n):
+    """
+    n event terakhir: ekor segmen dari yang terbaru mundur sampai cukup.
+    Return (events, cursor) dengan cursor (run_id hex, posisi global akhir
+    record terakhir) untuk dilanjutkan dengan events_since.
+    """
+    segs = list_segments(directory)
+    run = run_id(segs[0]) if segs else None
+    if run is None:
+        return [], None
+    out = []
+    cursor = None
+    for seg in reversed(segs):
+        recs = tail_records(seg, n - len(out))
+        if cursor is None:
+            cursor = (run.hex(), recs[-1][0] if recs else seg.base + HEADER.size)
+        out = [ev for _, ev in recs] + out
+        if len(out) >= n:
+            break
+    return out, cursor
+
+
+def events_since(directory, cursor, limit):
+    """
+    Event setelah cursor (run_id hex, posisi global), maksimal limit.
+    Return (events, cursor_berikut). Segmen yang seluruhnya sebelum posisi
+    dilewati dari sidecar .idx; run berbeda (log diarsip) mulai dari awal.
+    """
+    segs = list_segments(directory)
+    run = run_id(segs[0]) if segs else None
+    if run is None:
+        return [], cursor
+    ident = run.hex()
+    pos = cursor[1] if cursor[0] == ident else 0
+    out = []
+    for seg in segs:
+        if len(out) >= limit:
+            break
+        meta = seg.meta
+        if meta is not None and meta["end"] <= pos:
+            continue
+        start = pos - seg.base if pos > seg.base else None
+        for end, ev in read_records(seg, start=start):
+            out.append(ev)
+            pos = end
+            if len(out) == limit:
+                break
+    return out, (ident, pos)
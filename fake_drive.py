@@ -0,0 +1,328 @@
+# fake_drive.py
+"""
+Pengganti Google Drive lokal untuk benchmark/CI (tanpa jaringan & OAuth).
+
+Meniru permukaan service Drive v3 yang dipakai pipeline:
+    files().list(q=..., fields=..., pageToken=..., pageSize=...).execute()
+    files().get(fileId=..., fields=...).execute()
+    files().get_media(fileId=...)          -> dibaca lewat download_media()
+    files().create(body=..., media_body=..., fields=...).execute()
+    files().update(fileId=..., body=..., media_body=...).execute()
+    new_batch_http_request(callback=...)  -> add(request, request_id) / execute()
+plus seam media: media_upload(path) & download_media(file_id, fh), yang
+dipakai drive_tree.media_upload / restore_cache.drive_download_stream bila ada.
+
+Isi file disimpan di <root>/blobs/<id>, metadata di <root>/meta.json
+(ditulis lewat save()). Latensi per panggilan API dan bandwidth transfer
+media bisa diatur untuk mensimulasikan jaringan.
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import secrets
+import threading
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+_COPY_CHUNK = 1024 * 1024
+
+
+class FakeDriveError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status      # seperti HttpError.resp.status (404 = tidak ditemukan)
+
+
+def _md5_file(path):
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------- parser query Drive (subset) ----------
+def _split_top(q, sep):
+    """Pisah q pada sep di luar tanda kutip & kurung."""
+    parts, depth, quote, start, i = [], 0, False, 0, 0
+    while i < len(q):
+        ch = q[i]
+        if ch == "\\" and quote:
+            i += 2
+            continue
+        if ch == "'":
+            quote = not quote
+        elif not quote and ch == "(":
+            depth += 1
+        elif not quote and ch == ")":
+            depth -= 1
+        elif not quote and depth == 0 and q.startswith(sep, i):
+            parts.append(q[start:i])
+            i += len(sep)
+            start = i
+            continue
+        i += 1
+    parts.append(q[start:])
+    return [p.strip() for p in parts]
+
+
+def _unquote(s):
+    return s.replace("\\'", "'").replace("\\\\", "\\")
+
+
+_CLAUSES = [
+    (re.compile(r"^'((?:[^'\\]|\\.)*)' in parents$"), lambda m, f: m.group(1) in f.get("parents", [])),
+    (re.compile(r"^trashed\s*=\s*(true|false)$"), lambda m, f: f.get("trashed", False) == (m.group(1) == "true")),
+    (re.compile(r"^(name|mimeType)\s*(!=|=)\s*'((?:[^'\\]|\\.)*)'$"),
+     lambda m, f: (f.get(m.group(1)) == _unquote(m.group(3))) == (m.group(2) == "=")),
+    (re.compile(r"^name contains '((?:[^'\\]|\\.)*)'$"), lambda m, f: _unquote(m.group(1)) in f["name"]),
+]
+
+
+def compile_query(q):
+    """Query Drive -> predikat(meta). Klausa tak dikenal -> FakeDriveError (agar ketahuan di tes)."""
+    q = (q or "").strip()
+    if not q:
+        return lambda f: True
+    ands = _split_top(q, " and ")
+    if len(ands) > 1:
+        preds = [compile_query(p) for p in ands]
+        return lambda f: all(p(f) for p in preds)
+    ors = _split_top(q, " or ")
+    if len(ors) > 1:
+        preds = [compile_query(p) for p in ors]
+        return lambda f: any(p(f) for p in preds)
+    if q.startswith("(") and q.endswith(")"):
+        return compile_query(q[1:-1])
+    for rx, fn in _CLAUSES:
+        m = rx.match(q)
+        if m:
+            return lambda f, m=m, fn=fn: fn(m, f)
+    raise FakeDriveError(f"Klausa query tidak didukung: {q!r}")
+
+
+def _project(meta, fields):
+    """Terapkan field mask sederhana 'files(id,name,...)' / 'id'."""
+    if not fields:
+        return {k: meta[k] for k in ("id", "name", "mimeType") if k in meta}
+    m = re.search(r"files\(([^)]*)\)", fields)
+    keys = m.group(1) if m else fields
+    wanted = [k.strip() for k in keys.split(",") if k.strip() and k.strip() != "nextPageToken"]
+    return {k: meta[k] for k in wanted if k in meta}
+
+
+# ---------- objek request ----------
+class _Request:
+    def __init__(self, drive, fn):
+        self._drive = drive
+        self._fn = fn
+
+    def execute(self, num_retries=0):
+        self._drive._api_call()
+        return self._fn()
+
+
+class _MediaRequest:
+    """Hasil get_media(); execute() mengembalikan bytes seperti HttpRequest asli."""
+    def __init__(self, drive, file_id):
+        self._drive = drive
+        self.file_id = file_id
+
+    def execute(self, num_retries=0):
+        import io
+        buf = io.BytesIO()
+        self._drive.download_media(self.file_id, buf)
+        return buf.getvalue()
+
+
+class _Batch:
+    """Pengganti BatchHttpRequest: semua request dijalankan dalam satu panggilan API."""
+    def __init__(self, drive, callback=None):
+        self._drive = drive
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if not isinstance(request, _Request):
+            raise FakeDriveError("Batch hanya untuk request metadata (bukan media)")
+        self._requests.append((request_id or str(len(self._requests)), request, callback or self._callback))
+
+    def execute(self):
+        self._drive._api_call()
+        with self._drive._lock:
+            self._drive.stats["batches"] += 1
+        for request_id, request, callback in self._requests:
+            try:
+                response, exc = request._fn(), None
+            except Exception as e:
+                response, exc = None, e
+            if callback:
+                callback(request_id, response, exc)
+
+
+class _Media:
+    """Pengganti MediaFileUpload (hanya path)."""
+    def __init__(self, path):
+        self.path = path
+
+    def size(self):
+        return os.path.getsize(self.path)
+
+
+class _Files:
+    def __init__(self, drive):
+        self._d = drive
+
+    def list(self, q=None, fields=None, pageToken=None, pageSize=None, **_):
+        d = self._d
+
+        def run():
+            pred = compile_query(q)
+            with d._lock:
+                matches = [m for m in d._meta.values() if pred(m)]
+            matches.sort(key=lambda m: (m["name"], m["id"]))
+            start = int(pageToken or 0)
+            size = min(pageSize or d.page_size, d.page_size)
+            page = matches[start:start + size]
+            out = {"files": [_project(m, fields) for m in page]}
+            if start + size < len(matches):
+                out["nextPageToken"] = str(start + size)
+            return out
+        return _Request(d, run)
+
+    def get(self, fileId, fields=None, **_):
+        return _Request(self._d, lambda: _project(self._d._get(fileId), fields or "id,name,mimeType,parents"))
+
+    def get_media(self, fileId, **_):
+        self._d._get(fileId)
+        return _MediaRequest(self._d, fileId)
+
+    def create(self, body, media_body=None, fields=None, **_):
+        return _Request(self._d, lambda: _project(self._d._create(body, media_body), fields or "id"))
+
+    def update(self, fileId, body=None, media_body=None, fields=None, **_):
+        return _Request(self._d, lambda: _project(self._d._update(fileId, body or {}, media_body), fields or "id"))
+
+
+# ---------- service ----------
+class FakeDrive:
+    def __init__(self, root, latency_ms=0.0, bandwidth_mb_s=None, page_size=100):
+        self.root = str(root)
+        self.blobs = os.path.join(self.root, "blobs")
+        os.makedirs(self.blobs, exist_ok=True)
+        self.latency_s = latency_ms / 1000.0
+        self.bandwidth = bandwidth_mb_s * 1024 * 1024 if bandwidth_mb_s else None
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._meta = {}
+        self.stats = {"calls": 0, "batches": 0, "bytes_down": 0, "bytes_up": 0}
+        meta_path = os.path.join(self.root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+
+    # --- permukaan service ---
+    def files(self):
+        return _Files(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def media_upload(self, path):
+        return _Media(path)
+
+    def download_media(self, file_id, fh):
+        meta = self._get(file_id)
+        self._api_call()
+        src = os.path.join(self.blobs, meta["id"])
+        with open(src, "rb") as f:
+            for chunk in iter(lambda: f.read(_COPY_CHUNK), b""):
+                fh.write(chunk)
+                self._transfer(len(chunk), "bytes_down")
+
+    # --- simulasi jaringan ---
+    def _api_call(self):
+        with self._lock:
+            self.stats["calls"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _transfer(self, n, key):
+        with self._lock:
+            self.stats[key] += n
+        if self.bandwidth:
+            time.sleep(n / self.bandwidth)
+
+    # --- penyimpanan ---
+    def _get(self, file_id):
+        with self._lock:
+            meta = self._meta.get(file_id)
+        if meta is None:
+            raise FakeDriveError(f"File tidak ditemukan: {file_id}", status=404)
+        return meta
+
+    def _store_media(self, file_id, media):
+        path = media.path if isinstance(media, _Media) else getattr(media, "_filename", None)
+        if path is None:
+            raise FakeDriveError("media_body tidak didukung (pakai FakeDrive.media_upload)")
+        dst = os.path.join(self.blobs, file_id)
+        with open(path, "rb") as fin, open(dst, "wb") as fout:
+            for chunk in iter(lambda: fin.read(_COPY_CHUNK), b""):
+                fout.write(chunk)
+                self._transfer(len(chunk), "bytes_up")
+        return {"md5Checksum": _md5_file(dst), "size": str(os.path.getsize(dst))}
+
+    def _create(self, body, media=None, file_id=None):
+        for parent in body.get("parents", []):
+            if self._get(parent).get("trashed"):
+                raise FakeDriveError(f"Folder induk ada di trash: {parent}", status=404)
+        file_id = file_id or secrets.token_hex(12)
+        meta = {"id": file_id, "name": body["name"], "parents": list(body.get("parents", [])),
+                "mimeType": body.get("mimeType", "application/octet-stream"), "trashed": False}
+        if body.get("description"):
+            meta["description"] = body["description"]
+        if media is not None:
+            meta.update(self._store_media(file_id, media))
+        with self._lock:
+            self._meta[file_id] = meta
+        return meta
+
+    def _update(self, file_id, body, media=None):
+        meta = dict(self._get(file_id))
+        meta.update({k: v for k, v in body.items() if k in ("name", "description", "mimeType", "trashed")})
+        if media is not None:
+            meta.update(self._store_media(file_id, media))
+        with self._lock:
+            self._meta[file_id] = meta
+        return meta
+
+    def save(self):
+        tmp = os.path.join(self.root, "meta.json.tmp")
+        with self._lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, os.path.join(self.root, "meta.json"))
+
+    # --- helper penyiapan data (tanpa latensi) ---
+    def create_folder(self, name, parent=None, folder_id=None):
+        body = {"name": name, "mimeType": FOLDER_MIME, "parents": [parent] if parent else []}
+        return self._create(body, file_id=folder_id)["id"]
+
+    def import_tree(self, local_dir, parent_id):
+        """Salin isi folder lokal (rekursif) ke folder Drive parent_id; return jumlah file."""
+        count = 0
+        for entry in sorted(os.scandir(local_dir), key=lambda e: e.name):
+            if entry.is_dir():
+                sub = self.create_folder(entry.name, parent_id)
+                count += self.import_tree(entry.path, sub)
+            else:
+                file_id = secrets.token_hex(12)
+                shutil.copyfile(entry.path, os.path.join(self.blobs, file_id))
+                meta = {"id": file_id, "name": entry.name, "parents": [parent_id],
+                        "mimeType": "application/octet-stream", "trashed": False,
+                        "md5Checksum": _md5_file(entry.path), "size": str(os.path.getsize(entry.path))}
+                with self._lock:
+                    self._meta[file_id] = meta
+                count += 1
+        return count
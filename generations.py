@@ -0,0 +1,226 @@
+# generations.py
+"""
+Generasi backup berversi (pengganti backup_results yang dihapus tiap run).
+
+Layout di <root>:
+    objects/<sha[:2]>/<sha>   artefak backup, dialamatkan dengan SHA-256 isinya
+                              (read-only); artefak yang tidak berubah antar run
+                              hanya disimpan sekali
+    gens/<gen_id>.json        manifest: path relatif -> {sha256, size} + metadata
+
+Restore point-in-time = materialisasi manifest sebuah generasi ke folder
+tujuan (copy, atau hard link bila link=True). Retensi memakai pola GFS
+(terakhir/harian/mingguan/bulanan); objek tanpa referensi dibuang saat prune.
+
+CLI:
+    python generations.py list
+    python generations.py restore <gen_id> <folder_tujuan> [--link]
+    python generations.py prune
+"""
+import os
+import json
+import stat
+import shutil
+import hashlib
+import secrets
+import datetime as dt
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+_READ_CHUNK = 4 * 1024 * 1024
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _parse_created(manifest):
+    return dt.datetime.fromisoformat(manifest["created"])
+
+
+class GenerationStore:
+    def __init__(self, root):
+        self.root = str(root)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.gens_dir = os.path.join(self.root, "gens")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.gens_dir, exist_ok=True)
+
+    # ---------- objek ----------
+    def object_path(self, sha):
+        return os.path.join(self.objects_dir, sha[:2], sha)
+
+    def _ingest(self, path, sha):
+        """Simpan salinan read-only bila objek belum ada; return True bila objek baru."""
+        dst = self.object_path(sha)
+        if os.path.exists(dst):
+            return False
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = f"{dst}.{secrets.token_hex(4)}.tmp"
+        shutil.copy2(path, tmp)
+        os.chmod(tmp, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, dst)
+        return True
+
+    # ---------- generasi ----------
+    def commit(self, folder, meta=None, known_hashes=None):
+        """
+        Buat generasi baru dari isi folder. known_hashes (path relatif -> sha256)
+        dipakai untuk melewati hashing ulang file yang hash-nya sudah diketahui.
+        """
+        now = dt.datetime.now(dt.timezone.utc)
+        gen_id = now.strftime("%Y%m%dT%H%M%SZ") + "-" + secrets.token_hex(3)
+        files, new_objects, new_bytes = {}, 0, 0
+        for root, _, names in os.walk(folder):
+            for name in names:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, folder).replace(os.sep, "/")
+                sha = (known_hashes or {}).get(rel) or _sha256_file(path)
+                size = os.path.getsize(path)
+                if self._ingest(path, sha):
+                    new_objects += 1
+                    new_bytes += size
+                files[rel] = {"sha256": sha, "size": size}
+
+        parent = self.latest()
+        manifest = {
+            "id": gen_id,
+            "created": now.isoformat(),
+            "parent": parent["id"] if parent else None,
+            "meta": meta or {},
+            "files": files,
+        }
+        tmp = os.path.join(self.gens_dir, f"{gen_id}.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.gens_dir, f"{gen_id}.json"))
+        emit("generation_committed", id=gen_id, files=len(files),
+             new_objects=new_objects, new_bytes=new_bytes, parent=manifest["parent"])
+        return manifest
+
+    def list_ids(self):
+        return sorted(n[:-5] for n in os.listdir(self.gens_dir) if n.endswith(".json"))
+
+    def get(self, gen_id):
+        with open(os.path.join(self.gens_dir, f"{gen_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def latest(self):
+        ids = self.list_ids()
+        return self.get(ids[-1]) if ids else None
+
+    def restore(self, gen_id, dest, paths=None, link=False):
+        """
+        Materialisasi generasi gen_id ke dest. paths: iterable path relatif
+        (None = semua). link=True: hard link ke objek (read-only, tanpa copy).
+        Return daftar path hasil restore.
+        """
+        manifest = self.get(gen_id)
+        files = manifest["files"]
+        wanted = files.keys() if paths is None else [p for p in paths if p in files]
+        out = []
+        for rel in wanted:
+            src = self.object_path(files[rel]["sha256"])
+            dst = os.path.join(dest, *rel.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.exists(dst):
+                os.chmod(dst, stat.S_IWRITE | stat.S_IREAD)
+                os.remove(dst)
+            if link:
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+            else:
+                shutil.copyfile(src, dst)
+            out.append(dst)
+        emit("generation_restored", id=gen_id, files=len(out), dest=str(dest))
+        return out
+
+    # ---------- retensi ----------
+    def select_keep(self, manifests, keep_last=3, keep_daily=7, keep_weekly=4, keep_monthly=12):
+        """
+        Pilih id yang dipertahankan (GFS). Generasi yang ditandai suspected
+        tidak mengisi slot harian/mingguan/bulanan, hanya slot keep_last,
+        jadi run yang terinfeksi tidak menggeser generasi baik yang lebih lama.
+        """
+        ordered = sorted(manifests, key=lambda m: m["id"], reverse=True)
+        keep = {m["id"] for m in ordered[:keep_last]}
+        clean = [m for m in ordered if not m.get("meta", {}).get("suspected")]
+        for n, key in ((keep_daily, lambda d: d.date()),
+                       (keep_weekly, lambda d: d.isocalendar()[:2]),
+                       (keep_monthly, lambda d: (d.year, d.month))):
+            buckets = []
+            for m in clean:
+                b = key(_parse_created(m))
+                if b not in buckets:
+                    if len(buckets) == n:
+                        break
+                    buckets.append(b)
+                    keep.add(m["id"])   # generasi terbaru di bucket tsb
+        return keep
+
+    def prune(self, **policy):
+        """Hapus generasi di luar kebijakan GFS lalu buang objek tanpa referensi."""
+        manifests = [self.get(i) for i in self.list_ids()]
+        keep = self.select_keep(manifests, **policy)
+        removed = [m["id"] for m in manifests if m["id"] not in keep]
+        for gen_id in removed:
+            os.remove(os.path.join(self.gens_dir, f"{gen_id}.json"))
+
+        freed_objects = freed_bytes = 0
+        if removed:
+            live = {e["sha256"] for m in manifests if m["id"] in keep for e in m["files"].values()}
+            for sub in os.listdir(self.objects_dir):
+                subdir = os.path.join(self.objects_dir, sub)
+                for sha in os.listdir(subdir):
+                    if sha not in live:
+                        p = os.path.join(subdir, sha)
+                        freed_bytes += os.path.getsize(p)
+                        os.chmod(p, stat.S_IWRITE | stat.S_IREAD)
+                        os.remove(p)
+                        freed_objects += 1
+        emit("generations_pruned", removed=removed, kept=len(keep),
+             freed_objects=freed_objects, freed_bytes=freed_bytes)
+        return removed
+
+
+def main():
+    import argparse
+    from config import SOURCE_FOLDER, GENERATIONS_FOLDER_NAME, GEN_RETENTION
+
+    ap = argparse.ArgumentParser(description="Kelola generasi backup")
+    ap.add_argument("--root", default=os.path.join(os.path.dirname(SOURCE_FOLDER), GENERATIONS_FOLDER_NAME))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    r = sub.add_parser("restore")
+    r.add_argument("gen_id")
+    r.add_argument("dest")
+    r.add_argument("--link", action="store_true")
+    sub.add_parser("prune")
+    a = ap.parse_args()
+
+    store = GenerationStore(a.root)
+    if a.cmd == "list":
+        for gen_id in store.list_ids():
+            m = store.get(gen_id)
+            flag = " [SUSPECTED]" if m["meta"].get("suspected") else ""
+            print(f"{gen_id}  {len(m['files'])} file{flag}")
+    elif a.cmd == "restore":
+        out = store.restore(a.gen_id, a.dest, link=a.link)
+        print(f"[GENERATION] {len(out)} file dipulihkan dari {a.gen_id} ke {a.dest}")
+    else:
+        removed = store.prune(**GEN_RETENTION)
+        print(f"[GENERATION] {len(removed)} generasi dihapus")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# header_snapshot.py
+"""
+Kontainer snapshot header untuk simulate_header (pengganti satu file
+*.hdr.json per target).
+
+Layout satu file:
+    MAGIC
+    entry*: panjang path (uint16 LE) | panjang header (uint32 LE) | path utf-8 | header mentah
+    index : JSON {path_relatif: [offset_header, panjang]}
+    footer: offset index (uint64 LE) | panjang index (uint64 LE) | MAGIC
+Entry bersifat self-describing, jadi bila proses berhenti sebelum footer
+tertulis, indeks dibangun ulang dengan memindai entry.
+"""
+import os, json, struct, threading
+
+MAGIC = b"HDRSNAP\x01"
+ENTRY = struct.Struct("<HI")
+FOOTER = struct.Struct("<QQ8s")
+SNAPSHOT_NAME = "header_snapshots.bin"
+
+
+def _scan(f, size):
+    """Bangun indeks dari entry; return (indeks, offset akhir entry valid terakhir)."""
+    index = {}
+    f.seek(len(MAGIC))
+    pos = len(MAGIC)
+    while pos + ENTRY.size <= size:
+        raw = f.read(ENTRY.size)
+        plen, hlen = ENTRY.unpack(raw)
+        end = pos + ENTRY.size + plen + hlen
+        if end > size:
+            break
+        try:
+            rel = f.read(plen).decode("utf-8")
+        except UnicodeDecodeError:
+            break
+        index[rel] = (pos + ENTRY.size + plen, hlen)
+        f.seek(end)
+        pos = end
+    return index, pos
+
+
+def _load(f):
+    """Return (indeks, offset akhir data entry)."""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Bukan kontainer snapshot header.")
+    if size >= len(MAGIC) + FOOTER.size:
+        f.seek(size - FOOTER.size)
+        idx_off, idx_len, magic = FOOTER.unpack(f.read(FOOTER.size))
+        if magic == MAGIC and idx_off + idx_len + FOOTER.size == size:
+            f.seek(idx_off)
+            index = {k: tuple(v) for k, v in json.loads(f.read(idx_len)).items()}
+            return index, idx_off
+    return _scan(f, size)
+
+
+def load_index(path):
+    """Indeks path -> (offset, panjang) dari kontainer."""
+    with open(path, "rb") as f:
+        return _load(f)[0]
+
+
+def read_headers(path):
+    """Semua (path_relatif, header) dalam satu baca berurutan."""
+    with open(path, "rb") as f:
+        index, end = _load(f)
+        f.seek(0)
+        data = f.read(end)
+    return [(rel, data[off:off + length]) for rel, (off, length) in index.items()]
+
+
+class SnapshotWriter:
+    """
+    Tulis snapshot dalam satu pass. Bila kontainer sudah ada, entry lama
+    dipertahankan (header asli tidak tertimpa oleh korupsi berikutnya) dan
+    entry baru ditambahkan di belakangnya. add() aman dipanggil dari banyak
+    thread dan langsung flush + fsync, jadi entry sudah durable di disk
+    sebelum pemanggil menimpa header aslinya. add(sync=False) + satu sync()
+    untuk mencatat banyak entry sekaligus.
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            self._f = open(self.path, "r+b")
+            self.index, end = _load(self._f)
+            self._f.truncate(end)
+            self._f.seek(end)
+        else:
+            self._f = open(self.path, "wb")
+            self._f.write(MAGIC)
+            self.index = {}
+
+    def add(self, rel, header, sync=True):
+        """False bila path sudah punya snapshot (entry lama sudah durable)."""
+        if rel in self.index:
+            return False
+        pb = rel.encode("utf-8")
+        with self._lock:
+            if rel in self.index:
+                return False
+            pos = self._f.tell()
+            self._f.write(ENTRY.pack(len(pb), len(header)) + pb + header)
+            self._f.flush()
+            self.index[rel] = (pos + ENTRY.size + len(pb), len(header))
+        if sync:
+            self.sync()
+        return True
+
+    def sync(self):
+        """fsync semua entry yang sudah ditulis (di luar lock: thread lain tetap bisa add)."""
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._f.closed:
+            return
+        idx_off = self._f.tell()
+        body = json.dumps(self.index, separators=(",", ":")).encode("utf-8")
+        self._f.write(body + FOOTER.pack(idx_off, len(body), MAGIC))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -3,67 +3,70 @@ import io
 import shutil
 import argparse
 import time
-import hashlib
 import subprocess
 import json
 import datetime as dt
-import csv
 from contextlib import contextmanager
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
-from google.auth.exceptions import RefreshError
-
+# Modul berat (codec, Google API client, simulator, matplotlib) di-import
+# lazy di fungsi yang memakainya, agar `python main.py --help` & import
+# modul ini tetap cepat. Lihat bench_importtime.py.
 from config import (
     SOURCE_FOLDER, AIRGAP_FOLDER_NAME, SIMULATED_ATTACK_FOLDER,
-    ALGO_DISPLAY, EXT_TO_ID, HASH_FILE,
+    ALGO_DISPLAY, HASH_FILE,
     AIRGAP_DRIVE_LETTER, AUTO_MOUNT_VHDX, VHDX_FILENAME_PREFIX,
     EVALUATION_FOLDER_NAME,
     CLOUD_UPLOAD_ENABLED, GDRIVE_CREDENTIALS_FILE, GDRIVE_TOKEN_FILE, GDRIVE_BACKUP_FOLDER_ID,
-    GDRIVE_RAW_FOLDER_ID, GDRIVE_SCOPES, FORCE_UNMOUNT_AT_END, AIRGAP_VHDX_PATH
+    GDRIVE_RAW_FOLDER_ID, GDRIVE_SCOPES, FORCE_UNMOUNT_AT_END, AIRGAP_VHDX_PATH,
+    ALERT_DB_FILE, ALERT_CSV_FILE, SIM_WORKERS, SIM_FILES_PER_S, SIM_MB_PER_S,
+    DETECTOR_ENABLED, CHANGE_STATS_FILE, GENERATIONS_FOLDER_NAME, GEN_RETENTION,
+    RESTORE_CODEC_PREFERENCE, EVAL_HISTORY_FILE, RESTORE_CACHE_BUDGET_MB, DRIVE_FOLDER_MAP_FILE,
+    DRIVE_REFRESH_DESCRIPTIONS, DRIVE_TRASH_ORPHANS
 )
 
 from utils import (
     load_json, save_json, ensure_dir, get_sha256,
     is_drive_mounted, find_vhdx_in_folder,
-    show_all_hash_popup, save_per_file_plot, evaluate_and_save
+    evaluate_and_save
 )
 from backup_restore import backup_file, restore_file
-from simulate import simulate_ransomware_safe
-from simulate_header import simulate_header_corruption_safe
-from simulate_corrupt import simulate_corrupt_safe
+from alert_store import AlertStore
+from ransom_detector import StreamDetector
+from change_stats import ChangeStats
+from generations import GenerationStore
+from selective_restore import SelectiveRestore, drive_artifacts
+from restore_cache import RestoreCache, drive_download_stream
+from drive_client import DriveClient
+from drive_tree import DriveFolderMap, upload_tree, walk
+from report import ReportRenderer, show_all_hash_popup
+from stream_stats import EvalStats
 
 from progress import emit, stage  # Dashboard
+from metrics import install_pipeline_metrics
 
 
 # ================= ARGPARSE MODE =================
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "--mode",
-    choices=("normal", "wannacry", "headercorrupt", "corrupt"),
-    default="normal",
-    help="Pilih mode: normal | wannacry | headercorrupt | corrupt"
-)
-args = parser.parse_args()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--mode",
+        choices=("normal", "wannacry", "headercorrupt", "corrupt"),
+        default="normal",
+        help="Pilih mode: normal | wannacry | headercorrupt | corrupt"
+    )
+    parser.add_argument(
+        "--restore-glob", action="append", default=None, metavar="POLA",
+        help="Restore selektif: hanya file yang cocok glob ini (boleh diulang). Default: restore penuh"
+    )
+    parser.add_argument(
+        "--generation", default=None,
+        help="Id generasi sumber restore selektif (default: generasi bersih terbaru / Drive)"
+    )
+    return parser.parse_args(argv)
 # =================================================
 
-if args.mode == "normal":
-    emit("ransom_reset")  # Tambah event reset ransomware
-    emit("header_reset")
-
 
 # ==================== GOOGLE DRIVE HELPERS ====================
-def md5_of_file(path):
-    h = hashlib.md5()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 def get_drive_service_oauth(credentials_file, token_file, scopes):
     """
     Robust OAuth:
@@ -71,6 +74,11 @@ def get_drive_service_oauth(credentials_file, token_file, scopes):
     - Jika refresh gagal (RefreshError) → hapus token.json dan paksa alur login baru.
     - Jika scope berubah dari sebelumnya → juga paksa login baru.
     """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.exceptions import RefreshError
+
     creds = None
 
     # 1) Muat token lama bila ada
@@ -105,7 +113,8 @@ def get_drive_service_oauth(credentials_file, token_file, scopes):
         with open(token_file, "w") as token:
             token.write(creds.to_json())
 
-    return build("drive", "v3", credentials=creds)
+    # transport keep-alive per thread + batch request metadata (drive_client.py)
+    return DriveClient(creds)
 
 
 def find_folder_id_by_name(service, name):
@@ -116,97 +125,34 @@ def find_folder_id_by_name(service, name):
     return files[0]["id"] if files else None
 
 
-def find_file_in_folder_by_name(service, folder_id, name):
-    safe = name.replace("'", "\\'")
-    q = f"'{folder_id}' in parents and name='{safe}' and trashed=false"
-    resp = service.files().list(q=q, fields="files(id,name,md5Checksum,size)").execute()
-    files = resp.get("files", [])
-    return files[0] if files else None
+RANSOM_EXTS = (".wncry", ".encrypted", ".locked", ".enc", ".crypt")
 
-def trigger_auto_restore(file_name):
-    restore_path = os.path.join("restore_results", file_name)
+
+def trigger_auto_restore(file_name, restorer=None, dest="restore_results"):
+    # file hasil enkripsi (x.csv.wncry) dipulihkan dari artefak x.csv
+    target = os.path.splitext(file_name)[0] if file_name.lower().endswith(RANSOM_EXTS) else file_name
+    restore_path = os.path.join(dest, target)
     emit("auto_restore_triggered", file=file_name, restore_path=restore_path)
     print(f"[RESTORE] Otomatis memulihkan {file_name} ke {restore_path}")
+    if restorer is None:
+        return []
+    results = restorer.restore([target], dest)
+    if not results:
+        print(f"[RESTORE] Tidak ada artefak backup untuk {target}")
+    for r in results:
+        status = "gagal" if not r.get("path") else ("Cocok" if r["ok"] else "Tidak Cocok" if r["ok"] is False else "tanpa hash")
+        print(f"[RESTORE] {r['file']} <- {r['source']} ({r['algo']}): {status}")
+    return results
    
-def upload_file_to_drive(service, folder_id, local_file_path, description=None, on_duplicate="update"):
-    file_name = os.path.basename(local_file_path)
-
-    # MD5 lokal
-    h = hashlib.md5()
-    with open(local_file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    local_md5 = h.hexdigest()
-
-    if on_duplicate in ("skip", "update"):
-        existing = find_file_in_folder_by_name(service, folder_id, file_name)
-        if existing:
-            remote_md5 = existing.get("md5Checksum")
-            if remote_md5 == local_md5:
-                print(f"[GDRIVE] SKIP (identik): {file_name} (id={existing['id']})")
-                emit("gdrive_upload_skip_identical", file=file_name, file_id=existing['id'])
-                return existing["id"]
-            if on_duplicate == "update":
-                media = MediaFileUpload(local_file_path, resumable=True)
-                body = {"name": file_name}
-                if description:
-                    body["description"] = description
-                updated = service.files().update(
-                    fileId=existing["id"], media_body=media, body=body
-                ).execute()
-                print(f"[GDRIVE] UPDATED: {file_name} (id={existing['id']})")
-                emit("gdrive_upload_updated", file=file_name, file_id=existing['id'])
-                return updated["id"]
-
-    # create baru
-    metadata = {"name": file_name, "parents": [folder_id]}
-    if description:
-        metadata["description"] = description
-    media = MediaFileUpload(local_file_path, resumable=True)
-    created = service.files().create(body=metadata, media_body=media, fields="id").execute()
-    print(f"[GDRIVE] CREATED: {file_name} (id={created['id']})")
-    emit("gdrive_upload_created", file=file_name, file_id=created['id'])
-    return created["id"]
-
-
-def drive_list_children(service, folder_id):
-    q = f"'{folder_id}' in parents and trashed=false"
-    page_token = None
-    while True:
-        resp = service.files().list(
-            q=q,
-            fields="nextPageToken, files(id,name,mimeType,md5Checksum,size)",
-            pageToken=page_token
-        ).execute()
-        for it in resp.get("files", []):
-            yield it
-        page_token = resp.get("nextPageToken")
-        if not page_token:
-            break
-
-
 def drive_walk(service, root_folder_id, prefix=""):
-    stack = [(root_folder_id, prefix)]
-    while stack:
-        fid, pfx = stack.pop()
-        for item in drive_list_children(service, fid):
-            name = item["name"]
-            mt = item.get("mimeType", "")
-            if mt == "application/vnd.google-apps.folder":
-                stack.append((item["id"], os.path.join(pfx, name)))
-            else:
-                rel_path = os.path.join(pfx, name) if pfx else name
-                yield (item["id"], rel_path.replace("\\", "/"), item.get("md5Checksum"))
+    for rel_path, item in walk(service, root_folder_id, prefix):
+        yield (item["id"], rel_path, item.get("md5Checksum"))
 
 
 def download_drive_file(service, file_id, local_path):
     ensure_dir(os.path.dirname(local_path))
-    request = service.files().get_media(fileId=file_id)
     with io.FileIO(local_path, "wb") as fh:
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
+        drive_download_stream(service, file_id, fh)
 
 
 # ==================== POWER SHELL HELPERS ====================
@@ -245,7 +191,12 @@ def _ps_exe():
 
 # ==================== VHDX MOUNT/UNMOUNT – UTIL POWERSHELL ====================
 def _run_ps(ps_script: str):
-    exe = _ps_exe()
+    try:
+        exe = _ps_exe()
+    except FileNotFoundError as e:
+        # non-Windows / tanpa PowerShell: perlakukan sebagai perintah gagal
+        # sehingga mount jatuh ke fallback folder lokal
+        return 127, "", str(e)
     res = subprocess.run(
         [exe, "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", ps_script],
         capture_output=True, text=True
@@ -480,7 +431,75 @@ def transfer_to_airgap(output_folder, airgap_folder):
 
 
 # ==================== MAIN ====================
-def main():
+def restore_full(gsvc, cache, restore_folder, hash_memory):
+    """Restore penuh: sinkronkan folder BackupResults (rekursif) ke cache (RestoreCache) lalu pulihkan semua artefak."""
+    print(f"[RESTORE] Mengunduh file backup dari Drive folder BackupResults ({GDRIVE_BACKUP_FOLDER_ID}) ...")
+
+    def download_backup_folder():
+        drive_files_seen = set()   # PATCH ORPHAN CHECK
+        # <Algo>/<path>.<ext> (plus artefak flat lama di root); cache dikunci path relatif Drive
+        for drive_rel, _rel, _algo, it in drive_artifacts(gsvc, GDRIVE_BACKUP_FOLDER_ID):
+            drive_files_seen.add(drive_rel)
+
+            # cache hit diputuskan dari indeks (id, md5, ukuran, mtime) tanpa membaca isi file
+            try:
+                _, hit = cache.fetch(drive_rel, it, lambda fh, fid=it["id"]: drive_download_stream(gsvc, fid, fh))
+            except IOError as e:
+                print(f"[GDRIVE] RESTORE WARNING {e}")
+                continue
+            if hit:
+                print(f"[GDRIVE] RESTORE SKIP (identik): {drive_rel}")
+
+        # Hapus orphan (sudah tidak ada di Drive) & sisa unduhan yang tidak terindeks
+        for orphan in cache.prune(drive_files_seen):
+            print(f"[SYNC] Orphan file {orphan} dihapus (tidak ada di Drive).")
+        cache.save()
+
+    with stage("restore_download_backup_folder"):
+        download_backup_folder()
+    emit("restore_cache_sync", **cache.stats)
+
+    # === Restore file dari cache ke restore_folder ===
+    backup_files = sorted(cache.files())
+    emit("restore_cache_ready", count=len(backup_files))
+
+    hash_results = []
+    for backup_file_path in backup_files:
+        try:
+            with stage("restore_file", file=os.path.basename(backup_file_path)) as st:
+                algo_id, restored_path = restore_file(backup_file_path, restore_folder, cache.folder)
+                st.add_bytes(bytes_in=os.path.getsize(backup_file_path), bytes_out=os.path.getsize(restored_path))
+
+            rel_inside_restore = os.path.relpath(restored_path, restore_folder).replace(os.sep, "/")
+            parts = rel_inside_restore.split("/", 1)
+            lookup_key = parts[1] if len(parts) > 1 else parts[0]
+            from_hash = hash_memory.get(lookup_key, "")
+            restored_hash = get_sha256(restored_path)
+            match = restored_hash == from_hash
+
+            print(f"[VALIDATION] {rel_inside_restore} : {'Cocok' if match else 'Tidak Cocok'}")
+            hash_results.append((rel_inside_restore, ALGO_DISPLAY[algo_id], from_hash, restored_hash, match))
+
+            emit("restore_validated", file=rel_inside_restore, algo=ALGO_DISPLAY[algo_id],
+                 ok=match, sha_in=from_hash, sha_out=restored_hash)
+
+        except Exception as e:
+            emit("restore_error", file=os.path.basename(backup_file_path), error=repr(e))
+            print(f"Gagal merestore {backup_file_path}: {e}")
+
+    show_all_hash_popup(hash_results, save_folder=restore_folder)
+    cache.enforce_budget()
+    cache.save()
+    emit("restore_done", validated=len(hash_results))
+    print("Proses restore selesai.")
+
+
+def main(args=None):
+    args = args if args is not None else parse_args()
+    install_pipeline_metrics()   # counter/histogram dari emit -> snapshot untuk /metrics dashboard
+    if args.mode == "normal":
+        emit("ransom_reset")  # Tambah event reset ransomware
+        emit("header_reset")
     emit("pipeline_start")
 
     # === 1. Siapkan Folder Dasar ===
@@ -514,8 +533,7 @@ def main():
 
      # === 4. Inisialisasi variabel dan load hash ===
     algoritma_list = ["lz4", "zstd", "gzip", "brotli", "snappy"]
-    total_rasio = {algo: [] for algo in algoritma_list}
-    total_waktu = {algo: [] for algo in algoritma_list}
+    eval_stats = EvalStats(algoritma_list)   # statistik streaming per codec (tanpa list per file)
 
     hash_memory = load_json(hash_file_path, {})
     emit("hash_loaded", entries=len(hash_memory))
@@ -530,6 +548,17 @@ def main():
         gsvc = get_drive_service_oauth(GDRIVE_CREDENTIALS_FILE, GDRIVE_TOKEN_FILE, GDRIVE_SCOPES)
     emit("drive_auth_ok")
 
+    generations = GenerationStore(os.path.join(base_folder, GENERATIONS_FOLDER_NAME))
+    if args.generation and args.generation not in generations.list_ids():
+        emit("error_config", message=f"--generation {args.generation} tidak ditemukan")
+        raise RuntimeError(f"Generasi {args.generation} tidak ditemukan di {generations.gens_dir}.")
+    restore_cache = RestoreCache(os.path.join(base_folder, "_restore_cache_drive"), RESTORE_CACHE_BUDGET_MB)
+    folder_map = DriveFolderMap(os.path.join(base_folder, DRIVE_FOLDER_MAP_FILE))
+    restorer = SelectiveRestore(
+        gen_store=generations, gsvc=gsvc, backup_folder_id=GDRIVE_BACKUP_FOLDER_ID,
+        cache=restore_cache, folder_map=folder_map, prefer=RESTORE_CODEC_PREFERENCE, expected_hash=hash_memory.get,
+    )
+
     drive_source_folder_id = GDRIVE_RAW_FOLDER_ID or find_folder_id_by_name(gsvc, "source data")
     if not drive_source_folder_id:
         emit("error_source_folder_missing")
@@ -548,27 +577,35 @@ def main():
     # === 6. Proses Backup dari Drive ===
     print("[BACKUP] Mulai proses backup dari Drive...")
 
-    RANSOM_EXTS = [".wncry", ".encrypted", ".locked", ".enc", ".crypt"]
     detected_ransom_files = []
+    alert_csv_path = os.path.join(base_folder, ALERT_CSV_FILE)
+    alerts = AlertStore(os.path.join(base_folder, ALERT_DB_FILE), legacy_csv=alert_csv_path)
+    change_stats = ChangeStats(os.path.join(base_folder, CHANGE_STATS_FILE))
+    change_anomalies = []
+    report = ReportRenderer(evaluation_folder)   # grafik dirender di luar loop backup (PLOT_MODE)
+
+    def report_change_anomalies(anomalies):
+        change_anomalies.extend(anomalies)
+        for a in anomalies:
+            label = a.get("folder", "*") or "."
+            emit("ransom_suspected", source="change_rate", **a)
+            print(f"[RANSOM-DETECT] Lonjakan {a['metric']} ({a['scope']} {label}): "
+                  f"{a['fraction']:.1%} > batas {a['limit']:.1%}")
+            alerts.add(label, f"CHANGE_RATE:{a['metric']}")
 
     for file_id, rel_path, _md5 in drive_files:
 
         # Deteksi file ransomware (simulasi)
-        if any(rel_path.lower().endswith(ext) for ext in RANSOM_EXTS):
+        if rel_path.lower().endswith(RANSOM_EXTS):
             emit("ransom_file_detected", file=rel_path)
             print(f"[RANSOM-DETECT] File mencurigakan terdeteksi: {rel_path}")
             detected_ransom_files.append(rel_path)
 
-            #catat di CSV log
-            csv_log_path = os.path.join(base_folder, "ransomware_detected_files.csv")
-            with open(csv_log_path, "a", newline="") as f:
-                writer = csv.writer(f)
-                if os.stat(csv_log_path).st_size == 0:
-                    writer.writerow(["file_path", "status", "timestamp"])
-                writer.writerow([rel_path, "DETECTED", dt.datetime.now().isoformat()])
+            #catat di alert store (CSV diekspor sekali setelah loop)
+            alerts.add(rel_path, "DETECTED")
 
             #langsung lanjut ke restore
-            trigger_auto_restore(rel_path)
+            trigger_auto_restore(rel_path, restorer, restore_folder)
             continue
 
         #proses normal (file aman) 
@@ -576,10 +613,32 @@ def main():
         ensure_dir(os.path.dirname(local_path))
         print(f"[GDRIVE] Download file: {rel_path}")
 
-        with stage("download_file", file=rel_path):
-                download_drive_file(gsvc, file_id, local_path)
+        with stage("download_file", file=rel_path) as st:
+            download_drive_file(gsvc, file_id, local_path)
+            st.add_bytes(bytes_in=os.path.getsize(local_path))
+
+        detector = StreamDetector(rel_path) if DETECTOR_ENABLED else None
+        original_hash = get_sha256(local_path, on_chunk=detector.update if detector else None)
+        report_change_anomalies(change_stats.observe_hash(rel_path, original_hash))
+
+        # Deteksi berbasis isi: jangan timpa hash/backup baik dengan file yang tampak terenkripsi
+        if detector is not None:
+            verdict = detector.result()
+            if verdict["suspicious"]:
+                emit("ransom_suspected", source="content", file=rel_path, sha256=original_hash, **verdict)
+                print(f"[RANSOM-DETECT] Isi file mencurigakan ({', '.join(verdict['reasons'])}, "
+                      f"entropi={verdict['entropy']}, chi2={verdict['chi2']}): {rel_path}")
+                detected_ransom_files.append(rel_path)
+                alerts.add(rel_path, "SUSPECTED")
+                trigger_auto_restore(rel_path, restorer, restore_folder)
+                continue
+            if verdict["alert"]:
+                # magic byte tidak cocok tanpa isi acak: catat alert, file tetap di-backup
+                emit("ransom_magic_mismatch", file=rel_path, sha256=original_hash, **verdict)
+                print(f"[RANSOM-DETECT] Magic byte tidak cocok dengan ekstensi (entropi={verdict['entropy']}), "
+                      f"tetap di-backup: {rel_path}")
+                alerts.add(rel_path, "MAGIC_MISMATCH")
 
-        original_hash = get_sha256(local_path)
         hash_memory[rel_path] = original_hash
         save_json(hash_file_path, hash_memory)
         emit("hash_original", file=rel_path, sha256=original_hash, size=os.path.getsize(local_path))
@@ -588,19 +647,37 @@ def main():
         ukuran_asli = os.path.getsize(local_path)
         rasio_list, waktu_list = [], []
         for algo in algoritma_list:
-            with stage("backup_file", file=rel_path, algo=algo):
+            with stage("backup_file", file=rel_path, algo=algo) as st:
                 comp_file, durasi = backup_file(local_path, algo, output_folder, original_hash, source_folder=SOURCE_FOLDER)
-            ukuran_comp = os.path.getsize(comp_file)
+                ukuran_comp = os.path.getsize(comp_file)
+                st.add_bytes(bytes_in=ukuran_asli, bytes_out=ukuran_comp)
             rasio = (ukuran_comp / ukuran_asli) if ukuran_asli > 0 else 0
-            total_waktu[algo].append(durasi)
-            total_rasio[algo].append(rasio)
+            eval_stats.add(algo, ukuran_asli, ukuran_comp, durasi)
             rasio_list.append(rasio)
             waktu_list.append(durasi)
             emit("backup_result", file=rel_path, algo=algo,
                  size_in=ukuran_asli, size_out=ukuran_comp, ratio=rasio, duration_ms=durasi)
 
-        save_per_file_plot(rel_path, algoritma_list, rasio_list, waktu_list, evaluation_folder)
-        emit("perfile_plot_saved", file=rel_path)
+        if rasio_list:
+            report_change_anomalies(change_stats.observe_ratio(rel_path, sum(rasio_list) / len(rasio_list)))
+
+        report.add(rel_path, algoritma_list, rasio_list, waktu_list)
+
+    change_stats.end_run()
+    if detected_ransom_files:
+        alerts.export_csv(alert_csv_path)
+    alerts.close()
+
+    # === 6b. Simpan generasi backup (versi lama tidak ikut terhapus) ===
+    with stage("generation_commit"):
+        gen = generations.commit(
+            output_folder,
+            meta={"mode": args.mode, "suspected": bool(detected_ransom_files or change_anomalies),
+                  "detected": len(detected_ransom_files), "anomalies": len(change_anomalies)},
+            known_hashes={f"original/{rel}".replace(os.sep, "/"): sha for rel, sha in hash_memory.items()},
+        )
+        generations.prune(**GEN_RETENTION)
+    print(f"[GENERATION] Generasi {gen['id']} disimpan ({len(gen['files'])} artefak).")
 
     # === 7. Transfer Backup ke Airgap (Drive Fisik atau Lokal) ===
     vhdx_candidates = [AIRGAP_VHDX_PATH]
@@ -634,20 +711,21 @@ def main():
         #     print(f"[VHD] Forcing unmount drive {AIRGAP_DRIVE_LETTER} (pre-mounted) ...", flush=True)
         #     force_unmount_airgap_by_drive(AIRGAP_DRIVE_LETTER)
 
-    # === Upload hasil backup ke Google Drive (de-dup) ===
+    # === Upload hasil backup ke Google Drive (de-dup, struktur folder dipertahankan) ===
     try:
-        emit("upload_backup_start")
         print("[GDRIVE] Upload hasil backup ke folder BackupResults...")
-        uploaded_backup = []
-        for root, _, files in os.walk(output_folder):
-            for f in files:
-                path = os.path.join(root, f)
-                fid = upload_file_to_drive(
-                    gsvc, GDRIVE_BACKUP_FOLDER_ID, path,
-                    description=f"uploaded {dt.datetime.now().isoformat()}",
-                    on_duplicate="update"
-                )
-                uploaded_backup.append((path, fid))
+        now = dt.datetime.now().isoformat()
+        suspected = bool(detected_ransom_files or change_anomalies)
+        with stage("upload_backup") as st:   # emit upload_backup_start/_end
+            uploaded_backup = upload_tree(
+                gsvc, GDRIVE_BACKUP_FOLDER_ID, output_folder, folder_map,
+                description=f"uploaded {now}",
+                on_duplicate="update",
+                on_file=lambda path: st.add_bytes(bytes_out=os.path.getsize(path)),
+                refresh_description=f"verified {now}" if DRIVE_REFRESH_DESCRIPTIONS else None,
+                # run mencurigakan: artefak file yang dilewati jangan dianggap orphan
+                trash_orphans=DRIVE_TRASH_ORPHANS and not suspected,
+            )
         print(f"[GDRIVE] Selesai upload {len(uploaded_backup)} file backup.")
         emit("upload_backup_done", count=len(uploaded_backup))
     except Exception as e:
@@ -662,11 +740,13 @@ def main():
         emit("ransom_scan_start", total=total_files)
 
         with stage("ransom_encrypt", ext=simulated_extension):
+            from simulate import simulate_ransomware_safe
             encrypted_files = simulate_ransomware_safe(
                 source_folder=SOURCE_FOLDER,
                 extension=simulated_extension,
                 reset=getattr(args, "reset", False),
                 reset_key=getattr(args, "reset_key", False),
+                workers=SIM_WORKERS, files_per_s=SIM_FILES_PER_S, mb_per_s=SIM_MB_PER_S,
             )
         emit("ransom_simulation_end", count=len(encrypted_files))
         print(f"[WANNA-CRY SIMULATION] {len(encrypted_files)} file terenkripsi di {SOURCE_FOLDER} (ext {simulated_extension})")
@@ -677,6 +757,7 @@ def main():
         emit("hdr_scan_start", total=total_files)
 
         with stage("hdr_corrupt", header_size=64):
+            from simulate_header import simulate_header_corruption_safe
             results = simulate_header_corruption_safe(
                 source_folder=SOURCE_FOLDER,
                 header_size=64,
@@ -687,6 +768,7 @@ def main():
                 show_progress=True,
                 reset=getattr(args, "reset", False),
                 cleanup_snapshots=getattr(args, "cleanup_snapshots", False),
+                workers=SIM_WORKERS, files_per_s=SIM_FILES_PER_S, mb_per_s=SIM_MB_PER_S,
             )
 
     # ambil jumlah file yang berhasil dan gagal
@@ -706,11 +788,12 @@ def main():
         emit("corrupt_scan_start", total=total_files)
 
         with stage("corrupt_simulation", ratio=0.02):
+            from simulate_corrupt import simulate_corrupt_safe
             corrupted_files = simulate_corrupt_safe(
             output_folder=SOURCE_FOLDER,
             damage_ratio=0.10,  # 10% isi file rusak
             include_exts=None,  # None = semua file
-            delay=0.05,
+            workers=SIM_WORKERS, files_per_s=SIM_FILES_PER_S, mb_per_s=SIM_MB_PER_S,
         )
 
         emit("corrupt_done", count=len(corrupted_files))
@@ -720,106 +803,33 @@ def main():
         # mode "normal": tidak ada simulasi
       pass
 
-    # === RESTORE dari Drive BackupResults ===
-    restore_cache = os.path.join(base_folder, "_restore_cache_drive")
-    ensure_dir(restore_cache)
-
-    allowed_exts = [ext.lower() for ext in EXT_TO_ID.keys()]
-    print(f"[RESTORE] Mengunduh file backup dari Drive folder BackupResults ({GDRIVE_BACKUP_FOLDER_ID}) ...")
-
-    def download_backup_folder():
-        q = f"'{GDRIVE_BACKUP_FOLDER_ID}' in parents and trashed=false"
-        page_token = None
-        drive_files_seen = set()   # PATCH ORPHAN CHECK
-
-        while True:
-            resp = gsvc.files().list(
-                q=q,
-                fields="nextPageToken, files(id,name,md5Checksum)",
-                pageToken=page_token
-            ).execute()
-
-            files = resp.get('files', [])
-            for it in files:
-                name = it["name"]
-                drive_files_seen.add(name)
-
-                ext = os.path.splitext(name)[1].lstrip('.').lower()
-                if ext not in allowed_exts:
-                    continue
-
-                local_path = os.path.join(restore_cache, name)
-                remote_md5 = it.get("md5Checksum")
-
-                if remote_md5 and os.path.exists(local_path) and md5_of_file(local_path) == remote_md5:
-                    print(f"[GDRIVE] RESTORE SKIP (identik): {name}")
-                    continue
-
-                download_drive_file(gsvc, it["id"], local_path)
-
-                if remote_md5 and md5_of_file(local_path) != remote_md5:
-                    print(f"[GDRIVE] RESTORE WARNING MD5 mismatch: {name}")
-
-            page_token = resp.get("nextPageToken")
-            if not page_token:
-                break
-
-        # Hapus orphan
-        local_files = set(os.listdir(restore_cache))
-        orphan_files = local_files - drive_files_seen
-        for orphan in orphan_files:
-            try:
-                os.remove(os.path.join(restore_cache, orphan))
-                print(f"[SYNC] Orphan file {orphan} dihapus (tidak ada di Drive).")
-            except Exception as e:
-                print(f"[SYNC] Gagal hapus orphan {orphan}: {e}")
-
-    with stage("restore_download_backup_folder"):
-        download_backup_folder()
-
-    # === Restore file dari cache ke restore_folder ===
-    backup_files = []
-    for root, _, files in os.walk(restore_cache):
-        for file in files:
-            if os.path.splitext(file)[1].lstrip('.').lower() in EXT_TO_ID:
-                backup_files.append(os.path.join(root, file))
-
-    emit("restore_cache_ready", count=len(backup_files))
-
-    hash_results = []
-    for backup_file_path in backup_files:
-        try:
-            with stage("restore_file", file=os.path.basename(backup_file_path)):
-                algo_id, restored_path = restore_file(backup_file_path, restore_folder, restore_cache)
-
-            rel_inside_restore = os.path.relpath(restored_path, restore_folder)
-            parts = rel_inside_restore.split(os.sep, 1)
-            lookup_key = parts[1] if len(parts) > 1 else parts[0]
-            from_hash = hash_memory.get(lookup_key, "")
-            restored_hash = get_sha256(restored_path)
-            match = restored_hash == from_hash
-
-            print(f"[VALIDATION] {rel_inside_restore} : {'Cocok' if match else 'Tidak Cocok'}")
-            hash_results.append((rel_inside_restore, ALGO_DISPLAY[algo_id], from_hash, restored_hash, match))
-
-            emit("restore_validated", file=rel_inside_restore, algo=ALGO_DISPLAY[algo_id],
-                 ok=match, sha_in=from_hash, sha_out=restored_hash)
-
-        except Exception as e:
-            emit("restore_error", file=os.path.basename(backup_file_path), error=repr(e))
-            print(f"Gagal merestore {backup_file_path}: {e}")
-
-    show_all_hash_popup(hash_results, save_folder=restore_folder)
-    emit("restore_done", validated=len(hash_results))
-    print("Proses restore selesai.")
+    # === RESTORE selektif (--restore-glob): hanya artefak yang dibutuhkan ===
+    if args.restore_glob:
+        print(f"[RESTORE] Restore selektif {args.restore_glob} (generasi={args.generation or 'otomatis'}) ...")
+        with stage("restore_selective", patterns=args.restore_glob):
+            results = restorer.restore(args.restore_glob, restore_folder, generation=args.generation)
+        hash_results = [(r["file"], r["algo"], r["sha_in"] or "", r["sha_out"], bool(r["ok"]))
+                        for r in results if r.get("path")]
+        for rel, algo, _, _, match in hash_results:
+            print(f"[VALIDATION] {rel} ({algo}) : {'Cocok' if match else 'Tidak Cocok'}")
+        show_all_hash_popup(hash_results, save_folder=restore_folder)
+        emit("restore_done", validated=len(hash_results))
+        print("Proses restore selektif selesai.")
+    else:
+        with stage("restore_full"):
+            restore_full(gsvc, restore_cache, restore_folder, hash_memory)
 
     # === Evaluasi ringkas ===
     with stage("evaluate_and_save"):
-        eval_summary = evaluate_and_save(total_rasio, total_waktu, evaluation_folder)
+        eval_summary = evaluate_and_save(eval_stats, evaluation_folder,
+                                         history_path=os.path.join(base_folder, EVAL_HISTORY_FILE))
     print("[DONE] Seluruh proses selesai. Ringkasan evaluation:")
     print(json.dumps(eval_summary, indent=2))
     emit("evaluate_done", summary=eval_summary)
 
+    with stage("report_render"):
+        report.finish()
+
     try:
         save_json(hash_file_path, hash_memory)
         emit("hash_saved", path=hash_file_path)
@@ -833,4 +843,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
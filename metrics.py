@@ -0,0 +1,282 @@
+# metrics.py
+"""
+Registry metrik Prometheus (format teks 0.0.4) tanpa dependensi.
+
+Pipeline: install_pipeline_metrics() memasang listener di progress.emit,
+jadi counter/histogram diperbarui langsung dari event yang di-emit (tanpa
+parsing log). Registry ditulis berkala ke file snapshot (gaya textfile
+collector) yang dibaca endpoint /metrics dashboard; scrape hanya membaca
+file kecil itu + metrik proses dashboard sendiri.
+
+ENV:
+  PROGRESS_METRICS_PATH       : file snapshot (default <folder log progress>/pipeline_metrics.prom)
+  PROGRESS_METRICS_INTERVAL_S : jeda minimum antar penulisan snapshot (default 5)
+"""
+import os
+import time
+import atexit
+import pathlib
+import threading
+
+from utils import normalize_algo
+
+SNAPSHOT_PATH = pathlib.Path(os.getenv(
+    "PROGRESS_METRICS_PATH",
+    str(pathlib.Path(os.getenv("PROGRESS_LOG_PATH", "progress_events.jsonl")).parent / "pipeline_metrics.prom"),
+))
+SNAPSHOT_INTERVAL_S = float(os.getenv("PROGRESS_METRICS_INTERVAL_S", "5"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+THROUGHPUT_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+def _codec_label(algo):
+    """Label codec selalu id huruf kecil (event restore memakai nama tampilan)."""
+    try:
+        return normalize_algo(algo)
+    except ValueError:
+        return (algo or "").lower()
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = registry._lock
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(k, "")) for k in self.labels)
+
+    def _label_str(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for key, v in sorted(self.values.items()):
+            out.append(f"{self.name}{self._label_str(key)} {_fmt(v)}")
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            h = self.values.get(key)
+            if h is None:
+                h = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    h[0][i] += 1
+                    break
+            h[1] += value
+            h[2] += 1
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} histogram")
+        for key, (counts, total, n) in sorted(self.values.items()):
+            cum = 0
+            for b, c in zip(self.buckets, counts):
+                cum += c
+                out.append(f"{self.name}_bucket{self._label_str(key, [('le', _fmt(float(b)))])} {cum}")
+            out.append(f"{self.name}_bucket{self._label_str(key, [('le', '+Inf')])} {n}")
+            out.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{self._label_str(key)} {n}")
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(self, name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(self, name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self, name, help, labels, buckets))
+
+    def render(self):
+        out = []
+        with self._lock:
+            for m in self._metrics:
+                m.render(out)
+        return "\n".join(out) + "\n"
+
+
+# ---------- metrik pipeline (diisi dari progress.emit) ----------
+class PipelineMetrics:
+    def __init__(self, registry=None):
+        r = self.registry = registry or Registry()
+        p = "backup_pipeline_"
+        self.codec_bytes = r.counter(p + "codec_bytes_total", "Byte diproses per codec saat backup",
+                                     ("codec", "direction"))
+        self.codec_files = r.counter(p + "codec_files_total", "File dikompres per codec", ("codec",))
+        self.stage_runs = r.counter(p + "stage_runs_total", "Eksekusi stage (per file untuk stage per file)",
+                                    ("stage", "result"))
+        self.stage_seconds = r.histogram(p + "stage_duration_seconds", "Latensi stage", ("stage",))
+        self.stage_bytes = r.counter(p + "stage_bytes_total", "Byte yang dicatat stage", ("stage", "direction"))
+        self.transfer_mb_s = r.histogram(p + "transfer_throughput_mb_per_second",
+                                         "Throughput unduh/unggah Drive", ("direction",), THROUGHPUT_BUCKETS)
+        self.restore_validated = r.counter(p + "restore_validated_total", "Hasil validasi hash restore",
+                                           ("codec", "result"))
+        self.restore_failures = r.counter(p + "restore_validation_failures_total",
+                                          "Restore yang gagal atau hash tidak cocok", ("kind",))
+        self.ransom_files = r.counter(p + "ransomware_files_detected_total",
+                                      "File terdeteksi/dicurigai ransomware", ("source",))
+        self.change_anomalies = r.counter(p + "change_rate_anomalies_total", "Lonjakan laju perubahan", ("metric",))
+        self.errors = r.counter(p + "errors_total", "Event *_error", ("event",))
+        self.running = r.gauge(p + "running", "1 bila pipeline sedang berjalan")
+        self.last_start = r.gauge(p + "last_start_timestamp_seconds", "Waktu mulai pipeline terakhir")
+        self.last_end = r.gauge(p + "last_end_timestamp_seconds", "Waktu selesai pipeline terakhir")
+        self.process_start = r.gauge(p + "process_start_time_seconds", "Waktu mulai proses (deteksi reset counter)")
+        self.process_start.set(time.time())
+
+    # stage -> arah transfer Drive
+    _TRANSFER = {"download_file": ("download", "bytes_in"), "upload_backup": ("upload", "bytes_out")}
+
+    def on_event(self, event, data):
+        if event.endswith("_end") and data.get("duration_ms") is not None:
+            self._on_stage(event[:-len("_end")], data)
+        elif event == "backup_result":
+            codec = _codec_label(data.get("algo"))
+            self.codec_bytes.inc(data.get("size_in") or 0, codec=codec, direction="in")
+            self.codec_bytes.inc(data.get("size_out") or 0, codec=codec, direction="out")
+            self.codec_files.inc(codec=codec)
+        elif event in ("restore_validated", "selective_restore_file"):
+            ok = data.get("ok")
+            self.restore_validated.inc(codec=_codec_label(data.get("algo")),
+                                       result="match" if ok else "mismatch" if ok is False else "unknown")
+            if ok is False:
+                self.restore_failures.inc(kind="hash_mismatch")
+        elif event in ("restore_error", "selective_restore_error"):
+            self.restore_failures.inc(kind="error")
+        elif event == "ransom_file_detected":
+            self.ransom_files.inc(source="extension")
+        elif event == "ransom_suspected":
+            if data.get("source") == "change_rate":
+                self.change_anomalies.inc(metric=data.get("metric", ""))
+            else:
+                self.ransom_files.inc(source=data.get("source", "content"))
+        elif event == "pipeline_start":
+            self.running.set(1)
+            self.last_start.set(time.time())
+        elif event == "pipeline_end":
+            self.running.set(0)
+            self.last_end.set(time.time())
+        if event.endswith("_error"):
+            self.errors.inc(event=event)
+
+    def _on_stage(self, name, data):
+        self.stage_runs.inc(stage=name, result="ok" if data.get("ok", True) else "error")
+        self.stage_seconds.observe(data["duration_ms"] / 1000.0, stage=name)
+        for direction in ("in", "out"):
+            n = data.get(f"bytes_{direction}")
+            if n:
+                self.stage_bytes.inc(n, stage=name, direction=direction)
+        transfer = self._TRANSFER.get(name)
+        if transfer and data.get("mb_s") is not None and data.get(transfer[1]):
+            self.transfer_mb_s.observe(data["mb_s"], direction=transfer[0])
+
+
+class SnapshotWriter:
+    """Tulis registry ke file (atomik) paling sering tiap interval detik."""
+    def __init__(self, registry, path=None, interval=None):
+        self.registry = registry
+        self.path = pathlib.Path(path or SNAPSHOT_PATH)
+        self.interval = SNAPSHOT_INTERVAL_S if interval is None else interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_write(self):
+        if time.monotonic() - self._last >= self.interval:
+            self.write()
+
+    def write(self):
+        if not self._lock.acquire(blocking=False):
+            return                       # thread lain sedang menulis
+        try:
+            self._last = time.monotonic()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(self.registry.render(), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass                         # mis. file sedang dibaca (Windows); dicoba lagi nanti
+        finally:
+            self._lock.release()
+
+
+_pipeline = None
+
+
+def install_pipeline_metrics(path=None, interval=None):
+    """Pasang listener metrik pipeline di progress.emit (idempoten); return PipelineMetrics."""
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    import progress
+
+    pm = PipelineMetrics()
+    writer = SnapshotWriter(pm.registry, path, interval)
+
+    def listener(event, data):
+        pm.on_event(event, data)
+        if event in ("pipeline_start", "pipeline_end"):
+            writer.write()
+        else:
+            writer.maybe_write()
+
+    progress.add_listener(listener)
+    atexit.register(writer.write)
+    _pipeline = pm
+    return pm
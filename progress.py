@@ -1,13 +1,45 @@
-import os, json, time, pathlib, threading, io
+import os, json, time, pathlib, threading, io, atexit
+from collections import deque
+
+import stage_profile
 
 LOG_PATH = pathlib.Path(os.getenv("PROGRESS_LOG_PATH", "progress_events.jsonl")).resolve()
 LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# --- Writer event (group commit) ---
+# PROGRESS_WRITER : "async" (default, thread latar + batch) | "sync" (tulis & fsync per event)
+# PROGRESS_FLUSH_MS / PROGRESS_FLUSH_EVENTS : batch ditulis tiap N ms atau tiap N event
+# PROGRESS_FSYNC  : "batch" (fsync per batch, default) | "interval" | "never"
+# PROGRESS_FSYNC_INTERVAL_S : jeda minimum antar fsync untuk policy "interval"
+WRITER_MODE = os.getenv("PROGRESS_WRITER", "async").lower()
+FLUSH_INTERVAL_S = float(os.getenv("PROGRESS_FLUSH_MS", "200")) / 1000.0
+FLUSH_MAX_EVENTS = int(os.getenv("PROGRESS_FLUSH_EVENTS", "256"))
+FSYNC_POLICY = os.getenv("PROGRESS_FSYNC", "batch").lower()
+FSYNC_INTERVAL_S = float(os.getenv("PROGRESS_FSYNC_INTERVAL_S", "2"))
+
+# --- Format log ---
+# PROGRESS_LOG_FORMAT : "jsonl" (default, satu file LOG_PATH) | "segments" (lihat event_segments.py)
+# PROGRESS_SEGMENT_DIR / _MAX_MB / _MAX_AGE_S / _KEEP : lokasi & rotasi segmen saat berjalan
+LOG_FORMAT = os.getenv("PROGRESS_LOG_FORMAT", "jsonl").lower()
+SEGMENT_MAX_BYTES = int(float(os.getenv("PROGRESS_SEGMENT_MAX_MB", "16")) * 1024 * 1024)
+SEGMENT_MAX_AGE_S = float(os.getenv("PROGRESS_SEGMENT_MAX_AGE_S", "3600"))
+SEGMENT_KEEP = int(os.getenv("PROGRESS_SEGMENT_KEEP", "64"))
+
+# --- Instrumentasi stage ---
+# PROGRESS_STAGE_METRICS : "1" (default) CPU/RSS/I-O disk/throughput di event <stage>_end | "0" hanya durasi
+# PROGRESS_PROFILE_STAGES / PROGRESS_PROFILER / PROGRESS_PROFILE_DIR : profil per stage (stage_profile.py)
+STAGE_METRICS = os.getenv("PROGRESS_STAGE_METRICS", "1") != "0"
+
 archive_dir = LOG_PATH.parent / "logs"
 archive_dir.mkdir(exist_ok=True)
+PROFILE_DIR = os.getenv("PROGRESS_PROFILE_DIR") or str(LOG_PATH.parent / "profiles")
 
 # --- Arsip log lama ---
-if LOG_PATH.exists():
+if LOG_FORMAT == "segments":
+    from event_segments import SegmentSink, archive_segments, segment_dir
+    SEGMENT_DIR = segment_dir(LOG_PATH).resolve()
+    archive_segments(SEGMENT_DIR, archive_dir)
+elif LOG_PATH.exists():
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     archived = archive_dir / f"progress_events_{timestamp}.jsonl"
     LOG_PATH.rename(archived)
@@ -20,31 +52,206 @@ if LOG_PATH.exists():
 
 _lock = threading.Lock()
 
-def _append_line(line: str):
-    with _lock, io.open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
-        f.flush()
-        try:
-            os.fsync(f.fileno())
-        except OSError:
-            pass
+
+class _JsonlSink:
+    """Satu baris JSON per event di LOG_PATH (format bawaan)."""
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+
+    def encode(self, ts, event, data):
+        return json.dumps({"ts": ts, "event": event, "data": data}, ensure_ascii=False)
+
+    def write(self, items):
+        if self._f is None:
+            self._f = io.open(self.path, "a", encoding="utf-8")
+        self._f.write("\n".join(items) + "\n")
+        self._f.flush()
+
+    def sync(self):
+        if self._f is not None:
+            os.fsync(self._f.fileno())
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+if LOG_FORMAT == "segments":
+    _sink = SegmentSink(SEGMENT_DIR, max_bytes=SEGMENT_MAX_BYTES,
+                        max_age_s=SEGMENT_MAX_AGE_S, keep=SEGMENT_KEEP)
+else:
+    _sink = _JsonlSink(LOG_PATH)
+
+
+class _BatchWriter:
+    """
+    Antrian in-memory + satu thread penulis. emit() cukup append ke deque;
+    thread menulis semua item yang terkumpul dalam satu write (group commit),
+    lalu fsync sesuai FSYNC_POLICY. Sisa antrian di-drain saat exit.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+        self._buf = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._last_fsync = 0.0
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, item):
+        self._buf.append(item)
+        if self._closed:
+            # emit setelah shutdown (mis. dari handler atexit lain): tulis langsung,
+            # lalu fsync & tutup lagi sink yang dibuka ulang oleh write()
+            self._commit_and_close()
+        elif len(self._buf) >= FLUSH_MAX_EVENTS:
+            with self._cond:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buf) < FLUSH_MAX_EVENTS:
+                    self._cond.wait(FLUSH_INTERVAL_S)
+                closed = self._closed
+            self._commit()
+            if closed:
+                return
+
+    def _commit(self):
+        with _lock:
+            items = []
+            while self._buf:
+                items.append(self._buf.popleft())
+            if not items:
+                return
+            self.sink.write(items)
+            now = time.monotonic()
+            if FSYNC_POLICY == "batch" or (FSYNC_POLICY == "interval" and now - self._last_fsync >= FSYNC_INTERVAL_S):
+                try:
+                    self.sink.sync()
+                except OSError:
+                    pass
+                self._last_fsync = now
+
+    def flush(self):
+        """Tulis semua event yang masih antre secara sinkron."""
+        self._commit()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+        self._commit_and_close()
+
+    def _commit_and_close(self):
+        self._commit()
+        with _lock:
+            if FSYNC_POLICY != "never":
+                try:
+                    self.sink.sync()
+                except (OSError, ValueError):
+                    pass
+            self.sink.close()
+
+
+_writer = _BatchWriter(_sink) if WRITER_MODE != "sync" else None
+atexit.register(_writer.close if _writer is not None else _sink.close)
+
+
+def flush():
+    """Pastikan semua event yang sudah di-emit tertulis ke log."""
+    if _writer is not None:
+        _writer.flush()
+
+_listeners = []
+
+
+def add_listener(fn):
+    """fn(event, data) dipanggil sinkron untuk setiap emit (mis. metrics.py); error listener diabaikan."""
+    _listeners.append(fn)
+
 
 def emit(event: str, **data):
-    rec = {"ts": time.time(), "event": event, "data": data}
-    _append_line(json.dumps(rec, ensure_ascii=False))
+    for fn in _listeners:
+        try:
+            fn(event, data)
+        except Exception:
+            pass
+    item = _sink.encode(time.time(), event, data)
+    if _writer is not None:
+        _writer.put(item)
+    else:
+        with _lock:
+            _sink.write([item])
+            try:
+                _sink.sync()
+            except OSError:
+                pass
 
 class stage:
+    """
+    Bracket <nama>_start / <nama>_end. Event _end membawa duration_ms & ok,
+    plus (PROGRESS_STAGE_METRICS=1, default) cpu_ms & cpu_util (CPU proses
+    selama stage), rss_growth_mb (kenaikan puncak RSS proses selama stage;
+    ru_maxrss berlaku seumur proses, jadi nilai absolutnya tidak bermakna per
+    stage), disk_read/disk_write (I/O disk proses) dan,
+    bila dicatat lewat add_bytes(), bytes_in/bytes_out/mb_s. cpu_util tinggi
+    = terikat codec/CPU; rendah dengan disk_* kecil = menunggu jaringan.
+    Stage di PROGRESS_PROFILE_STAGES ikut diprofil (lihat stage_profile.py).
+    """
     def __init__(self, name: str, **meta):
         self.name = name
         self.meta = meta
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add_bytes(self, bytes_in=0, bytes_out=0):
+        """Catat volume data yang diproses stage (untuk throughput)."""
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
     def __enter__(self):
         self.t0 = time.time()
         emit(self.name + "_start", **self.meta)
+        if STAGE_METRICS:
+            self._io0 = stage_profile.disk_io()
+            self._rss0 = stage_profile.peak_rss_mb()
+            self._cpu0 = time.process_time()
+        self._prof = stage_profile.profile_enter(self.name)
+        self._p0 = time.perf_counter()
         return self
+
     def __exit__(self, exc_type, exc, tb):
-        dur_ms = int((time.time() - self.t0) * 1000)
+        wall = time.perf_counter() - self._p0
+        stage_profile.profile_exit(self._prof)
         info = dict(self.meta)
-        info["duration_ms"] = dur_ms
+        info["duration_ms"] = int(wall * 1000)
         info["ok"] = exc_type is None
+        if STAGE_METRICS:
+            cpu = time.process_time() - self._cpu0
+            info["cpu_ms"] = round(cpu * 1000, 1)
+            info["cpu_util"] = round(cpu / wall, 2) if wall > 0 else None
+            rss = stage_profile.peak_rss_mb()
+            info["rss_growth_mb"] = round(max(0.0, rss - self._rss0), 1) if rss is not None and self._rss0 is not None else None
+            io1 = stage_profile.disk_io()
+            if self._io0 is not None and io1 is not None:
+                info["disk_read"] = io1[0] - self._io0[0]
+                info["disk_write"] = io1[1] - self._io0[1]
+            if self.bytes_in or self.bytes_out:
+                info["bytes_in"] = self.bytes_in
+                info["bytes_out"] = self.bytes_out
+                info["mb_s"] = round(max(self.bytes_in, self.bytes_out) / 1048576 / wall, 2) if wall > 0 else None
         emit(self.name + "_end", **info)
         return False
+
+
+def _save_profiles():
+    for name, path, samples in stage_profile.save_profiles(PROFILE_DIR):
+        emit("stage_profile_saved", stage=name, path=path, samples=samples, profiler=stage_profile.PROFILER)
+
+
+atexit.register(_save_profiles)   # didaftarkan setelah writer -> dijalankan sebelum writer ditutup
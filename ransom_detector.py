@@ -0,0 +1,172 @@
+# ransom_detector.py
+"""
+Detektor ransomware berbasis isi file (streaming).
+
+StreamDetector diberi chunk yang sudah dibaca pipeline (get_sha256
+memanggil on_chunk per chunk), jadi tidak ada baca disk tambahan.
+Statistik dihitung dari sampel tiap chunk:
+  - entropi byte (bit/byte, maks 8.0)
+  - chi-square terhadap distribusi seragam 256 bin; ciphertext ~255,
+    data terkompresi biasa jauh lebih besar
+  - magic byte: awal file tidak cocok dengan ekstensinya
+Hanya isi acak (random_content) yang membuat file "suspicious" (backup
+dilewati); magic byte yang tidak cocok saja cuma jadi alert, karena banyak
+file asli berentropi rendah yang header-nya tidak baku.
+"""
+import os
+import math
+from collections import Counter
+
+_np = False   # False = belum dicoba; None = numpy tidak ada (fallback: Counter (C) atas sampel)
+
+
+def numpy_or_none():
+    """numpy di-import saat detektor pertama dibuat, bukan saat modul di-import."""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+ENTROPY_MIN = 7.9          # bit/byte; di atas ini isi file nyaris acak
+CHI2_MAX = 350.0           # df=255, p≈0.0001 -> di bawah ini tidak bisa dibedakan dari acak
+MIN_SAMPLE_BYTES = 4096    # file lebih kecil: statistik tidak dipakai
+SAMPLE_BLOCK_NUMPY = 16 * 1024   # ukuran blok sampel
+SAMPLE_BLOCK_FALLBACK = 4 * 1024 # fallback Counter lebih lambat -> blok lebih kecil
+SAMPLE_BLOCKS = 4          # blok sampel per chunk (awal, tengah..., akhir)
+HEAD_BYTES = 64            # byte awal untuk cek magic / teks
+
+# Ekstensi -> daftar (offset, magic) yang valid
+MAGIC = {
+    "pdf": [(0, b"%PDF")],
+    "png": [(0, b"\x89PNG\r\n\x1a\n")],
+    "jpg": [(0, b"\xff\xd8\xff")],
+    "jpeg": [(0, b"\xff\xd8\xff")],
+    "gif": [(0, b"GIF87a"), (0, b"GIF89a")],
+    "bmp": [(0, b"BM")],
+    "zip": [(0, b"PK\x03\x04"), (0, b"PK\x05\x06")],
+    "docx": [(0, b"PK\x03\x04")],
+    "xlsx": [(0, b"PK\x03\x04")],
+    "pptx": [(0, b"PK\x03\x04")],
+    "gz": [(0, b"\x1f\x8b")],
+    "7z": [(0, b"7z\xbc\xaf\x27\x1c")],
+    "rar": [(0, b"Rar!\x1a\x07")],
+    "exe": [(0, b"MZ")],
+    "dll": [(0, b"MZ")],
+    # ID3 atau frame sync MPEG-1/2/2.5 Layer III (dengan/tanpa CRC)
+    "mp3": [(0, b"ID3"), (0, b"\xff\xfb"), (0, b"\xff\xfa"), (0, b"\xff\xf3"), (0, b"\xff\xf2"),
+            (0, b"\xff\xe3"), (0, b"\xff\xe2")],
+    "mp4": [(4, b"ftyp")],
+    "mov": [(4, b"ftyp"), (4, b"moov"), (4, b"wide"), (4, b"mdat"), (4, b"free"), (4, b"skip")],
+    "sqlite": [(0, b"SQLite format 3\x00")],
+    "xls": [(0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")],
+    "doc": [(0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")],
+    "ppt": [(0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")],
+}
+# Format yang memang berentropi tinggi: hanya dinilai dari magic byte
+COMPRESSED_EXTS = {"zip", "docx", "xlsx", "pptx", "gz", "7z", "rar", "png", "jpg", "jpeg",
+                   "gif", "mp3", "mp4", "mov", "br", "zst", "lz4", "snappy", "xz", "bz2", "webp"}
+TEXT_EXTS = {"txt", "csv", "tsv", "json", "xml", "html", "htm", "md", "log", "py", "js", "css",
+             "ini", "cfg", "yaml", "yml", "sql"}
+
+
+def _mostly_printable(data: bytes) -> bool:
+    bad = sum(1 for b in data if b < 9 or 13 < b < 32 or b == 127)
+    return bad <= len(data) // 32
+
+
+def _looks_utf16(head: bytes) -> bool:
+    """UTF-16 tanpa BOM: byte tinggi (posisi ganjil LE / genap BE) hampir semua nol."""
+    n = len(head) // 2 * 2
+    if n < 8:
+        return False
+    for high in (1, 0):
+        highs = head[high:n:2]
+        if highs.count(0) >= len(highs) * 0.9:
+            return _mostly_printable(bytes(b for b in head[1 - high:n:2] if b))
+    return False
+
+
+def _looks_text(head: bytes) -> bool:
+    """Teks (UTF-8/ASCII, atau UTF-16 dengan/tanpa BOM) bila tidak ada byte kontrol selain whitespace."""
+    if not head:
+        return True
+    if head.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")):
+        return True
+    return _mostly_printable(head) or _looks_utf16(head)
+
+
+def _sample(chunk: bytes, block: int):
+    """Blok-blok sampel tersebar merata di chunk (seluruh chunk bila kecil)."""
+    n = len(chunk)
+    total = block * SAMPLE_BLOCKS
+    if n <= total:
+        return [chunk]
+    step = (n - block) // (SAMPLE_BLOCKS - 1)
+    return [chunk[i * step:i * step + block] for i in range(SAMPLE_BLOCKS)]
+
+
+class StreamDetector:
+    def __init__(self, name: str):
+        self.name = name
+        self.ext = os.path.splitext(name)[1].lstrip(".").lower()
+        self.head = b""
+        self.size = 0
+        self.sampled = 0
+        self._np = np = numpy_or_none()
+        self._block = SAMPLE_BLOCK_NUMPY if np is not None else SAMPLE_BLOCK_FALLBACK
+        self._hist = np.zeros(256, dtype=np.int64) if np is not None else Counter()
+
+    def update(self, chunk: bytes):
+        if len(self.head) < HEAD_BYTES:
+            self.head += chunk[:HEAD_BYTES - len(self.head)]
+        self.size += len(chunk)
+        np = self._np
+        for block in _sample(chunk, self._block):
+            self.sampled += len(block)
+            if np is not None:
+                self._hist += np.bincount(np.frombuffer(block, dtype=np.uint8), minlength=256)
+            else:
+                self._hist.update(block)
+
+    def _counts(self):
+        if self._np is not None:
+            return self._hist.tolist()
+        return [self._hist.get(i, 0) for i in range(256)]
+
+    def result(self) -> dict:
+        """Ringkasan statistik + keputusan (suspicious, alert, reasons)."""
+        counts = self._counts()
+        n = self.sampled
+        entropy = chi2 = None
+        if n:
+            entropy = -sum(c / n * math.log2(c / n) for c in counts if c)
+            expected = n / 256.0
+            chi2 = sum((c - expected) ** 2 for c in counts) / expected
+
+        reasons = []
+        magic_ok = None
+        if self.ext in MAGIC and self.size:
+            magic_ok = any(self.head[off:off + len(m)] == m for off, m in MAGIC[self.ext])
+        elif self.ext in TEXT_EXTS and self.size:
+            magic_ok = _looks_text(self.head)
+        if magic_ok is False:
+            reasons.append("magic_mismatch")
+
+        if n >= MIN_SAMPLE_BYTES and self.ext not in COMPRESSED_EXTS:
+            if entropy >= ENTROPY_MIN and chi2 <= CHI2_MAX:
+                reasons.append("random_content")
+
+        return {
+            "suspicious": "random_content" in reasons,   # backup dilewati
+            "alert": bool(reasons),                       # termasuk magic_mismatch saja
+            "reasons": reasons,
+            "entropy": round(entropy, 4) if entropy is not None else None,
+            "chi2": round(chi2, 1) if chi2 is not None else None,
+            "magic_ok": magic_ok,
+            "size": self.size,
+        }
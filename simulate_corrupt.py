@@ -1,7 +1,15 @@
 # simulate_corrupt.py
-import os, random, time
+import os, mmap, random, hashlib
+from functools import partial
 from typing import List, Optional
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # fallback: random.Random (lebih lambat, tetap tanpa syscall per byte)
+
+from sim_executor import run_parallel, rate_from_delay
+
 try:
     from progress import emit
 except Exception:
@@ -9,29 +17,89 @@ except Exception:
         pass
 
 # ====================== HELPERS ======================
-def _safe_tqdm(iterable, use_tqdm: bool, **kwargs):
-    try:
-        from tqdm import tqdm
-        return tqdm(iterable, **kwargs) if use_tqdm else iterable
-    except Exception:
-        return iterable
-
 def _iter_all_files(root_dir: str):
     for root, _, files in os.walk(root_dir):
         for fn in files:
             yield os.path.join(root, fn)
 
+# ====================== ENGINE KORUPSI ======================
+BATCH_BYTES = 4 * 1024 * 1024  # jumlah offset per batch (batas memori untuk file besar)
+
+
+def _file_seed(seed: Optional[int], rel_path: str) -> Optional[int]:
+    """Seed per file dari seed global + path relatif, jadi hasil sama walau urutan paralel berbeda."""
+    if seed is None:
+        return None
+    digest = hashlib.sha256(f"{seed}:{rel_path}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def _damage_mmap(mm, size: int, n_damage: int, file_seed: Optional[int]) -> None:
+    """
+    Timpa n_damage posisi acak (boleh berulang, seperti versi lama) lewat
+    view mmap: offset & byte pengganti dibangkitkan per batch lalu diurutkan
+    agar akses halaman berurutan. NumPy dipakai bila ada; fallback random.Random.
+    Pola dengan seed yang sama hanya identik pada engine yang sama.
+    """
+    if np is not None:
+        rng = np.random.default_rng(file_seed)
+        view = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            left = n_damage
+            while left > 0:
+                n = min(left, BATCH_BYTES)
+                offsets = np.sort(rng.integers(0, size, n, dtype=np.int64))
+                view[offsets] = rng.integers(0, 256, n, dtype=np.uint8)
+                left -= n
+        finally:
+            del view  # lepas export buffer sebelum mmap ditutup
+        return
+
+    rng = random.Random(file_seed)
+    left = n_damage
+    while left > 0:
+        n = min(left, BATCH_BYTES)
+        offsets = sorted(rng.randrange(size) for _ in range(n))
+        for off, b in zip(offsets, rng.randbytes(n)):
+            mm[off] = b
+        left -= n
+
+
+def _corrupt_one(file_path: str, damage_ratio: float, seed: Optional[int] = None, root: str = ""):
+    """Aksi per file untuk executor; return False bila file kosong (dilewati)."""
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return False
+
+    # hitung berapa byte yang akan dirusak
+    n_damage = max(1, int(size * damage_ratio))
+    rel_path = os.path.relpath(file_path, root).replace(os.sep, "/") if root else file_path
+    with open(file_path, "r+b") as fh, mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_WRITE) as mm:
+        _damage_mmap(mm, size, n_damage, _file_seed(seed, rel_path))
+        mm.flush()
+    return True
+
+
 # ====================== SIMULASI CORRUPT ======================
 def simulate_corrupt_safe(
     output_folder: str,
     damage_ratio: float = 0.02,  # 2% isi file ditimpa random byte
-    delay: float = 0.05,
+    delay: float = 0.0,
     use_tqdm: bool = True,
     include_exts: Optional[list[str]] = None,  # contoh: ["txt","csv"]
+    *,
+    workers: Optional[int] = None,
+    files_per_s: Optional[float] = None,
+    mb_per_s: Optional[float] = None,
+    processes: bool = False,
+    seed: Optional[int] = None,
 ) -> List[str]:
     """
     Simulasi kerusakan file acak dengan cara menimpa sebagian byte.
     Tidak menghapus file; hanya memodifikasi sebagian kecil isi file.
+    File diproses paralel lewat sim_executor (workers, files_per_s, mb_per_s);
+    `delay` lama dipetakan ke files_per_s = 1/delay.
+    seed: pola kerusakan bisa diulang (per file diturunkan dari seed + path relatif).
     """
 
     if not os.path.isdir(output_folder):
@@ -48,36 +116,27 @@ def simulate_corrupt_safe(
         targets.append(path)
 
     total = len(targets)
-    emit("simulate_corrupt_start", total=total, folder=output_folder)
+    emit("simulate_corrupt_start", total=total, folder=output_folder, seed=seed)
     print(f"[SIMULATION] Merusak {total} file di {output_folder}...")
 
     corrupted_files = []
     fails = 0
-    iterator = _safe_tqdm(targets, use_tqdm and total > 0, desc="Corrupting", unit="file")
-
-    for idx, file_path in enumerate(iterator, start=1):
-        try:
-            size = os.path.getsize(file_path)
-            if size == 0:
-                continue
-
-            # hitung berapa byte yang akan dirusak
-            n_damage = max(1, int(size * damage_ratio))
-            with open(file_path, "r+b") as fh:
-                for _ in range(n_damage):
-                    pos = random.randint(0, size - 1)
-                    fh.seek(pos)
-                    fh.write(os.urandom(1))  # tulis byte acak
 
+    def on_done(idx, file_path, result, error):
+        nonlocal fails
+        if error is not None:
+            fails += 1
+            emit("simulate_corrupt_file", idx=idx, total=total, file=file_path, status="error", error=str(error))
+            print(f"[ERROR] Gagal corrupt {file_path}: {error}")
+        elif result:
             corrupted_files.append(file_path)
             emit("simulate_corrupt_file", idx=idx, total=total, file=file_path, status="ok")
-        except Exception as e:
-            fails += 1
-            emit("simulate_corrupt_file", idx=idx, total=total, file=file_path, status="error", error=str(e))
-            print(f"[ERROR] Gagal corrupt {file_path}: {e}")
 
-        if delay and delay > 0:
-            time.sleep(delay)
+    run_parallel(
+        targets, partial(_corrupt_one, damage_ratio=damage_ratio, seed=seed, root=output_folder), on_done,
+        workers=workers, files_per_s=rate_from_delay(delay, files_per_s), mb_per_s=mb_per_s,
+        processes=processes, progress_desc="Corrupting" if use_tqdm else None,
+    )
 
     emit("simulate_corrupt_done", total_success=len(corrupted_files), total_fail=fails, folder=output_folder)
     print(f"[DONE] {len(corrupted_files)} file berhasil dirusak, {fails} gagal.")
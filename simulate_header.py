@@ -4,8 +4,10 @@ import base64
 from pathlib import Path
 from secrets import token_bytes
 from datetime import datetime
-from tqdm import tqdm
-import time
+from functools import partial
+
+from sim_executor import run_parallel, rate_from_delay
+from header_snapshot import SNAPSHOT_NAME, SnapshotWriter, read_headers
 
 try:
     from progress import emit
@@ -28,6 +30,54 @@ def _is_unsafe_target(path: Path) -> bool:
     return False
 
 
+def _restore_header_one(snap, src):
+    """Aksi per snapshot untuk executor: tulis balik header asli; return path target."""
+    with open(snap, "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+    rel = Path(meta["file"])
+    target = (src / rel).resolve()
+    header = base64.b64decode(meta["header_b64"])
+
+    with open(target, "r+b") as f:
+        f.seek(0)
+        f.write(header)
+    return str(target)
+
+
+RESTORE_BATCH = 256  # jumlah header per task restore paralel
+
+
+def _restore_header_batch(batch, src):
+    """Aksi per batch (path_relatif, header) dari kontainer; return [(target, error)]."""
+    out = []
+    for rel, header in batch:
+        target = (src / rel).resolve()
+        try:
+            with open(target, "r+b") as f:
+                f.write(header)
+            out.append((str(target), None))
+        except Exception as e:
+            out.append((str(target), str(e)))
+    return out
+
+
+def _corrupt_header_one(fpath, header_size, record=None):
+    """
+    Aksi per file untuk executor: timpa header dengan byte acak; return header asli.
+    record(fpath, header) dipanggil (dan harus sudah durable) sebelum file ditimpa.
+    """
+    with open(fpath, "r+b") as f:
+        original_header = f.read(header_size)
+        if record is not None:
+            record(fpath, original_header)
+
+        # Tulis header korup
+        f.seek(0)
+        corrupted = token_bytes(min(header_size, max(1, len(original_header))))
+        f.write(corrupted)
+    return original_header
+
+
 def simulate_header_corruption_safe(
     source_folder,
     header_size=64,
@@ -39,16 +89,24 @@ def simulate_header_corruption_safe(
     delay=0.0,
     *,
     reset=False,              # True: restore dari snapshot
-    cleanup_snapshots=False,  # (tidak dipakai, tapi dipertahankan agar kompatibel)
-    output_folder=None        # folder tujuan simpan hasil snapshot/header
+    cleanup_snapshots=False,  # True: hapus kontainer snapshot setelah reset tanpa error
+    output_folder=None,       # folder tujuan simpan hasil snapshot/header
+    workers=None,             # paralelisme & laju target, lihat sim_executor.py
+    files_per_s=None,
+    mb_per_s=None,
+    processes=False,
 ):
     """
     Simulasi korupsi header file secara aman.
-    Snapshot header disimpan di output_folder (bukan .hdr_snap).
+    Snapshot header disimpan di output_folder/header_snapshots.bin
+    (lihat header_snapshot.py); *.hdr.json lama tetap dibaca saat reset
+    bila kontainer belum ada.
     Mode:
       - default: korupsi (buat backup header)
-      - reset=True: pulihkan header dari backup
+      - reset=True: pulihkan header dari backup (batch paralel)
+    `delay` lama dipetakan ke files_per_s = 1/delay.
     """
+    rate = rate_from_delay(delay, files_per_s)
 
     src = Path(source_folder).resolve()
     if not src.exists():
@@ -63,6 +121,7 @@ def simulate_header_corruption_safe(
         out_dir = Path(src).resolve()
 
     out_dir.mkdir(parents=True, exist_ok=True)
+    snapshot_path = out_dir / SNAPSHOT_NAME
 
     # ==========================================================
     # MODE RESET (restore header)
@@ -70,8 +129,13 @@ def simulate_header_corruption_safe(
     if reset:
         emit("hdr_reset_start")
 
-        snapshots = [p for p in out_dir.rglob("*.hdr.json") if p.is_file()]
-        total_snaps = len(snapshots)
+        if snapshot_path.exists():
+            headers = read_headers(snapshot_path)
+            snapshots = None
+            total_snaps = len(headers)
+        else:
+            snapshots = [p for p in out_dir.rglob("*.hdr.json") if p.is_file()]
+            total_snaps = len(snapshots)
         emit("hdr_scan_start", total=total_snaps)
 
         if dry_run:
@@ -82,29 +146,51 @@ def simulate_header_corruption_safe(
                 "will_restore": total_snaps
             }
 
-        iterator = tqdm(snapshots, desc="Restore headers", unit="file") if show_progress else snapshots
         restored, errors = 0, 0
 
-        for snap in iterator:
-            try:
-                with open(snap, "r", encoding="utf-8") as fh:
-                    meta = json.load(fh)
-                rel = Path(meta["file"])
-                target = (src / rel).resolve()
-                header = base64.b64decode(meta["header_b64"])
-
-                with open(target, "r+b") as f:
-                    f.seek(0)
-                    f.write(header)
-
-                restored += 1
-                emit("hdr_file_processed", file=str(target), status="restored")
-            except Exception as e:
+        if snapshots is None:
+            def on_batch(idx, batch, result, error):
+                nonlocal restored, errors
+                if error is not None:
+                    errors += len(batch)
+                    emit("hdr_file_error", file=str(snapshot_path), error=str(error))
+                    return
+                for target, err in result:
+                    if err is not None:
+                        errors += 1
+                        emit("hdr_file_error", file=target, error=err)
+                    else:
+                        restored += 1
+                        emit("hdr_file_processed", file=target, status="restored")
+
+            batches = [headers[i:i + RESTORE_BATCH] for i in range(0, len(headers), RESTORE_BATCH)]
+            run_parallel(
+                batches, partial(_restore_header_batch, src=src), on_batch,
+                workers=workers, files_per_s=rate, mb_per_s=mb_per_s, processes=processes,
+                progress_desc="Restore headers" if show_progress else None,
+                size_of=lambda b: sum(len(h) for _, h in b), count_of=len,
+            )
+            if cleanup_snapshots and errors == 0:
+                snapshot_path.unlink()
+
+            emit("hdr_done", restored=restored, errors=errors, mode="reset")
+            return {"mode": "reset", "restored": restored, "errors": errors}
+
+        def on_restored(idx, snap, target, error):
+            nonlocal restored, errors
+            if error is not None:
                 errors += 1
-                emit("hdr_file_error", file=str(snap), error=str(e))
+                emit("hdr_file_error", file=str(snap), error=str(error))
+            else:
+                restored += 1
+                emit("hdr_file_processed", file=target, status="restored")
 
-            if delay > 0:
-                time.sleep(delay)
+        run_parallel(
+            snapshots, partial(_restore_header_one, src=src), on_restored,
+            workers=workers, files_per_s=rate, mb_per_s=mb_per_s, processes=processes,
+            progress_desc="Restore headers" if show_progress else None,
+            size_of=lambda _snap: header_size,
+        )
 
         emit("hdr_done", restored=restored, errors=errors, mode="reset")
         return {"mode": "reset", "restored": restored, "errors": errors}
@@ -128,13 +214,14 @@ def simulate_header_corruption_safe(
                 rel_parts = fpath.parts
             if output_folder and Path(output_folder).name in rel_parts:
                 continue
+            if fpath.resolve() == snapshot_path:
+                continue
             if extensions and fpath.suffix.lower() not in [e.lower() for e in extensions]:
                 continue
             all_files.append(fpath)
 
     total_files = len(all_files)
     emit("hdr_scan_start", total=total_files)
-    iter_files = tqdm(all_files, desc="Simulasi header corruption", unit="file") if show_progress else all_files
 
     if dry_run:
         emit("hdr_preview", total=total_files)
@@ -148,32 +235,52 @@ def simulate_header_corruption_safe(
     ok, fail = 0, 0
     results = []
 
-    for fpath in iter_files:
-        try:
-            with open(fpath, "r+b") as f:
-                original_header = f.read(header_size)
+    writer = SnapshotWriter(snapshot_path)
+
+    def record(fpath, header, sync=True):
+        # header asli masuk kontainer (flush + fsync) sebelum file ditimpa: aman bila proses/OS crash
+        writer.add(Path(os.path.relpath(fpath, src)).as_posix(), header, sync=sync)
 
-                # Tulis header korup
-                f.seek(0)
-                corrupted = token_bytes(min(header_size, max(1, len(original_header))))
-                f.write(corrupted)
+    if processes:
+        # worker proses tidak bisa memakai writer ini: snapshot dicatat dulu di proses utama
+        for fpath in all_files:
+            try:
+                with open(fpath, "rb") as f:
+                    record(fpath, f.read(header_size), sync=False)
+            except OSError:
+                pass                     # dilaporkan sebagai error oleh worker
+        writer.sync()                    # satu fsync untuk semua entry, sebelum worker menimpa file
+        action = partial(_corrupt_header_one, header_size=header_size)
+    else:
+        action = partial(_corrupt_header_one, header_size=header_size, record=record)
 
+    def on_corrupted(idx, fpath, result, error):
+        nonlocal ok, fail
+        if error is not None:
+            fail += 1
+            emit("hdr_file_error", file=str(fpath), error=str(error))
+            results.append({"file": str(fpath), "status": f"error: {error}"})
+        else:
             ok += 1
             emit("hdr_file_processed", file=str(fpath), status="ok")
             results.append({"file": str(fpath), "status": "ok"})
-        except Exception as e:
-            fail += 1
-            emit("hdr_file_error", file=str(fpath), error=str(e))
-            results.append({"file": str(fpath), "status": f"error: {e}"})
 
-        if delay > 0:
-            time.sleep(delay)
+    try:
+        run_parallel(
+            all_files, action, on_corrupted,
+            workers=workers, files_per_s=rate, mb_per_s=mb_per_s, processes=processes,
+            progress_desc="Simulasi header corruption" if show_progress else None,
+            size_of=lambda _fpath: header_size,
+        )
+    finally:
+        writer.close()
 
     summary = {
         "mode": "corrupt",
         "total_success": ok,
         "total_fail": fail,
-        "output_folder": str(out_dir)
+        "output_folder": str(out_dir),
+        "snapshot_file": str(snapshot_path)
     }
 
     if report_file:
@@ -0,0 +1,215 @@
+# stage_profile.py
+"""
+Instrumentasi untuk progress.stage: probe sumber daya proses dan profiler
+opsional per stage.
+
+Probe (murah, dipanggil di awal & akhir tiap stage):
+  - peak_rss_mb() : puncak RSS proses (resource / psutil)
+  - disk_io()     : (read_bytes, write_bytes) I/O disk proses (/proc/self/io / psutil)
+
+Profiler (hanya untuk stage di PROGRESS_PROFILE_STAGES, dipisah koma, "*" = semua):
+  PROGRESS_PROFILER="sample"   : sampler statistik (satu thread, tiap
+                                 PROGRESS_PROFILE_INTERVAL_MS) -> <stage>.collapsed
+                                 (format collapsed stacks, siap untuk flamegraph.pl/speedscope)
+  PROGRESS_PROFILER="cprofile" : cProfile deterministik -> <stage>.pstats
+Hasil digabung per nama stage dan ditulis saat proses selesai ke
+PROGRESS_PROFILE_DIR (default <folder log>/profiles).
+"""
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+MB = 1024 * 1024
+PROFILE_STAGES = {s.strip() for s in os.getenv("PROGRESS_PROFILE_STAGES", "").split(",") if s.strip()}
+PROFILER = os.getenv("PROGRESS_PROFILER", "sample").lower()
+PROFILE_INTERVAL_S = float(os.getenv("PROGRESS_PROFILE_INTERVAL_MS", "5")) / 1000.0
+MAX_DEPTH = 128
+
+
+# ---------- probe sumber daya ----------
+def _probe_rss():
+    try:
+        import resource
+        scale = MB if sys.platform == "darwin" else 1024    # macOS: byte, Linux: KB
+        return lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    except ImportError:
+        pass
+    try:
+        import psutil
+        proc = psutil.Process()
+
+        def rss():
+            mem = proc.memory_info()
+            return getattr(mem, "peak_wset", mem.rss) / MB
+        return rss
+    except ImportError:
+        return lambda: None
+
+
+def _probe_io():
+    if os.path.exists("/proc/self/io"):
+        def proc_io():
+            read = write = 0
+            with open("/proc/self/io", "rb") as f:
+                for line in f:
+                    if line.startswith(b"read_bytes:"):
+                        read = int(line.split()[1])
+                    elif line.startswith(b"write_bytes:"):
+                        write = int(line.split()[1])
+            return read, write
+        return proc_io
+    try:
+        import psutil
+        proc = psutil.Process()
+
+        def ps_io():
+            c = proc.io_counters()
+            return c.read_bytes, c.write_bytes
+        return ps_io
+    except (ImportError, AttributeError):
+        return lambda: None
+
+
+# probe dipilih sekali saat import (hindari import gagal berulang per stage)
+peak_rss_mb = _probe_rss()
+disk_io = _probe_io()
+
+
+# ---------- profiler ----------
+def wants_profile(name):
+    return "*" in PROFILE_STAGES or name in PROFILE_STAGES
+
+
+def _collapse(frame):
+    """Frame -> 'root;...;leaf' (label file:fungsi)."""
+    parts = []
+    while frame is not None and len(parts) < MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class _Sampler:
+    """
+    Satu thread sampler untuk semua stage yang diprofil: tiap interval
+    mengambil sys._current_frames() sekali dan mengatribusikan stack tiap
+    thread terdaftar ke stage terdalam yang sedang aktif di thread itu.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.active = {}                 # thread id -> [nama stage, ...]
+        self.counts = {}                 # nama stage -> Counter(stack -> sampel)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def enter(self, name):
+        tid = threading.get_ident()
+        with self._cond:
+            self.active.setdefault(tid, []).append(name)
+            self.counts.setdefault(name, Counter())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stage-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def exit(self, name):
+        tid = threading.get_ident()
+        with self._cond:
+            stack = self.active.get(tid)
+            if stack and name in stack:
+                stack.remove(name)
+            if not stack:
+                self.active.pop(tid, None)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._cond:
+                while not self.active:
+                    self._cond.wait()
+                targets = {tid: names[-1] for tid, names in self.active.items() if tid != me}
+            frames = sys._current_frames()
+            stacks = [(name, _collapse(frames[tid])) for tid, name in targets.items() if tid in frames]
+            del frames
+            with self._cond:
+                for name, stack in stacks:
+                    self.counts[name][stack] += 1
+            time.sleep(self.interval)
+
+    def save(self, folder):
+        out = []
+        with self._cond:
+            counts = {name: Counter(c) for name, c in self.counts.items() if c}
+        for name, c in counts.items():
+            path = os.path.join(folder, f"{name}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, n in sorted(c.items()):
+                    f.write(f"{stack} {n}\n")
+            out.append((name, path, sum(c.values())))
+        return out
+
+
+class _CProfiler:
+    """cProfile per nama stage. Hanya satu capture aktif sekaligus (stage bersarang dilewati)."""
+    def __init__(self):
+        self.profiles = {}
+        self._busy = threading.Lock()
+
+    def enter(self, name):
+        if not self._busy.acquire(blocking=False):
+            return False
+        import cProfile
+        prof = self.profiles.get(name)
+        if prof is None:
+            prof = self.profiles[name] = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:          # profiler lain sudah aktif
+            self._busy.release()
+            return False
+        return True
+
+    def exit(self, name):
+        self.profiles[name].disable()
+        self._busy.release()
+
+    def save(self, folder):
+        import pstats
+        out = []
+        for name, prof in self.profiles.items():
+            path = os.path.join(folder, f"{name}.pstats")
+            prof.dump_stats(path)
+            out.append((name, path, pstats.Stats(prof).total_calls))
+        return out
+
+
+_profiler = None
+
+
+def profile_enter(name):
+    """Mulai capture untuk stage name; return token untuk profile_exit (None = tidak diprofil)."""
+    global _profiler
+    if not wants_profile(name):
+        return None
+    if _profiler is None:
+        _profiler = _CProfiler() if PROFILER == "cprofile" else _Sampler(PROFILE_INTERVAL_S)
+    if isinstance(_profiler, _CProfiler):
+        return name if _profiler.enter(name) else None
+    _profiler.enter(name)
+    return name
+
+
+def profile_exit(token):
+    if token is not None:
+        _profiler.exit(token)
+
+
+def save_profiles(folder):
+    """Tulis hasil profil ke folder; return [(stage, path, sampel/panggilan)]."""
+    if _profiler is None:
+        return []
+    os.makedirs(folder, exist_ok=True)
+    return _profiler.save(folder)
@@ -0,0 +1,245 @@
+# stream_stats.py
+"""
+Statistik evaluasi streaming per codec (pengganti list rasio/waktu di memori).
+
+Tiap metrik = Welford (count, mean, varians, min, max) + histogram log
+(gaya HDR): bucket ke-i mencakup [LO * G^i, LO * G^(i+1)) dengan
+G = 1 + PRECISION, jadi persentil (median/p95/p99) punya galat relatif
+<= PRECISION/2 dan memori tetap (array 'Q') berapa pun jumlah file.
+Semua objek bisa di-merge (antar proses worker maupun antar run) dan
+disimpan dalam format biner ringkas: MAGIC + header JSON + kolom array.
+"""
+import os
+import json
+import math
+import struct
+from array import array
+
+MAGIC = b"EVST"
+VERSION = 1
+LO = 1e-6                  # nilai <= LO masuk bucket 0 (nol/underflow)
+HI = 1e7                   # nilai >= HI masuk bucket terakhir
+PRECISION = 0.01           # lebar relatif bucket (1%)
+PERCENTILES = (50, 90, 95, 99)
+METRICS = ("ratio", "time_s", "mb_s")
+_HDR_LEN = struct.Struct("<I")
+_LOG_G = math.log1p(PRECISION)
+N_BUCKETS = int(math.ceil(math.log(HI / LO) / _LOG_G)) + 2
+
+
+class LogHistogram:
+    def __init__(self, counts=None):
+        self.counts = counts if counts is not None else array("Q", bytes(8 * N_BUCKETS))
+
+    @staticmethod
+    def bucket(x):
+        if x <= LO:
+            return 0
+        return min(N_BUCKETS - 1, 1 + int(math.log(x / LO) / _LOG_G))
+
+    @staticmethod
+    def value(i):
+        """Titik tengah geometris bucket i."""
+        if i == 0:
+            return 0.0
+        return LO * math.exp((i - 0.5) * _LOG_G)
+
+    @staticmethod
+    def bounds(i):
+        """Rentang [bawah, atas) bucket i (bucket 0: [0, LO])."""
+        if i == 0:
+            return 0.0, LO
+        return LO * math.exp((i - 1) * _LOG_G), LO * math.exp(i * _LOG_G)
+
+    def add(self, x):
+        self.counts[self.bucket(x)] += 1
+
+    def merge(self, other):
+        c = self.counts
+        for i, v in enumerate(other.counts):
+            if v:
+                c[i] += v
+
+    def percentiles(self, ps, n):
+        """{p: nilai} untuk daftar persentil ps (0-100), satu kali jalan kumulatif."""
+        out = {}
+        if n == 0:
+            return {p: None for p in ps}
+        targets = sorted((max(1, math.ceil(p / 100.0 * n)), p) for p in ps)
+        k, seen = 0, 0
+        for i, v in enumerate(self.counts):
+            if not v:
+                continue
+            seen += v
+            while k < len(targets) and seen >= targets[k][0]:
+                out[targets[k][1]] = self.value(i)
+                k += 1
+            if k == len(targets):
+                break
+        return out
+
+
+class Metric:
+    """Welford (mean/varians) + histogram log untuk satu metrik."""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.hist = LogHistogram()
+
+    def add(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.hist.add(x)
+
+    def merge(self, other):
+        """Gabung dua akumulator (rumus paralel Chan et al.)."""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.mean += d * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist.merge(other.hist)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def summary(self):
+        if self.n == 0:
+            return {"count": 0}
+        pct = self.hist.percentiles(PERCENTILES, self.n)
+        clamp = lambda v: min(self.max, max(self.min, v))   # bucket tidak melewati min/max nyata
+        out = {"count": self.n, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+        out.update({f"p{p}": clamp(pct[p]) for p in PERCENTILES})
+        return out
+
+    def header(self):
+        return {"n": self.n, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.n else None, "max": self.max if self.n else None}
+
+    @classmethod
+    def from_header(cls, h, counts):
+        m = cls()
+        m.n, m.mean, m.m2 = h["n"], h["mean"], h["m2"]
+        m.min = h["min"] if h["min"] is not None else math.inf
+        m.max = h["max"] if h["max"] is not None else -math.inf
+        m.hist = LogHistogram(counts)
+        return m
+
+
+class CodecStats:
+    """Rasio, durasi & throughput per file + total byte untuk throughput berbobot byte."""
+    def __init__(self):
+        self.metrics = {name: Metric() for name in METRICS}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def add(self, size_in, size_out, seconds):
+        m = self.metrics
+        m["ratio"].add(size_out / size_in if size_in > 0 else 0.0)
+        m["time_s"].add(seconds)
+        if seconds > 0:
+            m["mb_s"].add(size_in / 1024 / 1024 / seconds)
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+        self.seconds += seconds
+
+    def merge(self, other):
+        for name in METRICS:
+            self.metrics[name].merge(other.metrics[name])
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.seconds += other.seconds
+
+    def summary(self):
+        ratio, t = self.metrics["ratio"].summary(), self.metrics["time_s"].summary()
+        if ratio["count"] == 0:
+            return {"count": 0}
+        out = {
+            "count": ratio["count"],
+            # kunci lama evaluation_results.json tetap ada
+            "ratio_avg": ratio["mean"], "ratio_median": ratio["p50"],
+            "ratio_min": ratio["min"], "ratio_max": ratio["max"],
+            "time_avg": t["mean"], "time_median": t["p50"],
+            "ratio": ratio, "time_s": t, "mb_s_per_file": self.metrics["mb_s"].summary(),
+            "bytes_in": self.bytes_in, "bytes_out": self.bytes_out,
+            "ratio_weighted": self.bytes_out / self.bytes_in if self.bytes_in else None,
+            "mb_s_weighted": self.bytes_in / 1024 / 1024 / self.seconds if self.seconds > 0 else None,
+        }
+        return out
+
+
+class EvalStats:
+    def __init__(self, algos=()):
+        self.codecs = {algo: CodecStats() for algo in algos}
+        self.runs = 1
+
+    def add(self, algo, size_in, size_out, seconds):
+        cs = self.codecs.get(algo)
+        if cs is None:
+            cs = self.codecs[algo] = CodecStats()
+        cs.add(size_in, size_out, seconds)
+
+    def merge(self, other, runs=False):
+        """Gabung hasil worker lain (runs=False) atau run lain (runs=True)."""
+        for algo, cs in other.codecs.items():
+            self.codecs.setdefault(algo, CodecStats()).merge(cs)
+        if runs:
+            self.runs += other.runs
+
+    def summary(self):
+        return {algo: cs.summary() for algo, cs in self.codecs.items()}
+
+    # ---------- persistensi ----------
+    def save(self, path):
+        """Header JSON (skalar) + kolom histogram mentah (endianness mesin)."""
+        header = {"version": VERSION, "runs": self.runs, "lo": LO, "hi": HI, "precision": PRECISION,
+                  "buckets": N_BUCKETS, "codecs": {}}
+        cols = []
+        for algo, cs in self.codecs.items():
+            header["codecs"][algo] = {
+                "bytes_in": cs.bytes_in, "bytes_out": cs.bytes_out, "seconds": cs.seconds,
+                "metrics": {name: cs.metrics[name].header() for name in METRICS},
+            }
+            cols.extend(cs.metrics[name].hist.counts for name in METRICS)
+        raw = json.dumps(header).encode("utf-8")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + _HDR_LEN.pack(len(raw)) + raw)
+            for col in cols:
+                col.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Bukan file statistik evaluasi: {path}")
+            (hlen,) = _HDR_LEN.unpack(f.read(_HDR_LEN.size))
+            h = json.loads(f.read(hlen))
+            if h.get("version") != VERSION or h["buckets"] != N_BUCKETS or h["precision"] != PRECISION:
+                raise ValueError(f"Format statistik evaluasi tidak cocok: {path}")
+            st = cls()
+            st.runs = h["runs"]
+            for algo, c in h["codecs"].items():
+                cs = st.codecs[algo] = CodecStats()
+                cs.bytes_in, cs.bytes_out, cs.seconds = c["bytes_in"], c["bytes_out"], c["seconds"]
+                for name in METRICS:
+                    counts = array("Q")
+                    counts.fromfile(f, N_BUCKETS)
+                    cs.metrics[name] = Metric.from_header(c["metrics"][name], counts)
+        return st
@@ -0,0 +1,8 @@
+import os
+import sys
+import pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# modul yang membaca PROGRESS_LOG_PATH saat import tidak boleh menyentuh log asli
+os.environ.setdefault("PROGRESS_LOG_PATH", str(pathlib.Path(os.getenv("TMPDIR", "/tmp")) / "progress_events_test.jsonl"))
@@ -0,0 +1,28 @@
+import pytest
+
+from generations import GenerationStore
+from selective_restore import SelectiveRestore
+
+
+@pytest.fixture
+def store(tmp_path):
+    src = tmp_path / "src"
+    (src / "original").mkdir(parents=True)
+    (src / "original" / "a.txt").write_text("halo")
+    gens = GenerationStore(str(tmp_path / "gens"))
+    gens.commit(str(src))
+    return gens
+
+
+def test_unknown_generation_is_a_failed_result(store, tmp_path):
+    results = SelectiveRestore(gen_store=store).restore("a.txt", str(tmp_path / "out"), generation="tidak-ada")
+    assert len(results) == 1
+    assert results[0]["ok"] is False and results[0]["path"] is None
+    assert "tidak-ada" in results[0]["error"]
+
+
+def test_known_generation_restores(store, tmp_path):
+    gen_id = store.list_ids()[-1]
+    results = SelectiveRestore(gen_store=store).restore("a.txt", str(tmp_path / "out"), generation=gen_id)
+    assert [r["file"] for r in results] == ["a.txt"]
+    assert (tmp_path / "out" / "a.txt").read_text() == "halo"
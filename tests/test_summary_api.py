@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from app import routes_api
+from app.event_index import EventIndex, LogFollower
+
+
+def _append(path, event, **data):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"ts": 1.0, "event": event, "data": data}) + "\n")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    log = tmp_path / "progress_events.jsonl"
+    _append(log, "hash_original", file="a.txt", size=3, sha256="x")
+    idx = EventIndex(LogFollower(log))
+    monkeypatch.setattr(routes_api, "get_index", lambda: idx)
+    app = flask.Flask(__name__)
+    app.register_blueprint(routes_api.bp, url_prefix="/api")
+    return app.test_client(), log
+
+
+def test_error_event_updates_summary_and_etag(client):
+    c, log = client
+    first = c.get("/api/summary")
+    assert first.status_code == 200
+    assert first.get_json()["global"]["errors"] == 0
+
+    _append(log, "restore_error", file="a.txt", error="boom")
+    second = c.get("/api/summary", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()["global"]["errors"] == 1
@@ -2,12 +2,12 @@ import os
 import json
 import hashlib
 import shutil
+import struct
 from datetime import datetime
 import subprocess
 from pathlib import Path
-import matplotlib.pyplot as plt
 
-from config import EVAL_FILE
+from config import EVAL_FILE, EVAL_STATS_FILE
 
 # ---------- JSON Helpers ----------
 def load_json(path, default):
@@ -22,11 +22,14 @@ def save_json(path, obj):
         json.dump(obj, f, indent=2, ensure_ascii=False)
 
 # ---------- Hash & Normalization ----------
-def get_sha256(file_path):
+def get_sha256(file_path, on_chunk=None):
+    """SHA-256 file; on_chunk(chunk) dipanggil untuk tiap chunk yang sama (mis. detektor ransomware)."""
     sha256 = hashlib.sha256()
     with open(file_path, 'rb') as f:
         for chunk in iter(lambda: f.read(4*1024*1024), b""):
             sha256.update(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
     return sha256.hexdigest()
 
 def shorten_hash(h):
@@ -92,72 +95,34 @@ def attempt_mount_vhdx(vhdx_path: str) -> bool:
         print(f"[VHD] Exception saat mount VHDX: {e}")
         return False
 
-# ---------- Visualization & Evaluation ----------
-def show_all_hash_popup(hash_results, save_folder=None):
+# ---------- Evaluation (grafik: report.py) ----------
+def evaluate_and_save(stats, eval_folder, history_path=None):
     """
-    hash_results: list of (file_rel_with_algo_folder, algo_display, original_hash, restored_hash, match_bool)
+    stats: stream_stats.EvalStats run ini. Ringkasan (mean/std/persentil,
+    throughput berbobot byte) disimpan ke EVAL_FILE + statistik biner
+    EVAL_STATS_FILE. Bila history_path diberikan, stats juga di-merge ke
+    akumulator lintas run di path tsb dan ringkasannya ikut di "all_runs".
     """
-    n_rows = len(hash_results) + 1
-    fig_height = max(4, min(40, 0.35 * n_rows))
-    fig, ax = plt.subplots(figsize=(12, fig_height))
-    ax.axis('off')
-    ax.set_title("Hasil Perbandingan Hash Semua File", fontsize=14, fontweight='bold')
-    columns = ["File", "Algoritma", "Hash Asli", "Hash Restore", "Status"]
-    table_data = [columns]
-    for fname, algo, orig, restored, match in hash_results:
-        table_data.append([fname, algo, shorten_hash(orig), shorten_hash(restored), "Cocok" if match else "Tidak Cocok"])
+    from stream_stats import EvalStats
 
-    table = ax.table(cellText=table_data, loc='center', cellLoc='center')
-    table.auto_set_font_size(False)
-    font_size = max(6, min(10, int(150 / max(10, n_rows))))
-    table.set_fontsize(font_size)
-    table.scale(1.2, 1.0 + n_rows * 0.02)
-
-    for j in range(len(columns)): 
-        table[(0, j)].set_facecolor("#cccccc")
-    for i in range(1, len(table_data)):
-        table[(i, 4)].set_facecolor("#c8e6c9" if "Cocok" in table_data[i][4] else "#ffcdd2")
-
-    plt.tight_layout()
-    if save_folder:
-        ensure_dir(save_folder)
-        save_path = os.path.join(save_folder, "hash_match_results.png")
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Hasil hash match disimpan di: {save_path}")
-    plt.show()
-
-def _safe_name(p: str) -> str:
-    return p.replace("\\", "_").replace("/", "_")
-
-def save_per_file_plot(rel_path, algoritma_list, rasio_list, waktu_list, evaluation_folder):
-    ensure_dir(evaluation_folder)
-    fig, axs = plt.subplots(1, 2, figsize=(10, 4))
-    fig.suptitle(f"Hasil Kompresi: {rel_path}", fontsize=12, fontweight="bold")
-    axs[0].bar(algoritma_list, rasio_list); axs[0].set_title("Rasio Kompresi"); axs[0].set_ylabel("Hasil/Asli")
-    axs[1].bar(algoritma_list, waktu_list); axs[1].set_title("Waktu Kompresi"); axs[1].set_ylabel("Detik")
-    plt.tight_layout()
-    out_png = os.path.join(evaluation_folder, f"{_safe_name(rel_path)}.png")
-    fig.savefig(out_png, dpi=120)
-    plt.close(fig)
-
-def evaluate_and_save(total_rasio, total_waktu, eval_folder):
-    import statistics
     ensure_dir(eval_folder)
-    summary = {"generated_at": datetime.now().isoformat(), "algorithms": {}}
-    for alg, ratios in total_rasio.items():
-        times = total_waktu.get(alg, [])
-        if ratios:
-            summary["algorithms"][alg] = {
-                "count": len(ratios),
-                "ratio_avg": statistics.mean(ratios),
-                "ratio_median": statistics.median(ratios),
-                "ratio_min": min(ratios),
-                "ratio_max": max(ratios),
-                "time_avg": statistics.mean(times) if times else None,
-                "time_median": statistics.median(times) if times else None,
-            }
+    summary = {"generated_at": datetime.now().isoformat(), "algorithms": stats.summary()}
+    stats.save(os.path.join(eval_folder, EVAL_STATS_FILE))
+    if history_path:
+        history = EvalStats()
+        if os.path.exists(history_path):
+            try:
+                history = EvalStats.load(history_path)
+                history.merge(stats, runs=True)
+            except (ValueError, EOFError, struct.error, OSError) as e:
+                # file terpotong/rusak (mis. proses mati saat save): mulai history baru
+                print(f"[EVAL] Statistik lintas run diabaikan ({e}), mulai ulang.")
+                history = EvalStats()
+                history.merge(stats)
         else:
-            summary["algorithms"][alg] = {"count": 0}
+            history.merge(stats)
+        history.save(history_path)
+        summary["all_runs"] = {"runs": history.runs, "algorithms": history.summary()}
     save_json(os.path.join(eval_folder, EVAL_FILE), summary)
     print(f"[EVAL] Evaluation summary tersimpan di {os.path.join(eval_folder, EVAL_FILE)}")
     return summary